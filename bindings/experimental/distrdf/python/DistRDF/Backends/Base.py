@@ -11,14 +11,17 @@
 ################################################################################
 from __future__ import annotations
 
+import logging
+
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from functools import partial
-from typing import Callable, Iterable, List, Optional, TYPE_CHECKING, Union
+from math import ceil
+from typing import Any, Callable, Collection, Dict, Iterable, List, Optional, Set, TYPE_CHECKING, Union
 
 import ROOT
 
-from DistRDF import Ranges
+from DistRDF import Ranges, _compact_histogram, _graph_cache, _profiling
 from DistRDF.Backends import Utils
 
 # Type hints only
@@ -27,6 +30,12 @@ if TYPE_CHECKING:
     from DistRDF.HeadNode import TaskObjects
     from DistRDF.Ranges import DataRange
 
+logger = logging.getLogger(__name__)
+
+# Fraction of the total number of tasks that may still be running before the
+# dynamic scheduler starts submitting backup copies of them.
+SPECULATION_THRESHOLD = 0.05
+
 
 def setup_mapper(initialization_fn: Callable) -> None:
     """
@@ -61,17 +70,20 @@ def get_mergeable_values(starting_node: ROOT.RDF.RNode, range_id: int,
 
         # Get RResultPtrs out of the type-erased RResultHandles by
         # instantiating with the type of the value
-        mergeables = [
-            ROOT.ROOT.Detail.RDF.GetMergeableValue(res.GetResultPtr[res_type]())
-            if isinstance(res, ROOT.RDF.RResultHandle)
-            else res
-            for res, res_type in zip(results, res_types)
-        ]
+        with _profiling.phase("mergeables"):
+            mergeables = [
+                _compact_histogram.make_compact(
+                    ROOT.ROOT.Detail.RDF.GetMergeableValue(res.GetResultPtr[res_type]()))
+                if isinstance(res, ROOT.RDF.RResultHandle)
+                else res
+                for res, res_type in zip(results, res_types)
+            ]
     else:
         # Output of the callable
         actions = computation_graph_callable(starting_node, range_id, exec_id)
 
-        mergeables = [Utils.get_mergeablevalue(action) for action in actions]
+        with _profiling.phase("mergeables"):
+            mergeables = [Utils.get_mergeablevalue(action) for action in actions]
 
     return mergeables
 
@@ -88,9 +100,15 @@ class TaskResult:
             the task, as well as a dictionary where each key is an identifier
             for a tree opened in the task and the value is the number of entries
             in that tree. This attribute is not None only in a TTree-based run.
+        graph_cache_stats: How many tasks could reuse a computation graph
+            already jitted in their worker process, and how many had to jit it.
+        timings: The time spent in each phase by the tasks and merge steps
+            that produced this result. Only filled if profiling was requested.
     """
     mergeables: Optional[List]
     entries_in_trees: Optional[Ranges.TaskTreeEntries]
+    graph_cache_stats: Optional[_graph_cache.GraphCacheStats] = None
+    timings: Optional[List[_profiling.TaskTiming]] = None
 
 
 def distrdf_mapper(
@@ -99,18 +117,25 @@ def distrdf_mapper(
                                         TaskObjects],
         computation_graph_callable: Callable[[ROOT.RDF.RNode, int], List],
         initialization_fn: Callable,
-        optimized: bool) -> TaskResult:
+        optimized: bool,
+        profiling: bool = False) -> TaskResult:
     """
-    Maps the computation graph to the input logical range of entries.
+    Maps the computation graph to the input logical range of entries. If
+    profiling is requested, the time spent in each phase of the task is
+    returned together with the result.
     """
     # Wrap code that may be calling into C++ in a try-except block in order
     # to better propagate exceptions.
+    stats_before = _graph_cache.get_stats()
+    _profiling.start_task("map", current_range.id)
     try:
-        setup_mapper(initialization_fn)
+        with _profiling.phase("setup"):
+            setup_mapper(initialization_fn)
 
         # Build an RDataFrame instance for the current mapper task, based
         # on the type of the head node.
-        rdf_plus = build_rdf_from_range(current_range)
+        with _profiling.phase("build_rdf"):
+            rdf_plus = build_rdf_from_range(current_range)
         if rdf_plus.rdf is not None:
             mergeables = get_mergeable_values(rdf_plus.rdf, current_range.id, computation_graph_callable,
                                               optimized, current_range.exec_id)
@@ -118,8 +143,14 @@ def distrdf_mapper(
             mergeables = None
     except ROOT.std.exception as e:
         raise RuntimeError(f"C++ exception thrown:\n\t{type(e).__name__}: {e.what()}")
+    finally:
+        timing = _profiling.end_task()
 
-    return TaskResult(mergeables, rdf_plus.entries_in_trees)
+    result = TaskResult(mergeables, rdf_plus.entries_in_trees, _graph_cache.get_stats() - stats_before)
+    if profiling:
+        _profiling.measure_serialized_size(timing, result)
+        result.timings = [timing]
+    return result
 
 
 def merge_values(mergeables_out: Iterable, mergeables_in: Iterable) -> Iterable:
@@ -165,12 +196,119 @@ def distrdf_reducer(results_inout: TaskResult,
 
     # Wrap code that may be calling into C++ in a try-except block in order
     # to better propagate exceptions.
+    _profiling.start_task("reduce")
     try:
-        mergeables_updated = merge_values(mergeables_out, mergeables_in)
+        with _profiling.phase("merge"):
+            mergeables_updated = merge_values(mergeables_out, mergeables_in)
     except ROOT.std.exception as e:
         raise RuntimeError(f"C++ exception thrown:\n\t{type(e).__name__}: {e.what()}")
+    finally:
+        timing = _profiling.end_task()
+
+    if results_inout.graph_cache_stats is not None and results_in.graph_cache_stats is not None:
+        graph_cache_stats = results_inout.graph_cache_stats + results_in.graph_cache_stats
+    else:
+        graph_cache_stats = results_inout.graph_cache_stats or results_in.graph_cache_stats
+
+    # Only record the merge steps if the tasks were profiled
+    if results_inout.timings is not None or results_in.timings is not None:
+        timings = (results_inout.timings or []) + (results_in.timings or []) + [timing]
+    else:
+        timings = None
 
-    return TaskResult(mergeables_updated, entries_in_trees_out)
+    return TaskResult(mergeables_updated, entries_in_trees_out, graph_cache_stats, timings)
+
+
+def process_and_merge_dynamically(ranges: List[DataRange],
+                                  submit: Callable[[DataRange], Any],
+                                  wait_first: Callable[[Collection[Any]], Iterable[Any]],
+                                  reducer: Callable[[TaskResult, TaskResult], TaskResult],
+                                  speculative: bool,
+                                  on_partial_result: Optional[Callable[[TaskResult, bool], bool]] = None) -> TaskResult:
+    """
+    Runs one task per range and folds the task results into a single
+    accumulator as soon as they are available, instead of waiting for a fixed
+    reduction tree.
+
+    Tasks are handed to the backend all at once, the backend is responsible for
+    assigning them to workers as these become free. Thus, the input ranges
+    should be many more than the available workers. When the number of ranges
+    still running drops below `SPECULATION_THRESHOLD` of the total and
+    `speculative` is True, a backup copy of each of them is submitted. The
+    first copy to finish is merged, the other one is cancelled. This avoids
+    waiting for a single slow worker at the end of the execution.
+
+    Args:
+        ranges: The ranges to be processed, one per task.
+
+        submit: Sends the task for the input range to the backend and returns
+            a future-like object with `result`, `cancel` methods.
+
+        wait_first: Blocks until at least one of the input futures is done,
+            then returns the done futures.
+
+        reducer: Merges two task results into the first one.
+
+        speculative: Whether backup tasks should be submitted near the end of
+            the execution. Must be False if the computation graph has side
+            effects, e.g. a Snapshot.
+
+        on_partial_result: Optional function called with the accumulator every
+            time the result of a task has been merged into it, and whether it
+            is the final result, i.e. no task is still pending. If it returns
+            True while tasks are pending, these are cancelled and the
+            accumulator is returned as is.
+
+    Returns:
+        The merged result of all tasks, or of the tasks that finished before
+        `on_partial_result` requested to stop.
+    """
+    ntasks = len(ranges)
+    speculation_start = max(1, ceil(SPECULATION_THRESHOLD * ntasks))
+
+    pending: Dict[Any, DataRange] = {submit(current_range): current_range for current_range in ranges}
+    merged_ids: Set[int] = set()
+    speculated_ids: Set[int] = set()
+    accumulator: Optional[TaskResult] = None
+
+    while pending:
+        for future in wait_first(list(pending)):
+            current_range = pending.pop(future, None)
+            if current_range is None or current_range.id in merged_ids:
+                # The other copy of this task already finished first
+                continue
+
+            try:
+                taskresult = future.result()
+            except Exception:
+                if any(other_range.id == current_range.id for other_range in pending.values()):
+                    # A backup copy of this task is still running, rely on it
+                    logger.debug("Task for range %s failed, waiting for its backup copy", current_range.id)
+                    continue
+                raise
+            merged_ids.add(current_range.id)
+            accumulator = taskresult if accumulator is None else reducer(accumulator, taskresult)
+
+            # Drop the backup copy of this task, if any
+            for other, other_range in list(pending.items()):
+                if other_range.id == current_range.id:
+                    other.cancel()
+                    del pending[other]
+
+            if on_partial_result is not None and on_partial_result(accumulator, not pending) and pending:
+                logger.debug("Stopping early, cancelling %d remaining tasks", len(pending))
+                for other in pending:
+                    other.cancel()
+                return accumulator
+
+        if speculative and len(pending) <= speculation_start:
+            for current_range in list(pending.values()):
+                if current_range.id not in speculated_ids:
+                    logger.debug("Submitting backup task for range %s", current_range.id)
+                    speculated_ids.add(current_range.id)
+                    pending[submit(current_range)] = current_range
+
+    return accumulator
 
 
 class BaseBackend(ABC):
@@ -222,6 +360,26 @@ class BaseBackend(ABC):
         """
         pass
 
+    def ProcessAndMergeDynamic(self, ranges: List[DataRange],
+                               mapper: Callable[..., TaskResult],
+                               reducer: Callable[[TaskResult, TaskResult], TaskResult],
+                               speculative: bool,
+                               on_partial_result: Optional[Callable[[TaskResult, bool], bool]] = None) -> TaskResult:
+        """
+        Run map-reduce by handing out the input ranges to the workers as they
+        become free, merging the result of each task on the client as soon as
+        it finishes and optionally re-executing the slowest tasks at the end of
+        the computation. Backends that can submit single tasks should override
+        this method, see `process_and_merge_dynamically`. By default, the
+        ranges are processed as in `ProcessAndMerge`, leaving the scheduling of
+        the tasks to the backend, and `on_partial_result` is called only once
+        with the final result, so the execution cannot be stopped early.
+        """
+        result = self.ProcessAndMerge(ranges, mapper, reducer)
+        if on_partial_result is not None:
+            on_partial_result(result, True)
+        return result
+
     @abstractmethod
     def distribute_unique_paths(self, paths):
         """
@@ -16,12 +16,13 @@ from typing import Any, Dict, Optional, TYPE_CHECKING
 
 from DistRDF import DataFrame
 from DistRDF import HeadNode
+from DistRDF import _profiling
 from DistRDF.Backends import Base
 from DistRDF.Backends import Utils
 
 try:
     import dask
-    from dask.distributed import Client, get_worker, LocalCluster, progress
+    from dask.distributed import Client, get_worker, LocalCluster, progress, wait
 except ImportError:
     raise ImportError(("cannot import a Dask component. Refer to the Dask documentation "
                        "for installation instructions."))
@@ -111,22 +112,11 @@ class DaskBackend(Base.BaseBackend):
         """
         return get_total_cores(self.client)
 
-    def ProcessAndMerge(self, ranges, mapper, reducer):
+    def _make_dask_mapper(self, mapper):
         """
-        Performs map-reduce using Dask framework.
-
-        Args:
-            mapper (function): A function that runs the computational graph
-                and returns a list of values.
-
-            reducer (function): A function that merges two lists that were
-                returned by the mapper.
-
-        Returns:
-            list: A list representing the values of action nodes returned
-            after computation (Map-Reduce).
+        Wraps the generic mapper function with the declaration of the headers
+        and shared libraries that were distributed to the Dask workers.
         """
-
         # These need to be passed as variables, because passing `self` inside
         # following `dask_mapper` function would trigger serialization errors
         # like the following:
@@ -159,18 +149,38 @@ class DaskBackend(Base.BaseBackend):
                 os.path.join(localdir, os.path.basename(filepath))
                 for filepath in headers
             ]
-            Utils.declare_headers(headers_on_executor)
+            with _profiling.phase("declare"):
+                Utils.declare_headers(headers_on_executor)
 
             # Get and declare shared libraries on each worker
             shared_libs_on_ex = [
                 os.path.join(localdir, os.path.basename(filepath))
                 for filepath in shared_libraries
             ]
-            Utils.declare_shared_libraries(shared_libs_on_ex)
+            with _profiling.phase("declare"):
+                Utils.declare_shared_libraries(shared_libs_on_ex)
 
             return mapper(current_range)
 
-        dmapper = dask.delayed(dask_mapper)
+        return dask_mapper
+
+    def ProcessAndMerge(self, ranges, mapper, reducer):
+        """
+        Performs map-reduce using Dask framework.
+
+        Args:
+            mapper (function): A function that runs the computational graph
+                and returns a list of values.
+
+            reducer (function): A function that merges two lists that were
+                returned by the mapper.
+
+        Returns:
+            list: A list representing the values of action nodes returned
+            after computation (Map-Reduce).
+        """
+
+        dmapper = dask.delayed(self._make_dask_mapper(mapper))
         dreducer = dask.delayed(reducer)
 
         mergeables_lists = [dmapper(range) for range in ranges]
@@ -193,6 +203,44 @@ class DaskBackend(Base.BaseBackend):
 
         return final_results.compute()
 
+    def ProcessAndMergeDynamic(self, ranges, mapper, reducer, speculative, on_partial_result=None):
+        """
+        Performs map-reduce using Dask futures. Each range is submitted as a
+        separate task that the Dask scheduler assigns to the first free worker.
+        Results are merged on the client as soon as each task finishes, and
+        backup copies of the last running tasks are submitted if `speculative`
+        is True.
+
+        Args:
+            mapper (function): A function that runs the computational graph
+                and returns a list of values.
+
+            reducer (function): A function that merges two lists that were
+                returned by the mapper.
+
+            speculative (bool): Whether the slowest tasks at the end of the
+                execution should be re-executed on other workers.
+
+            on_partial_result (function, None): Called with the merged result
+                after each task finishes and whether it is the final one. If
+                it returns True before the final result, the remaining tasks
+                are cancelled.
+
+        Returns:
+            list: A list representing the values of action nodes returned
+            after computation (Map-Reduce).
+        """
+        dask_mapper = self._make_dask_mapper(mapper)
+
+        def submit(current_range):
+            # pure=False so that backup copies of a task get a different key
+            return self.client.submit(dask_mapper, current_range, pure=False)
+
+        def wait_first(futures):
+            return wait(futures, return_when="FIRST_COMPLETED").done
+
+        return Base.process_and_merge_dynamically(ranges, submit, wait_first, reducer, speculative, on_partial_result)
+
     def distribute_unique_paths(self, paths):
         """
         Dask supports sending files to the workes via the `Client.upload_file`
@@ -211,5 +259,7 @@ class DaskBackend(Base.BaseBackend):
         # Set the number of partitions for this dataframe, one of the following:
         # 1. User-supplied `npartitions` optional argument
         npartitions = kwargs.pop("npartitions", None)
-        headnode = HeadNode.get_headnode(self, npartitions, *args)
+        # Forward the options of the distributed execution, e.g. `scheduling`
+        options = HeadNode.pop_execution_options(kwargs)
+        headnode = HeadNode.get_headnode(self, npartitions, *args, **options)
         return DataFrame.RDataFrame(headnode)
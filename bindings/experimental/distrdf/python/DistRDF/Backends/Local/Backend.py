@@ -0,0 +1,185 @@
+################################################################################
+# Copyright (C) 1995-2023, Rene Brun and Fons Rademakers.                      #
+# All rights reserved.                                                         #
+#                                                                              #
+# For the licensing terms see $ROOTSYS/LICENSE.                                #
+# For the list of contributors see $ROOTSYS/README/CREDITS.                    #
+################################################################################
+from __future__ import annotations
+
+import concurrent.futures
+import multiprocessing
+import os
+import threading
+from functools import reduce
+from typing import Callable, Optional
+
+from DistRDF import DataFrame
+from DistRDF import HeadNode
+from DistRDF.Backends import Base
+
+# The mapper of the execution served by this worker process. The functions
+# generated by the head node are closures that cannot be pickled, so instead of
+# sending the mapper with every task it is passed to the initializer of the
+# worker processes, which inherit it from the memory of the client when they
+# are forked.
+_task_mapper: Optional[Callable[..., Base.TaskResult]] = None
+
+# Serializes the forks of the worker processes of the executions that run
+# concurrently in the client, e.g. from RunGraphs
+_fork_lock = threading.Lock()
+
+
+def _set_task_mapper(mapper: Callable[..., Base.TaskResult]) -> None:
+    """Stores the mapper of the execution in the worker process."""
+    global _task_mapper
+    _task_mapper = mapper
+
+
+def _run_task(current_range):
+    """Runs the mapper inherited from the client on the input range."""
+    return _task_mapper(current_range)
+
+
+class LocalBackend(Base.BaseBackend):
+    """
+    Backend that executes the computational graph on a pool of processes on
+    the local machine, without the need of any external service.
+
+    The worker processes are forked from the client process at the beginning
+    of each execution. Thus, they share all the state of the ROOT interpreter
+    of the client, e.g. the headers and shared libraries declared through
+    `distribute_headers` and `distribute_shared_libraries`, which do not need to
+    be declared again in every task.
+    """
+
+    def __init__(self, nworkers: Optional[int] = None):
+        """
+        Creates an instance of the local backend.
+
+        Args:
+            nworkers: The number of worker processes. Defaults to the number of
+                cores on the local machine.
+        """
+        super(LocalBackend, self).__init__()
+
+        self.nworkers = nworkers if nworkers is not None else os.cpu_count()
+        if self.nworkers < 1:
+            raise ValueError(f"The number of workers must be a positive integer, got {self.nworkers}.")
+        # Forking is needed to share the state of the client with the workers
+        self._context = multiprocessing.get_context("fork")
+
+    def optimize_npartitions(self) -> int:
+        """
+        The number of partitions is the number of worker processes, so that
+        each process runs one task.
+        """
+        return self.nworkers
+
+    def _make_executor(self, mapper, ntasks: int) -> concurrent.futures.ProcessPoolExecutor:
+        """
+        Creates the pool whose worker processes run the given mapper. Each pool
+        hands its own mapper to its workers, so that the executions that run
+        concurrently, e.g. from RunGraphs, do not interfere. All the workers are
+        forked at once, after everything was declared in the client for this
+        execution and before the client starts merging the results, while
+        holding a lock so that the workers of other executions are not forked
+        at the same time.
+        """
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=min(self.nworkers, ntasks),
+                                                          mp_context=self._context,
+                                                          initializer=_set_task_mapper,
+                                                          initargs=(mapper,))
+        with _fork_lock:
+            try:
+                # With the fork start method, the first task starts all the
+                # worker processes of the pool
+                executor.submit(os.getpid).result()
+            except BaseException:
+                executor.shutdown(wait=True)
+                raise
+        return executor
+
+    def ProcessAndMerge(self, ranges, mapper, reducer):
+        """
+        Performs map-reduce on a pool of local processes. The results of the
+        tasks are merged on the client as soon as they are available.
+
+        Args:
+            ranges (list): The ranges of the dataset, one per task.
+
+            mapper (function): A function that runs the computational graph
+                and returns a list of values.
+
+            reducer (function): A function that merges two lists that were
+                returned by the mapper.
+
+        Returns:
+            list: A list representing the values of action nodes returned
+            after computation (Map-Reduce).
+        """
+        with self._make_executor(mapper, len(ranges)) as executor:
+            futures = [executor.submit(_run_task, current_range) for current_range in ranges]
+            return reduce(reducer, (future.result() for future in concurrent.futures.as_completed(futures)))
+
+    def ProcessAndMergeDynamic(self, ranges, mapper, reducer, speculative, on_partial_result=None):
+        """
+        Performs map-reduce on a pool of local processes, handing out the
+        ranges to the processes as they become free.
+
+        Args:
+            ranges (list): The ranges of the dataset, usually many more than
+                the number of worker processes.
+
+            mapper (function): A function that runs the computational graph
+                and returns a list of values.
+
+            reducer (function): A function that merges two lists that were
+                returned by the mapper.
+
+            speculative (bool): Whether the slowest tasks at the end of the
+                execution should be re-executed by other processes.
+
+            on_partial_result (function, None): Called with the merged result
+                after each task finishes and whether it is the final one. If
+                it returns True before the final result, the remaining tasks
+                are cancelled.
+        """
+        executor = self._make_executor(mapper, len(ranges))
+        submitted = []
+
+        def submit(current_range):
+            future = executor.submit(_run_task, current_range)
+            submitted.append(future)
+            return future
+
+        def wait_first(futures):
+            return concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED).done
+
+        try:
+            return Base.process_and_merge_dynamically(ranges, submit, wait_first, reducer, speculative,
+                                                      on_partial_result)
+        finally:
+            # Running tasks cannot be interrupted, but do not start new ones
+            # e.g. after an early stop or the failure of a task
+            for future in submitted:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def distribute_unique_paths(self, paths):
+        """
+        All the worker processes run on the local machine, so they can access
+        the same files as the client without copying them.
+        """
+        pass
+
+    def make_dataframe(self, *args, **kwargs):
+        """
+        Creates an instance of distributed RDataFrame that can send computations
+        to a pool of local processes.
+        """
+        npartitions = kwargs.pop("npartitions", None)
+        # Forward the options of the distributed execution, e.g. `scheduling`
+        options = HeadNode.pop_execution_options(kwargs)
+        headnode = HeadNode.get_headnode(self, npartitions, *args, **options)
+        return DataFrame.RDataFrame(headnode)
@@ -0,0 +1,20 @@
+################################################################################
+# Copyright (C) 1995-2023, Rene Brun and Fons Rademakers.                      #
+# All rights reserved.                                                         #
+#                                                                              #
+# For the licensing terms see $ROOTSYS/LICENSE.                                #
+# For the list of contributors see $ROOTSYS/README/CREDITS.                    #
+################################################################################
+from __future__ import annotations
+
+def RDataFrame(*args, **kwargs):
+    """
+    Create an RDataFrame object that can run computations on a pool of
+    processes on the local machine.
+    """
+
+    from DistRDF.Backends.Local import Backend
+    nworkers = kwargs.get("nworkers", None)
+    localbackend = Backend.LocalBackend(nworkers=nworkers)
+
+    return localbackend.make_dataframe(*args, **kwargs)
@@ -15,6 +15,7 @@ import ntpath  # Filename from path (should be platform-independent)
 
 from DistRDF import DataFrame
 from DistRDF import HeadNode
+from DistRDF import _profiling
 from DistRDF.Backends import Base
 from DistRDF.Backends import Utils
 
@@ -117,14 +118,16 @@ class SparkBackend(Base.BaseBackend):
                 pyspark.SparkFiles.get(ntpath.basename(filepath))
                 for filepath in headers
             ]
-            Utils.declare_headers(headers_on_executor)
+            with _profiling.phase("declare"):
+                Utils.declare_headers(headers_on_executor)
 
             # Get and declare shared libraries on each worker
             shared_libs_on_ex = [
                 pyspark.SparkFiles.get(ntpath.basename(filepath))
                 for filepath in shared_libraries
             ]
-            Utils.declare_shared_libraries(shared_libs_on_ex)
+            with _profiling.phase("declare"):
+                Utils.declare_shared_libraries(shared_libs_on_ex)
 
             return mapper(current_range)
 
@@ -157,5 +160,7 @@ class SparkBackend(Base.BaseBackend):
         # Set the number of partitions for this dataframe, one of the following:
         # 1. User-supplied `npartitions` optional argument
         npartitions = kwargs.pop("npartitions", None)
-        headnode = HeadNode.get_headnode(self, npartitions, *args)
+        # Forward the options of the distributed execution, e.g. `scheduling`
+        options = HeadNode.pop_execution_options(kwargs)
+        headnode = HeadNode.get_headnode(self, npartitions, *args, **options)
         return DataFrame.RDataFrame(headnode)
@@ -11,20 +11,142 @@
 ################################################################################
 from __future__ import annotations
 
+import hashlib
 import logging
 import os
+import tempfile
+import threading
+import time
 
+from dataclasses import dataclass, replace
 from functools import singledispatch
-from typing import Iterable, Set, Tuple
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
 
 import ROOT
+from ROOT._declarecache import declare_header
 from ROOT._pythonization._rdataframe import AsNumpyResult
 
+from DistRDF import _compact_histogram, _profiling, _snapshot_merge
 from DistRDF.PythonMergeables import SnapshotResult
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class DeclarationStats:
+    """
+    Statistics of the declaration of headers and shared libraries in the
+    current process.
+
+    Attributes:
+
+    declared: How many times a file was actually declared to the interpreter.
+
+    skipped: How many times a file was not declared again, because the same
+        content had already been declared from the same path.
+
+    time_saved: The time in seconds that the skipped declarations would have
+        taken, estimated from the time of the first declaration of each file.
+    """
+    declared: int = 0
+    skipped: int = 0
+    time_saved: float = 0.
+
+
+# The headers and shared libraries declared in this process. Each path is
+# mapped to the hash of the content that was declared and to the time the
+# declaration took. Tasks running in the same worker process declare the same
+# files over and over, so a header is only declared again if its content
+# changed, from a copy whose path depends on the content since the interpreter
+# would not read the same path again. A shared library cannot be loaded again
+# from the same path.
+_DECLARED_FILES: Dict[str, Tuple[str, float]] = {}
+_DECLARED_FILES_LOCK = threading.Lock()
+_DECLARATION_STATS = DeclarationStats()
+
+
+def get_declaration_stats() -> DeclarationStats:
+    """Returns a copy of the declaration statistics of the current process."""
+    with _DECLARED_FILES_LOCK:
+        return replace(_DECLARATION_STATS)
+
+
+def _read_content(path: str) -> Optional[bytes]:
+    """Returns the content of the file, None if it cannot be read."""
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _copy_with_hash(path: str, content: bytes, content_hash: str) -> str:
+    """
+    Writes the content next to the file, under a name that contains the hash
+    of the content, so that the relative includes of the file still resolve.
+    The copy is written to the temporary directory if the directory of the
+    file is not writable.
+
+    Returns:
+        str: The path of the copy.
+    """
+    root, extension = os.path.splitext(path)
+    copy_name = f"{os.path.basename(root)}_{content_hash[:16]}{extension}"
+    for directory in (os.path.dirname(path), tempfile.gettempdir()):
+        copy_path = os.path.join(directory, copy_name)
+        if os.path.exists(copy_path):
+            return copy_path
+        tmp_path = f"{copy_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, copy_path)
+            return copy_path
+        except OSError:
+            continue
+    raise RuntimeError(f"The new content of \"{path}\" could not be copied to declare it.")
+
+
+def _declare_once(path: str, declare: Callable[[str], None], redeclarable: bool = True) -> None:
+    """
+    Declares the file with the input function, unless the same content was
+    already declared from the same path in this process. If the content of a
+    `redeclarable` file changed, a copy of the new content is declared instead.
+    Files that cannot be read are always passed to the declaration function,
+    which reports the error.
+
+    Raises:
+        RuntimeError: If the file is not `redeclarable` and its content changed
+            since it was declared from the same path.
+    """
+    content = _read_content(path)
+    content_hash = hashlib.sha1(content).hexdigest() if content is not None else None
+    with _DECLARED_FILES_LOCK:
+        declared = _DECLARED_FILES.get(path)
+        if content_hash is not None and declared is not None:
+            if declared[0] == content_hash:
+                _DECLARATION_STATS.skipped += 1
+                _DECLARATION_STATS.time_saved += declared[1]
+                _profiling.count("declare_time_saved", declared[1])
+                return
+            if not redeclarable:
+                raise RuntimeError(f"The content of \"{path}\" changed after it was loaded in this process, the "
+                                   "new content cannot be loaded from the same path. Use a different file name or "
+                                   "restart the process.")
+
+        start = time.perf_counter()
+        if declared is not None and content_hash is not None:
+            declare(_copy_with_hash(path, content, content_hash))
+        else:
+            declare(path)
+        elapsed = time.perf_counter() - start
+
+        _DECLARATION_STATS.declared += 1
+        if content_hash is not None:
+            _DECLARED_FILES[path] = (content_hash, elapsed)
+        logger.debug("Declared %s in %.3f s", path, elapsed)
+
+
 def extend_include_path(include_path: str) -> None:
     """
     Extends the list of paths in which ROOT looks for headers and
@@ -45,47 +167,63 @@ def extend_include_path(include_path: str) -> None:
     logger.debug("ROOT include paths:\n{}".format(root_includepath))
 
 
+def _declare_header(header: str) -> None:
+    """
+    Includes the header in the ROOT C++ interpreter. If the cache of the
+    declarations is enabled with ROOT_DECLARE_CACHE_DIR, the header is compiled
+    once into a shared library that the following processes load.
+    """
+    # Retrieve header directory
+    header_dir = os.path.dirname(header)
+    # Add directory to ROOT's include path
+    extend_include_path(header_dir)
+    try:
+        declare_header(header)
+    except Exception as e:
+        msg = "There was an error in including \"{}\" !".format(header)
+        raise e(msg)
+
+
+def _load_shared_library(shared_library: str) -> None:
+    """Loads the shared library in the current process."""
+    # Get return value for loading the shared library.
+    # On succesful load the value will be 0.
+    # If the library does not exist or there was an error
+    # while loading, the value will be -1
+    lib_load_return = ROOT.gSystem.Load(shared_library)
+    if lib_load_return == -1:
+        if not os.path.exists(shared_library):
+            raise IOError("Shared library does not exist!")
+        raise Exception("ROOT couldn't load the shared library!")
+
+
 def declare_headers(headers_to_include: Iterable[str]) -> None:
     """
-    Declares all required headers using the ROOT's C++ Interpreter.
+    Declares all required headers using the ROOT's C++ Interpreter. Headers
+    that were already declared in this process with the same content are
+    skipped.
 
     Args:
         headers_to_include (list): This list should consist of all
             necessary C++ headers as strings.
     """
     for header in headers_to_include:
-        # Retrieve header directory
-        header_dir = os.path.dirname(header)
-        # Add directory to ROOT's include path
-        extend_include_path(header_dir)
-        # Create C++ include code
-        include_code = "#include \"{}\"\n".format(header)
-        try:
-            ROOT.gInterpreter.Declare(include_code)
-        except Exception as e:
-            msg = "There was an error in including \"{}\" !".format(header)
-            raise e(msg)
+        _declare_once(header, _declare_header)
 
 
 def declare_shared_libraries(libraries_to_include: Iterable[str]) -> None:
     """
     Declares all required shared libraries using the ROOT's C++
-    Interpreter.
+    Interpreter. Libraries that were already loaded in this process with the
+    same content are skipped. A library whose content changed after it was
+    loaded is an error, since the loaded one would keep being used.
 
     Args:
         libraries_to_include (list): This list should consist of all
             necessary C++ shared libraries as strings.
     """
     for shared_library in libraries_to_include:
-        # Get return value for loading the shared library.
-        # On succesful load the value will be 0.
-        # If the library does not exist or there was an error
-        # while loading, the value will be -1
-        lib_load_return = ROOT.gSystem.Load(shared_library)
-        if lib_load_return == -1:
-            if not os.path.exists(shared_library):
-                raise IOError("Shared library does not exist!")
-            raise Exception("ROOT couldn't load the shared library!")
+        _declare_once(shared_library, _load_shared_library, redeclarable=False)
 
 
 def get_paths_set_from_string(path_string: str) -> Set[str]:
@@ -159,9 +297,10 @@ def get_mergeablevalue(resultptr):
     """
     Generally the input argument to this function is an RResultPtr, for which a
     corresponding RMergeableValue type already exists. Call into the C++
-    function to handle this case.
+    function to handle this case. Histograms are wrapped so that they are sent
+    back in a compact format, see `_compact_histogram.CompactHistogram`.
     """
-    return ROOT.Detail.RDF.GetMergeableValue(resultptr)
+    return _compact_histogram.make_compact(ROOT.Detail.RDF.GetMergeableValue(resultptr))
 
 
 @get_mergeablevalue.register(AsNumpyResult)
@@ -183,10 +322,11 @@ def _(resultptr):
 def _(resultptr):
     """
     When performing a distributed Snapshot we return an object holding the name
-    of the dataset and the path to the partial snapshot. We can directly return
-    the object, no extra work needed.
+    of the dataset and the path to the partial snapshot, together with the size
+    of the file written by this task.
     """
-    return SnapshotResult(resultptr.treename, resultptr.filenames)
+    return SnapshotResult(resultptr.treename, resultptr.filenames,
+                          bytes_written=[_snapshot_merge.get_file_size(filename) for filename in resultptr.filenames])
 
 
 @singledispatch
@@ -200,10 +340,11 @@ def merge_values(mergeable_out, mergeable_in):
 
 @merge_values.register(AsNumpyResult)
 @merge_values.register(SnapshotResult)
+@merge_values.register(_compact_histogram.CompactHistogram)
 def _(mergeable_out, mergeable_in):
     """
-    Mergeables coming from `Snapshot` or `AsNumpy` operations have their own
-    `Merge` method.
+    Mergeables coming from `Snapshot` or `AsNumpy` operations and compact
+    histograms have their own `Merge` method.
     """
     mergeable_out.Merge(mergeable_in)
 
@@ -225,8 +366,18 @@ def _(mergeable: SnapshotResult, node, backend):
     DistRDF node.
     This overload calls the `GetValue` method of `SnapshotResult`. This method
     accepts a 'backend' parameter because we need to recreate a distributed
-    RDataFrame with the same backend of the input one.
+    RDataFrame with the same backend of the input one. If requested, the partial
+    output files are first merged in bigger files with distributed tasks.
     """
+    logger.info("Distributed Snapshot wrote %d bytes in %d files", sum(mergeable.bytes_written),
+                len(mergeable.filenames))
+    for filename, nbytes in zip(mergeable.filenames, mergeable.bytes_written):
+        logger.debug("Task output %s: %d bytes", filename, nbytes)
+
+    target_size = node.get_head().snapshot_merge_size
+    if target_size is not None:
+        mergeable = _snapshot_merge.merge_snapshot_outputs(mergeable, backend, node.operation.args[1], target_size)
+
     node.value = mergeable.GetValue(backend)
 
 
@@ -243,6 +394,34 @@ def _(mergeable: ROOT.Detail.RDF.RMergeableVariationsBase, node, backend):
     node.value = mergeable
 
 
+@singledispatch
+def get_partial_value(mergeable):
+    """
+    Retrieves the value of a mergeable that holds the results of only part of
+    the distributed tasks, to be passed to the partial result callbacks.
+    By default, the `GetValue` method of the mergeable returns the value.
+    """
+    return mergeable.GetValue()
+
+
+@get_partial_value.register
+def _(mergeable: SnapshotResult):
+    """
+    A partial Snapshot cannot be read back as a dataset yet, return the list
+    of files written so far instead.
+    """
+    return list(mergeable.filenames)
+
+
+@get_partial_value.register
+def _(mergeable: ROOT.Detail.RDF.RMergeableVariationsBase):
+    """
+    Partial varied results are accessed through the mergeable variations
+    themselves, like for the final value.
+    """
+    return mergeable
+
+
 @singledispatch
 def clone_action(result_promise, _):
     """
@@ -19,7 +19,8 @@ from typing import Any, Dict, List, Tuple, TYPE_CHECKING, Union
 
 import ROOT
 
-from DistRDF._graph_cache import ExecutionIdentifier, _ACTIONS_REGISTER
+from DistRDF import _profiling
+from DistRDF._graph_cache import ExecutionIdentifier, _ACTIONS_REGISTER, get_cache_key
 from DistRDF.Backends import Utils
 from DistRDF.CppWorkflow import CppWorkflow
 
@@ -216,21 +217,57 @@ def trigger_computation_graph(
         list: A list of objects that can be either used as or converted into
             mergeable values.
     """
-    if exec_id not in _ACTIONS_REGISTER:
-        # Fill the cache with the future results
-        actions = generate_computation_graph(graph, starting_node, range_id)
-        _ACTIONS_REGISTER[exec_id] = actions
-    else:
-        # Create clones according to different types of actions
-        actions = [
-            Utils.clone_action(action, range_id)
-            for action in _ACTIONS_REGISTER[exec_id]
-        ]
+    return trigger_computation_graphs([graph], starting_node, range_id, exec_id)
 
-    # Trigger computation graph with the GIL released
+
+def trigger_computation_graphs(
+    graphs: List[Dict[int, Node]], starting_node: ROOT.RDF.RNode, range_id: int, exec_id: ExecutionIdentifier) -> List:
+    """
+    Trigger multiple computation graphs processing the same dataset with a
+    single event loop. All the graphs are created starting from the same node,
+    so that the input data is read only once for all of them.
+
+    Args:
+        graphs: The representations of the computation graphs.
+
+        starting_node: The node where the generation of the
+            computation graphs is started. Either an actual RDataFrame or the
+            result of a Range operation (in case of empty data source).
+
+        range_id: The id of the current range. Needed to assign a
+            file name to a partial Snapshot if it was requested.
+
+    Returns:
+        list: The objects that can be either used as or converted into
+            mergeable values, for the actions of all the graphs in order.
+    """
+    cache_key = get_cache_key(exec_id)
+    with _profiling.phase("graph"):
+        if cache_key not in _ACTIONS_REGISTER:
+            # Fill the cache with the future results
+            actions = [
+                action
+                for graph in graphs
+                for action in generate_computation_graph(graph, starting_node, range_id)
+            ]
+            _ACTIONS_REGISTER[cache_key] = actions
+        else:
+            # Create clones according to different types of actions
+            actions = [
+                Utils.clone_action(action, range_id)
+                for action in _ACTIONS_REGISTER[cache_key]
+            ]
+
+    # Jit the computation graph separately from the event loop, so that the
+    # time spent in each can be measured
     rnode = ROOT.RDF.AsRNode(starting_node)
-    ROOT.Internal.RDF.TriggerRun.__release_gil__ = True
-    ROOT.Internal.RDF.TriggerRun(rnode)
+    with _profiling.phase("jit"):
+        ROOT.Internal.RDF.TriggerJit(rnode)
+
+    # Trigger computation graph with the GIL released
+    with _profiling.phase("event_loop"):
+        ROOT.Internal.RDF.TriggerRun.__release_gil__ = True
+        ROOT.Internal.RDF.TriggerRun(rnode)
 
     # Return a list of objects that can be later merged. In most cases this
     # is still made of RResultPtrs that will then be used as input arguments
@@ -259,7 +296,8 @@ def run_with_cppworkflow(graph: Dict[int, Node], starting_node: ROOT.RDF.RNode,
     """
 
     # Generate the code of the C++ workflow
-    cpp_workflow = CppWorkflow(graph, starting_node, range_id)
+    with _profiling.phase("graph"):
+        cpp_workflow = CppWorkflow(graph, starting_node, range_id)
 
     logger.debug(f"Generated C++ workflow is:\n{cpp_workflow}")
 
@@ -18,6 +18,7 @@ from textwrap import dedent
 
 from DistRDF.Node import Node
 from DistRDF.Operation import Action, AsNumpy, Operation, Snapshot
+from DistRDF import _profiling, _snapshot_merge
 from DistRDF.PythonMergeables import SnapshotResult
 
 import ROOT
@@ -504,7 +505,7 @@ CppWorkflowResult {func_name}(ROOT::RDF::RNode &node0)
         # Replace the RResultHandle of each Snapshot by its modified output
         # path, since the latter is what we actually need in the reducer
         for res_ptr_id, treename, path in self._snapshots:
-            results[res_ptr_id] = SnapshotResult(treename, [path])
+            results[res_ptr_id] = SnapshotResult(treename, [path], bytes_written=[_snapshot_merge.get_file_size(path)])
             res_types[res_ptr_id] = None  # placeholder
 
         # AsNumpyResult needs to be triggered before being merged
@@ -523,8 +524,10 @@ CppWorkflowResult {func_name}(ROOT::RDF::RNode &node0)
                 corresponding to those actions.
         '''
 
-        wf_id = self._compile()
-        res = self._run_function(wf_id)
+        with _profiling.phase("jit"):
+            wf_id = self._compile()
+        with _profiling.phase("event_loop"):
+            res = self._run_function(wf_id)
         # TODO: it would be nice to remove all created artifacts
         # after creation of the shared library. This is blocked by #10640
         return res
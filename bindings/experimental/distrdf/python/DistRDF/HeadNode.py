@@ -1,22 +1,26 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+import hashlib
 import logging
+import pickle
+import time
 import uuid
 import warnings
+from urllib.parse import urlparse
 
 from collections import Counter, deque
 from dataclasses import dataclass
-from functools import partial, singledispatch
+from functools import partial, reduce, singledispatch
 from itertools import zip_longest
-from typing import Callable, Deque, Dict, Iterable, List, Optional, TYPE_CHECKING, Union
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple, TYPE_CHECKING, Union
 
 import ROOT
 
-from DistRDF import ComputationGraphGenerator, Ranges, _graph_cache
+from DistRDF import ComputationGraphGenerator, Ranges, _checkpoint, _graph_cache, _metadata_cache, _profiling
 from DistRDF.Backends.Base import distrdf_mapper, distrdf_reducer
 from DistRDF.Node import Node
-from DistRDF.Operation import Action, InstantAction, Operation
+from DistRDF.Operation import Action, InstantAction, Operation, Snapshot
 from DistRDF.Backends import Utils
 
 if TYPE_CHECKING:
@@ -24,6 +28,19 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Keyword arguments of the distributed RDataFrame constructor that configure
+# the distributed execution. They are forwarded to the head node.
+EXECUTION_OPTIONS = ("scheduling", "reduction", "snapshot_merge_size", "profiling", "checkpoint_dir", "metadata_cache", "partitioning", "locality",
+                     "target_task_bytes", "target_task_duration")
+
+
+def pop_execution_options(kwargs: Dict) -> Dict:
+    """
+    Removes the options of the distributed execution from the keyword arguments
+    passed to the distributed RDataFrame constructor and returns them.
+    """
+    return {option: kwargs.pop(option) for option in EXECUTION_OPTIONS if option in kwargs}
+
 
 @singledispatch
 def _append_node_to_actions(operation: Operation, node: Node, actions: List[Node]) -> None:
@@ -71,11 +88,62 @@ class HeadNode(Node, ABC):
 
         node_counter: A counter of how many nodes were created in the graph of
             this head node, starting from zero.
+
+        scheduling: Either "static", where the dataset is split in exactly
+            `npartitions` tasks, or "dynamic", where the dataset is split in
+            many more smaller tasks that are handed out to the workers as they
+            become free, with backup execution of the slowest tasks.
+
+        reduction: Either "tree", where the results of the tasks are merged by
+            the backend, or "streaming", where the result of each task is
+            merged on the client as soon as the task finishes. In the latter
+            case, the partial results are available while the computation is
+            running and the execution can be stopped early, see
+            `ActionProxy.OnPartialResult`.
+
+        snapshot_merge_size: If not None, the partial output files of a
+            distributed Snapshot are merged by distributed tasks in files of at
+            most this size in bytes, and a manifest of the output is written.
+
+        profiling: Whether the tasks should record the time spent in each of
+            their phases. The timings of the last execution are then available
+            in the `profile` attribute.
+
+        profile: The timings of the tasks of the last execution, if profiling
+            was requested.
+
+        checkpoint_dir: If not None, the result of every completed task is
+            stored in this directory, which must be reachable from the
+            workers. If an execution fails, running the same graph again on
+            the same dataset only runs the tasks that did not complete. The
+            results stored for a graph are removed once it completes.
     """
 
-    def __init__(self, backend: BaseBackend, npartitions: Optional[int], localdf: ROOT.RDataFrame):
+    # In dynamic scheduling mode, how many tasks are created per partition
+    TASKS_PER_PARTITION_DYNAMIC: int = 8
+
+    def __init__(self, backend: BaseBackend, npartitions: Optional[int], localdf: ROOT.RDataFrame,
+                 scheduling: str = "static", reduction: str = "tree", snapshot_merge_size: Optional[int] = None,
+                 profiling: bool = False, checkpoint_dir: Optional[str] = None):
         super().__init__(lambda: self)
 
+        if scheduling not in ("static", "dynamic"):
+            raise ValueError(f"Unknown scheduling mode '{scheduling}'. Accepted values are 'static' and 'dynamic'.")
+        self.scheduling = scheduling
+
+        if reduction not in ("tree", "streaming"):
+            raise ValueError(f"Unknown reduction mode '{reduction}'. Accepted values are 'tree' and 'streaming'.")
+        self.reduction = reduction
+
+        if snapshot_merge_size is not None and snapshot_merge_size <= 0:
+            raise ValueError(f"The target size of the merged Snapshot files must be positive, got {snapshot_merge_size}.")
+        self.snapshot_merge_size = snapshot_merge_size
+        self.profiling = profiling
+        self.profile: Optional[_profiling.ExecutionProfile] = None
+        self.checkpoint_dir = checkpoint_dir
+        # Whether the last execution was stopped by a partial result callback
+        self._stopped_early: bool = False
+
         self.backend = backend
 
         self.node_counter: int = 0
@@ -95,6 +163,9 @@ class HeadNode(Node, ABC):
         self.rdf_uuid = uuid.uuid4()
         # The full identifier is created at the beginning of each execution
         self.exec_id: _graph_cache.ExecutionIdentifier = None
+        # Statistics of the reuse of jitted graphs on the workers, for the last
+        # execution
+        self.graph_cache_stats: Optional[_graph_cache.GraphCacheStats] = None
 
         # Internal attribute to keep track of the number of partitions. We also
         # check whether it was specified by the user when creating the dataframe.
@@ -119,6 +190,16 @@ class HeadNode(Node, ABC):
         if not self._user_specified_npartitions:
             self._npartitions = value
 
+    @property
+    def ntasks(self) -> int:
+        """
+        The number of tasks the dataset should be split in. With dynamic
+        scheduling, each partition is further split in smaller tasks.
+        """
+        if self.scheduling == "dynamic":
+            return self.npartitions * self.TASKS_PER_PARTITION_DYNAMIC
+        return self.npartitions
+
     def _prune_graph(self):
         """
         Prunes nodes from the graph under certain conditions. A node is pruned
@@ -139,6 +220,39 @@ class HeadNode(Node, ABC):
             _append_node_to_actions(node.operation, node, action_nodes)
         return action_nodes
 
+    def _has_side_effects(self) -> bool:
+        """
+        Whether running the same task twice would have visible effects, e.g.
+        writing the same Snapshot output file twice.
+        """
+        return any(isinstance(node.operation, Snapshot) for node in self.graph_nodes)
+
+    def _on_partial_result(self, action_nodes: List[Node], result: TaskResult, final: bool) -> bool:
+        """
+        Called on the client every time the result of a task has been merged
+        into the running result. Stores the partial result of every action
+        node and runs the callbacks registered by the user on it. A request to
+        stop is only honoured if `final` is False, i.e. if some tasks are still
+        pending, since nothing is cut short otherwise.
+
+        Returns:
+            True if any of the callbacks asked to stop the execution.
+        """
+        if result.mergeables is None:
+            # Only tasks with empty trees were merged so far
+            return False
+
+        stop = False
+        for node, mergeable in zip(action_nodes, result.mergeables):
+            node.partial_mergeable = mergeable
+            for callback in node.partial_result_callbacks:
+                # All callbacks are called, even if a previous one already
+                # asked to stop
+                stop = bool(callback(Utils.get_partial_value(mergeable))) or stop
+
+        self._stopped_early = stop and not final
+        return stop
+
     def _generate_graph_dict(self) -> Dict[int, Node]:
         """
         Generates a dictionary holding information about all nodes in the graph.
@@ -154,6 +268,42 @@ class HeadNode(Node, ABC):
         # serialization of the parent(s) of parent(s) nodes.
         return {node.node_id: node for node in reversed(self.graph_nodes)}
 
+    def _get_dataset_identity(self) -> List:
+        """
+        Returns the properties of the dataset that determine how the graph is
+        jitted, e.g. the types of its columns. Two graphs with the same
+        operations can share the jitted code only if these are the same.
+        """
+        return [type(self).__name__]
+
+    def _get_graph_hash(self, graph: Dict[int, Node]) -> Optional[str]:
+        """
+        Computes a hash of the operations of the computation graph and of the
+        dataset, so that workers can reuse a graph that was already jitted by a
+        previous execution with the same content. Returns None if the graph
+        cannot be hashed reliably, e.g. if some operation has a Python callable
+        among its arguments, whose code may change between executions.
+        """
+        operations = [
+            (node.operation.name, node.operation.args, node.operation.kwargs, node.parent_id)
+            for node in graph.values() if node.operation is not None
+        ]
+        if any(callable(arg) for _, args, kwargs, _ in operations for arg in list(args) + list(kwargs.values())):
+            return None
+        try:
+            content = pickle.dumps([self._get_dataset_identity(), operations])
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            logger.debug("The computation graph cannot be hashed, it will not be reused by the workers: %s", e)
+            return None
+        return hashlib.sha1(content).hexdigest()
+
+    def _record_execution_time(self, elapsed: float) -> None:
+        """
+        Called after an execution that processed the whole dataset, with the
+        time it took in seconds. Can be used to tune the following executions.
+        """
+        pass
+
     @abstractmethod
     def _build_ranges(self) -> List[Ranges.DataRange]:
         pass
@@ -166,7 +316,31 @@ class HeadNode(Node, ABC):
     def _handle_returned_values(self, values: TaskResult) -> Iterable:
         pass
 
-    def execute_graph(self) -> None:
+    def _get_checkpoint_store(self, headnodes: List[HeadNode]) -> _checkpoint.CheckpointStore:
+        """
+        Returns the store of the results of the tasks of the current execution.
+        The results are identified by the hash of the graphs and by the input
+        dataset, so that they are found by any later execution of the same
+        graphs. If the graphs cannot be hashed, results are only reused by
+        executions of the same dataframe.
+        """
+        graph_id = self.exec_id.graph_hash
+        if graph_id is None:
+            logger.warning("The computation graph cannot be hashed, its checkpoint can only be resumed by the "
+                           "same dataframe in the current session.")
+            graph_id = str(self.rdf_uuid)
+        content = repr([graph_id, [headnode._get_input_identity() for headnode in headnodes]])
+        return _checkpoint.CheckpointStore(self.checkpoint_dir, hashlib.sha1(content.encode()).hexdigest())
+
+    def _get_input_identity(self) -> List:
+        """
+        Returns the properties of the dataset that determine which entries are
+        read and which columns are available. The graphs of head nodes with the
+        same input identity can be executed in a single event loop.
+        """
+        return self._get_dataset_identity()
+
+    def execute_graph(self, fused_headnodes: Sequence[HeadNode] = ()) -> None:
         """
         Executes an RDataFrame computation graph on a distributed backend.
 
@@ -186,9 +360,20 @@ class HeadNode(Node, ABC):
         depending on the data source. Finally, the local user-facing nodes are
         filled with the values that were computed distributedly so that they
         can be accessed in the application like with local RDataFrame.
+
+        Args:
+            fused_headnodes: Head nodes of other graphs over the same dataset,
+                see `_get_input_identity`, to be executed in the same
+                distributed job. Each task runs all the graphs on its range with
+                a single event loop, so the input is read only once. The options
+                of the execution, e.g. the number of partitions, are the ones of
+                this head node. Not supported in optimized mode.
         """
         # Check if the workflow must be generated in optimized mode
         optimized = ROOT.RDF.Experimental.Distributed.optimized
+        if optimized and fused_headnodes:
+            raise RuntimeError("Fusing the execution of multiple graphs is not supported in optimized mode.")
+        headnodes = [self, *fused_headnodes]
 
         # Updates the number of partitions for this dataframe if the user did
         # not specify one initially. This is done each time the computations are
@@ -196,27 +381,96 @@ class HeadNode(Node, ABC):
         # between runs (e.g. changing the number of available cores).
         self.npartitions = self.backend.optimize_npartitions()
 
-        self.exec_id = _graph_cache.ExecutionIdentifier(self.rdf_uuid, uuid.uuid4())
+        graph_dicts = [headnode._generate_graph_dict() for headnode in headnodes]
+        graph_hashes = [headnode._get_graph_hash(graph_dict) for headnode, graph_dict in zip(headnodes, graph_dicts)]
+        if len(headnodes) == 1 or None in graph_hashes:
+            graph_hash = graph_hashes[0] if len(headnodes) == 1 else None
+        else:
+            graph_hash = hashlib.sha1("".join(graph_hashes).encode()).hexdigest()
+        self.exec_id = _graph_cache.ExecutionIdentifier(self.rdf_uuid, uuid.uuid4(), graph_hash)
 
         if optimized:
-            computation_graph_callable = partial(ComputationGraphGenerator.run_with_cppworkflow, self._generate_graph_dict())
+            computation_graph_callable = partial(ComputationGraphGenerator.run_with_cppworkflow, graph_dicts[0])
         else:
-            computation_graph_callable = partial(ComputationGraphGenerator.trigger_computation_graph, self._generate_graph_dict())
+            computation_graph_callable = partial(ComputationGraphGenerator.trigger_computation_graphs, graph_dicts)
 
         mapper = partial(distrdf_mapper,
                          build_rdf_from_range=self._generate_rdf_creator(),
                          computation_graph_callable=computation_graph_callable,
                          initialization_fn=self.backend.initialization,
-                         optimized=optimized)
+                         optimized=optimized,
+                         profiling=self.profiling)
+
+        # List of action nodes in the same order as values. The graph was
+        # already pruned when generating the graph dictionary.
+        local_nodes = [node for headnode in headnodes for node in headnode._get_action_nodes()]
+        on_partial_result = partial(self._on_partial_result, local_nodes)
+        self._stopped_early = False
+
+        ranges = self._build_ranges()
+        # Skip the tasks completed by a previous execution of the same graph
+        checkpoint = self._get_checkpoint_store(headnodes) if self.checkpoint_dir is not None else None
+        if checkpoint is not None:
+            ranges, completed = checkpoint.split_ranges(ranges)
+            mapper = partial(_checkpoint.checkpointing_mapper, checkpoint, mapper)
+            if completed:
+                logger.info("Resuming from the checkpoint in %s: %d of %d tasks already completed",
+                            checkpoint.directory, len(completed), len(completed) + len(ranges))
+        else:
+            completed = []
 
         # Execute graph distributedly and return the aggregated results from all
         # tasks
-        returned_values = self.backend.ProcessAndMerge(self._build_ranges(), mapper, distrdf_reducer)
-        # Perform any extra checks that may be needed according to the
-        # type of the head node
-        final_values = self._handle_returned_values(returned_values)
-        # List of action nodes in the same order as values
-        local_nodes = self._get_action_nodes()
+        start = time.perf_counter()
+        if not ranges:
+            returned_values = None
+        elif self.scheduling == "dynamic" or self.reduction == "streaming":
+            # Tasks that write output files must not run twice
+            speculative = (self.scheduling == "dynamic"
+                           and not any(headnode._has_side_effects() for headnode in headnodes))
+            returned_values = self.backend.ProcessAndMergeDynamic(
+                ranges, mapper, distrdf_reducer, speculative,
+                on_partial_result if self.reduction == "streaming" else None)
+        else:
+            returned_values = self.backend.ProcessAndMerge(ranges, mapper, distrdf_reducer)
+
+        if completed:
+            returned_values = reduce(distrdf_reducer, completed if returned_values is None
+                                     else [returned_values, *completed])
+
+        if self.reduction == "tree":
+            # The callbacks are still called once, with the final result
+            on_partial_result(returned_values, True)
+
+        self.graph_cache_stats = returned_values.graph_cache_stats
+        if self.graph_cache_stats is not None:
+            logger.debug("Tasks that reused a jitted computation graph: %d, that jitted it: %d",
+                         self.graph_cache_stats.hits, self.graph_cache_stats.misses)
+
+        if returned_values.timings is not None:
+            self.profile = _profiling.ExecutionProfile(returned_values.timings)
+            logger.info("Profile of the distributed execution:\n%s", self.profile.report())
+
+        for headnode in fused_headnodes:
+            headnode.exec_id = self.exec_id
+            headnode.graph_cache_stats = self.graph_cache_stats
+            headnode.profile = self.profile
+            headnode._stopped_early = self._stopped_early
+
+        if self._stopped_early:
+            # Not all the dataset was processed, skip the checks on the entries
+            logger.warning("The distributed execution was stopped early by a partial result callback, "
+                           "the results only include part of the dataset.")
+            final_values = returned_values.mergeables
+        else:
+            # Perform any extra checks that may be needed according to the
+            # type of the head node
+            final_values = self._handle_returned_values(returned_values)
+            if checkpoint is not None:
+                # All the results are available, the checkpoint is not needed
+                checkpoint.clear()
+            if not completed:
+                self._record_execution_time(time.perf_counter() - start)
         # Set the value of every action node
         for node, value in zip(local_nodes, final_values):
             Utils.set_value_on_node(value, node, self.backend)
@@ -225,12 +479,14 @@ class HeadNode(Node, ABC):
         return self._localdf.GetColumnNames()
 
 
-def get_headnode(backend: BaseBackend, npartitions: int, *args) -> HeadNode:
+def get_headnode(backend: BaseBackend, npartitions: int, *args, **kwargs) -> HeadNode:
     """
     A factory for different kinds of head nodes of the RDataFrame computation
     graph, depending on the arguments to the RDataFrame constructor. Currently
     can return a TreeHeadNode or an EmptySourceHeadNode. Parses the arguments and
-    compares them against the possible RDataFrame constructors.
+    compares them against the possible RDataFrame constructors. The keyword
+    arguments are options of the distributed execution, e.g. `scheduling`,
+    which are forwarded to the head node.
     """
 
     # Early check that arguments are accepted by RDataFrame
@@ -243,13 +499,13 @@ def get_headnode(backend: BaseBackend, npartitions: int, *args) -> HeadNode:
     firstarg = args[0]
     if isinstance(firstarg, int):
         # RDataFrame(ULong64_t numEntries)
-        return EmptySourceHeadNode(backend, npartitions, localdf, firstarg)
+        return EmptySourceHeadNode(backend, npartitions, localdf, firstarg, **kwargs)
     elif isinstance(firstarg, (ROOT.TTree, str)):
         # RDataFrame(std::string_view treeName, filenameglob, defaultBranches = {})
         # RDataFrame(std::string_view treename, filenames, defaultBranches = {})
         # RDataFrame(std::string_view treeName, dirPtr, defaultBranches = {})
         # RDataFrame(TTree &tree, const ColumnNames_t &defaultBranches = {})
-        return TreeHeadNode(backend, npartitions, localdf, *args)
+        return TreeHeadNode(backend, npartitions, localdf, *args, **kwargs)
     else:
         raise RuntimeError(
             ("First argument {} of type {} is not recognised as a supported "
@@ -258,6 +514,19 @@ def get_headnode(backend: BaseBackend, npartitions: int, *args) -> HeadNode:
                 "can be processed distributedly.").format(firstarg, type(firstarg)))
 
 
+def group_by_input(headnodes: Iterable[HeadNode]) -> List[List[HeadNode]]:
+    """
+    Groups the head nodes that process the same dataset on the same backend,
+    so that their graphs can be executed in a single distributed job. The order
+    of the head nodes is preserved within each group.
+    """
+    groups: Dict[str, List[HeadNode]] = {}
+    for headnode in headnodes:
+        key = repr([id(headnode.backend), headnode._get_input_identity()])
+        groups.setdefault(key, []).append(headnode)
+    return list(groups.values())
+
+
 class EmptySourceHeadNode(HeadNode):
     """
     The head node of a computation graph where the RDataFrame data source is
@@ -273,7 +542,8 @@ class EmptySourceHeadNode(HeadNode):
             for distributed execution.
     """
 
-    def __init__(self, backend: BaseBackend, npartitions: Optional[int], localdf: ROOT.RDataFrame, nentries: int):
+    def __init__(self, backend: BaseBackend, npartitions: Optional[int], localdf: ROOT.RDataFrame, nentries: int,
+                 **kwargs):
         """
         Creates a new RDataFrame instance for the given arguments.
 
@@ -282,11 +552,18 @@ class EmptySourceHeadNode(HeadNode):
 
             npartitions (int): The number of partitions the dataset will be
                 split in for distributed execution.
+
+            **kwargs (dict): Options of the distributed execution, forwarded
+                to the HeadNode constructor.
         """
-        super().__init__(backend, npartitions, localdf)
+        super().__init__(backend, npartitions, localdf, **kwargs)
 
         self.nentries = nentries
 
+    def _get_input_identity(self) -> List:
+        """The entries created depend on their number."""
+        return super()._get_input_identity() + [self.nentries]
+
     def _build_ranges(self) -> List[Ranges.DataRange]:
         """Build the ranges for this dataset."""
         # Empty datasets cannot be processed distributedly
@@ -303,7 +580,9 @@ class EmptySourceHeadNode(HeadNode):
                    "in the dataframe. Using {1} partition(s)".format(self.npartitions, self.nentries))
             warnings.warn(msg, UserWarning, stacklevel=2)
             self.npartitions = self.nentries
-        return Ranges.get_balanced_ranges(self.nentries, self.npartitions, self.exec_id)
+        # Dynamic scheduling could still ask for more tasks than entries
+        ntasks = min(self.ntasks, self.nentries)
+        return Ranges.get_balanced_ranges(self.nentries, ntasks, self.exec_id)
 
     def _generate_rdf_creator(self) -> Callable[[Ranges.DataRange], TaskObjects]:
         """
@@ -318,11 +597,10 @@ class EmptySourceHeadNode(HeadNode):
             """
             Builds an RDataFrame instance for a distributed mapper.
             """
-            if current_range.exec_id not in _graph_cache._RDF_REGISTER:
+            rdf_toprocess = _graph_cache.get_cached_rdf(current_range.exec_id)
+            if rdf_toprocess is None:
                 rdf_toprocess = ROOT.RDataFrame(nentries)
-                _graph_cache._RDF_REGISTER[current_range.exec_id] = rdf_toprocess
-            else:
-                rdf_toprocess = _graph_cache._RDF_REGISTER[current_range.exec_id]
+                _graph_cache.cache_rdf(current_range.exec_id, rdf_toprocess)
 
             ROOT.Internal.RDF.ChangeEmptyEntryRange(
                 ROOT.RDF.AsRNode(rdf_toprocess), (current_range.start, current_range.end))
@@ -371,9 +649,46 @@ class TreeHeadNode(HeadNode):
             information about friend trees of the dataset. Retrieved only if a
             TTree or TChain is passed to the constructor. Defaults to None.
 
+        metadata_cache (bool): Whether the entries and cluster boundaries of
+            the trees in the dataset should be retrieved once on the client,
+            through an index cached on local disk, and sent to the tasks
+            together with their ranges. Defaults to False, in which case each
+            task opens its files to retrieve them.
+
+        partitioning (str): How the work is balanced among the tasks. With
+            "files" (the default), every file is considered to hold the same
+            amount of work. With "entries" or "bytes", the tasks hold the same
+            amount of entries or compressed bytes respectively. The latter two
+            modes retrieve the metadata of the dataset on the client, as with
+            `metadata_cache`.
+
+        locality (dict, str, None): Optional hints about where the files are
+            stored. Either a dictionary from file name to an arbitrary label
+            (e.g. the storage element), or the string "url" to use the host in
+            the URL of each file as the label. Tasks never span files with
+            different labels.
+
+        target_task_bytes (int, None): If not None and the number of partitions
+            was not specified by the user, the number of tasks is computed from
+            the metadata of the dataset, so that each task reads about this
+            amount of compressed bytes. In any case, each core of the cluster
+            gets a few tasks, to balance the work left by stragglers, and each
+            task is made of whole clusters, so that no task is empty.
+
+        target_task_duration (float, None): Same as `target_task_bytes`, but
+            targeting a duration in seconds of each task. The amount of bytes
+            this corresponds to is estimated from the throughput measured in
+            the previous execution of this dataframe. The first execution only
+            balances the tasks among the cores.
+
     """
 
-    def __init__(self, backend: BaseBackend, npartitions: Optional[int], localdf: ROOT.RDataFrame, *args):
+    PARTITIONING_MODES = ("files", "entries", "bytes")
+
+    def __init__(self, backend: BaseBackend, npartitions: Optional[int], localdf: ROOT.RDataFrame, *args,
+                 metadata_cache: bool = False, partitioning: str = "files",
+                 locality: Optional[Union[Dict[str, str], str]] = None, target_task_bytes: Optional[int] = None,
+                 target_task_duration: Optional[float] = None, **kwargs):
         """
         Creates a new RDataFrame instance for the given arguments.
 
@@ -382,10 +697,31 @@ class TreeHeadNode(HeadNode):
 
             npartitions (int): The number of partitions the dataset will be
                 split in for distributed execution.
+
+            **kwargs (dict): Options of the distributed execution, forwarded
+                to the HeadNode constructor.
         """
-        super().__init__(backend, npartitions, localdf)
+        super().__init__(backend, npartitions, localdf, **kwargs)
 
         self.defaultbranches = None
+        self.metadata_cache = metadata_cache
+        if partitioning not in self.PARTITIONING_MODES:
+            raise ValueError(f"Unknown partitioning mode '{partitioning}'. "
+                             f"Accepted values are {', '.join(self.PARTITIONING_MODES)}.")
+        self.partitioning = partitioning
+        if isinstance(locality, str) and locality != "url":
+            raise ValueError(f"Unknown locality hint '{locality}'. Accepted values are 'url' or a dictionary "
+                             "from file name to location.")
+        self.locality = locality
+        for name, value in (("target_task_bytes", target_task_bytes), ("target_task_duration", target_task_duration)):
+            if value is not None and value <= 0:
+                raise ValueError(f"The option '{name}' must be positive, got {value}.")
+        self.target_task_bytes = target_task_bytes
+        self.target_task_duration = target_task_duration
+        # Compressed bytes processed per second by each core in the previous
+        # execution, used to convert the target task duration into bytes
+        self._throughput_per_core: Optional[float] = None
+        self._last_scan: Optional[Tuple[int, int]] = None
         # Information about friend trees, if they are present.
         self.friendinfo: Optional[ROOT.Internal.TreeUtils.RFriendInfo] = None
 
@@ -436,6 +772,24 @@ class TreeHeadNode(HeadNode):
         self.subtreenames = [str(treename) for treename in ROOT.Internal.TreeUtils.GetTreeFullPaths(self.tree)]
         self.inputfiles = [str(filename) for filename in ROOT.Internal.TreeUtils.GetFileNamesFromTree(self.tree)]
 
+    def _get_dataset_identity(self) -> List:
+        """
+        The column types depend on the trees being read, including the friend
+        trees.
+        """
+        friendfiles = ([[str(filename) for filename in filenames] for filenames in self.friendinfo.fFriendFileNames]
+                       if self.friendinfo is not None else [])
+        return super()._get_dataset_identity() + [self.subtreenames, self.inputfiles, friendfiles]
+
+    def _get_input_identity(self) -> List:
+        """
+        The available columns also depend on the names the friend trees are
+        attached with.
+        """
+        friendnames = ([[str(name), str(alias)] for name, alias in self.friendinfo.fFriendNames]
+                       if self.friendinfo is not None else [])
+        return super()._get_input_identity() + [friendnames]
+
     def _build_ranges(self) -> List[Ranges.DataRange]:
         """Build the ranges for this dataset."""
         logger.debug("Building ranges from dataset info:\n"
@@ -443,7 +797,41 @@ class TreeHeadNode(HeadNode):
                      "names of subtrees: %s\n"
                      "input files: %s\n", self.maintreename, self.subtreenames, self.inputfiles)
 
-        if logger.isEnabledFor(logging.DEBUG):
+        # The number of tasks is computed from the dataset only if the user did
+        # not ask for a specific number of partitions
+        autopartitioning = (not self._user_specified_npartitions and
+                            (self.target_task_bytes is not None or self.target_task_duration is not None))
+
+        # Retrieve entries and cluster boundaries of all trees only once for
+        # the whole execution, instead of once per task
+        metadata = (_metadata_cache.get_trees_metadata(self.subtreenames, self.inputfiles)
+                    if self.metadata_cache or self.partitioning != "files" or autopartitioning else None)
+
+        if self.partitioning == "entries":
+            weights = [treemetadata.entries for treemetadata in metadata]
+        elif self.partitioning == "bytes" or autopartitioning:
+            weights = [treemetadata.zipbytes for treemetadata in metadata]
+        else:
+            weights = None
+
+        if self.locality == "url":
+            locations = [urlparse(filename).netloc for filename in self.inputfiles]
+        elif self.locality is not None:
+            locations = [self.locality.get(filename, "") for filename in self.inputfiles]
+        else:
+            locations = None
+
+        ntasks = self._get_auto_ntasks(metadata) if autopartitioning else self.ntasks
+
+        if metadata is not None:
+            # The metadata is already available, the check is cheap
+            nclusters = sum(len(treemetadata.clusters) - 1 for treemetadata in metadata)
+            if ntasks > nclusters:
+                logger.warning(
+                    "The number of tasks (%d) is higher than the number of clusters in the dataset (%d). "
+                    "Some tasks will be doing no work. Consider setting the 'npartitions' parameter of the "
+                    "RDataFrame constructor to a lower value, or the 'target_task_bytes' option.", ntasks, nclusters)
+        elif logger.isEnabledFor(logging.DEBUG):
             # Compute clusters and entries of the first tree in the dataset.
             # This will call once TFile::Open, but we pay this cost to get an estimate
             # on whether the number of requested partitions is reasonable.
@@ -453,14 +841,45 @@ class TreeHeadNode(HeadNode):
             clusters, entries = Ranges.get_clusters_and_entries(self.subtreenames[0], self.inputfiles[0])
             # The file could contain an empty tree. In that case, the estimate will not be computed.
             if entries > 0:
-                partitionsperfile = self.npartitions / len(self.inputfiles)
+                partitionsperfile = ntasks / len(self.inputfiles)
                 if partitionsperfile > len(clusters):
                     logger.debug(
                         "The number of requested partitions could be higher than the maximum amount of "
                         "chunks the dataset can be split in. Some tasks could be doing no work. Consider "
                         "setting the 'npartitions' parameter of the RDataFrame constructor to a lower value.")
 
-        return Ranges.get_percentage_ranges(self.subtreenames, self.inputfiles, self.npartitions, self.friendinfo, self.exec_id)
+        logger.info("Partitioning %d files with mode '%s', locality hints %s",
+                    len(self.inputfiles), self.partitioning, "enabled" if locations is not None else "disabled")
+
+        return Ranges.get_percentage_ranges(self.subtreenames, self.inputfiles, ntasks, self.friendinfo,
+                                            self.exec_id, metadata, weights, locations,
+                                            cluster_aligned=autopartitioning)
+
+    def _get_auto_ntasks(self, metadata: List[_metadata_cache.TreeMetadata]) -> int:
+        """
+        Computes the number of tasks from the metadata of the dataset, the
+        number of cores available and the target size or duration of the tasks.
+        """
+        ncores = self.npartitions
+        target_bytes = self.target_task_bytes
+        if self.target_task_duration is not None and self._throughput_per_core is not None:
+            duration_bytes = self.target_task_duration * self._throughput_per_core
+            target_bytes = min(target_bytes, duration_bytes) if target_bytes is not None else duration_bytes
+        tasks_per_core = (self.TASKS_PER_PARTITION_DYNAMIC if self.scheduling == "dynamic"
+                          else Ranges.AUTO_TASKS_PER_CORE)
+
+        ntasks = Ranges.get_auto_ntasks(metadata, ncores, tasks_per_core, target_bytes)
+        totalbytes = sum(treemetadata.zipbytes for treemetadata in metadata)
+        self._last_scan = (totalbytes, ncores)
+        logger.info("Automatic partitioning: %d tasks on %d cores, %.1f MB per task", ntasks, ncores,
+                    totalbytes / ntasks / 1e6)
+        return ntasks
+
+    def _record_execution_time(self, elapsed: float) -> None:
+        """Measures the throughput of the cores, if the dataset size is known."""
+        if self._last_scan is not None and elapsed > 0:
+            totalbytes, ncores = self._last_scan
+            self._throughput_per_core = totalbytes / (elapsed * ncores)
 
     def _generate_rdf_creator(self) -> Callable[[Ranges.DataRange], TaskObjects]:
         """
@@ -514,13 +933,14 @@ class TreeHeadNode(HeadNode):
 
             attach_friend_info_if_present(clustered_range, ds)
 
-            if current_range.exec_id not in _graph_cache._RDF_REGISTER:
+            # Retrieve an RDataFrame with an identical graph from the cache,
+            # possibly built by a previous execution in this process
+            rdf_toprocess = _graph_cache.get_cached_rdf(current_range.exec_id)
+            if rdf_toprocess is None:
                 rdf_toprocess = ROOT.RDataFrame(ds)
                 # Fill the cache with the new RDataFrame
-                _graph_cache._RDF_REGISTER[current_range.exec_id] = rdf_toprocess
+                _graph_cache.cache_rdf(current_range.exec_id, rdf_toprocess)
             else:
-                # Retrieve an already present RDataFrame from the cache
-                rdf_toprocess = _graph_cache._RDF_REGISTER[current_range.exec_id]
                 # Update it to the range of entries for this task
                 ROOT.Internal.RDF.ChangeSpec(ROOT.RDF.AsRNode(rdf_toprocess), ROOT.std.move(ds))
 
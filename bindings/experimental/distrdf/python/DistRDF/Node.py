@@ -12,7 +12,7 @@
 from __future__ import annotations
 
 import logging
-from typing import Callable, Optional, TYPE_CHECKING
+from typing import Any, Callable, List, Optional, TYPE_CHECKING
 
 # Type hints only
 if TYPE_CHECKING:
@@ -62,6 +62,15 @@ class Node(object):
             distributed task. It is a transient attribute. On the client, it
             is always None. The value is computed and stored only during a task
             on a worker.
+
+        partial_result_callbacks: Functions registered by the user through
+            `ActionProxy.OnPartialResult`. They are called on the client with
+            the partial value of this action every time the result of a
+            distributed task is merged. Never serialized.
+
+        partial_mergeable: The result of this action merged from the tasks
+            that finished so far. Only set on the client during or after the
+            distributed execution.
     """
 
     def __init__(self, get_head: Callable[[], HeadNode], node_id: int = 0,
@@ -75,6 +84,8 @@ class Node(object):
         self.value = None
         self.has_user_references: bool = True
         self.rdf_node = None
+        self.partial_result_callbacks: List[Callable[[Any], Optional[bool]]] = []
+        self.partial_mergeable = None
 
         # This is the internal attribute for the 'parent_id' property. It is
         # serialized from the local information then deserialized and set in a
@@ -15,12 +15,13 @@ import logging
 from abc import ABC, abstractmethod
 from contextlib import contextmanager
 from functools import singledispatch
-from typing import Any, List, Optional, Union
+from typing import Any, Callable, List, Optional, Union
 
 import ROOT
 
 from DistRDF import Operation
 from DistRDF.Node import Node
+from DistRDF.Backends import Utils
 
 logger = logging.getLogger(__name__)
 
@@ -57,6 +58,20 @@ def execute_graph(node: Node) -> None:
             node.get_head().execute_graph()
 
 
+def execute_fused_graphs(nodes: List[Node]) -> None:
+    """
+    Executes the distributed RDataFrame computation graphs the input nodes
+    belong to in a single distributed job. The graphs must process the same
+    dataset, see `HeadNode.group_by_input`. Graphs that already have a value
+    are skipped.
+    """
+    headnodes = [node.get_head() for node in nodes if node.value is None]
+    if not headnodes:
+        return
+    with _managed_tcontext():
+        headnodes[0].execute_graph(headnodes[1:])
+
+
 def _create_new_node(parent: Node, operation: Operation.Operation) -> Node:
     """Creates a new node and inserts it in the computation graph"""
 
@@ -190,6 +205,38 @@ class ActionProxy(Proxy):
         execute_graph(self.proxied_node)
         return self.proxied_node.value
 
+    def OnPartialResult(self, callback: Callable[[Any], Optional[bool]]) -> ActionProxy:
+        """
+        Registers a function that is called on the client with the partial
+        value of this action every time the result of a distributed task is
+        merged, that is the value computed on the part of the dataset that was
+        processed so far. This is the distributed counterpart of
+        `RResultPtr::OnPartialResult`. Callbacks are called at every task only
+        if the RDataFrame was created with `reduction="streaming"`, otherwise
+        they are called once with the final value.
+
+        If the callback returns True while tasks are still pending, these are
+        cancelled and the value of the action is the one computed on the
+        processed part of the dataset. The return value is ignored when the
+        callback is called with the final value.
+
+        Returns:
+            This proxy, so that calls can be chained.
+        """
+        self.proxied_node.partial_result_callbacks.append(callback)
+        return self
+
+    def GetPartialValue(self):
+        """
+        Returns the value of this action computed from the distributed tasks
+        that finished so far, without triggering the execution. Returns the
+        final value if the execution is over, or None if no task has finished.
+        """
+        if self.proxied_node.value is not None:
+            return self.proxied_node.value
+        mergeable = self.proxied_node.partial_mergeable
+        return Utils.get_partial_value(mergeable) if mergeable is not None else None
+
     def _call_action_result(self, *args, **kwargs):
         """
         Handles an operation call to the current action node and returns
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Union, List, TYPE_CHECKING
+from typing import Union, List, Optional, TYPE_CHECKING
 
 import ROOT
 from ROOT._pythonization._rdataframe import AsNumpyResult
@@ -15,9 +15,13 @@ class SnapshotResult(object):
     merge it with other objects of this type.
     """
 
-    def __init__(self, treename: str, filenames: List[str], resultptr: ROOT.RDF.RResultPtr = None) -> None:
+    def __init__(self, treename: str, filenames: List[str], resultptr: ROOT.RDF.RResultPtr = None,
+                 bytes_written: Optional[List[int]] = None) -> None:
         self.treename = treename
         self.filenames = filenames
+        # The size of each file in `filenames`, filled on the worker once the
+        # file has been written
+        self.bytes_written = bytes_written if bytes_written is not None else []
         # Transient attribute, it will be discarded before the end of the mapper
         # function (in `Utils.get_mergeablevalue`) so that we don't incur in
         # serialization of the RResultPtr
@@ -28,9 +32,10 @@ class SnapshotResult(object):
         When calling Snapshot on a distributed worker, a list with the path to
         the snapshotted file on the worker is stored. This function extends the
         list of the current object with the elements from the list of the other
-        object.
+        object, together with the sizes of the files.
         """
         self.filenames.extend(other.filenames)
+        self.bytes_written.extend(other.bytes_written)
 
     def GetValue(self, backend: BaseBackend):
         """
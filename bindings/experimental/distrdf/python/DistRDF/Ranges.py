@@ -2,20 +2,26 @@ from __future__ import annotations
 
 import logging
 
-from bisect import bisect_left
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass, field
 from itertools import accumulate
-from math import floor
+from math import ceil, floor
 
-from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+from typing import Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from DistRDF._graph_cache import ExecutionIdentifier
+    from DistRDF._metadata_cache import TreeMetadata
 
 import ROOT
 
 logger = logging.getLogger(__name__)
 
+# Number of tasks per core created by the automatic partitioning by default, so
+# that the cores that finish early can take over the work left by the slowest
+# tasks
+AUTO_TASKS_PER_CORE = 3
+
 
 @dataclass
 class DataRange:
@@ -73,6 +79,10 @@ class TreeRangePerc(DataRange):
     friendinfo: Information about friend trees of the chain built for this
         range. Not None if the user provided a TTree or TChain in the
         distributed RDataFrame constructor.
+
+    metadata: Entries and cluster boundaries of each tree in `treenames`, if
+        they were already retrieved on the client. Otherwise None, and the
+        task will open the files to retrieve them.
     """
     treenames: List[str]
     filenames: List[str]
@@ -81,6 +91,7 @@ class TreeRangePerc(DataRange):
     first_tree_start_perc: float
     last_tree_end_perc: float
     friendinfo: Optional[ROOT.Internal.TreeUtils.RFriendInfo]
+    metadata: Optional[List[TreeMetadata]] = None
 
 
 @dataclass
@@ -172,49 +183,273 @@ def get_balanced_ranges(nentries, npartitions, exec_id: ExecutionIdentifier):
     return ranges
 
 
+def get_tree_clusters_and_entries(ttree: ROOT.TTree) -> Tuple[List[int], int]:
+    """
+    Retrieve cluster boundaries and number of entries of an already open TTree.
+    """
+    entries: int = ttree.GetEntriesFast()
+
+    it = ttree.GetClusterIterator(0)
+    cluster_startentry: int = it()
+    clusters: List[int] = [cluster_startentry]
+
+    while cluster_startentry < entries:
+        cluster_startentry = it()
+        clusters.append(cluster_startentry)
+
+    return clusters, entries
+
+
 def get_clusters_and_entries(treename: str, filename: str) -> Tuple[List[int], int]:
     """
     Retrieve cluster boundaries and number of entries of a TTree.
     """
 
     with ROOT.TFile.Open(filename, "READ_WITHOUT_GLOBALREGISTRATION") as tfile:
-        ttree = tfile.Get(treename)
+        clusters, entries = get_tree_clusters_and_entries(tfile.Get(treename))
 
-        entries: int = ttree.GetEntriesFast()
+    return clusters, entries
 
-        it = ttree.GetClusterIterator(0)
-        cluster_startentry: int = it()
-        clusters: List[int] = [cluster_startentry]
 
-        while cluster_startentry < entries:
-            cluster_startentry = it()
-            clusters.append(cluster_startentry)
+def get_weighted_boundaries(weights: List[float], npartitions: int) -> List[Tuple[int, float]]:
+    """
+    Splits a list of files in `npartitions` chunks with the same total weight.
+    The weight of a file can be e.g. the number of entries or the number of
+    bytes of the tree stored in it. Within a file, the weight is assumed to be
+    uniformly distributed across the entries.
 
-    return clusters, entries
+    Returns:
+        A list of `npartitions + 1` boundaries. Each boundary is a pair with the
+        index of a file and the percentage of that file at which the boundary
+        lies. The first boundary is always (0, 0.) and the last one is always
+        (len(weights), 0.).
+    """
+    nfiles = len(weights)
+    total = sum(weights)
+    if total <= 0:
+        # All files are empty, fall back to splitting them by their number
+        weights = [1] * nfiles
+        total = nfiles
+
+    # Cumulative weight at the beginning of each file, plus the total weight.
+    # See get_clustered_range_from_percs for why 'initial' is not used.
+    cumulative = tuple(accumulate((0,) + tuple(weights)))
+
+    boundaries = [(0, 0.)]
+    for i in range(1, npartitions):
+        target = total * i / npartitions
+        # Last file that begins before the target weight. Files with zero
+        # weight are skipped, they will be included in the previous task.
+        file_idx = min(bisect_right(cumulative, target) - 1, nfiles - 1)
+        perc = (target - cumulative[file_idx]) / weights[file_idx] if weights[file_idx] > 0 else 0.
+        boundaries.append((file_idx, perc))
+    boundaries.append((nfiles, 0.))
+
+    return boundaries
+
+
+def get_auto_ntasks(metadata: List[TreeMetadata], ncores: int, tasks_per_core: int = AUTO_TASKS_PER_CORE,
+                    target_bytes: Optional[float] = None) -> int:
+    """
+    Computes the number of tasks for a dataset, given the cores available.
+    Every core gets `tasks_per_core` tasks at least, so that the cores that
+    finish early can take over the work left by stragglers. If a target amount
+    of compressed bytes per task is given, more tasks are created to match it,
+    rounded up to a multiple of the number of cores so that all the cores stay
+    busy until the end. The number of tasks never exceeds the number of
+    clusters in the dataset, so that no task is empty.
+    """
+    nclusters = sum(len(tree.clusters) - 1 for tree in metadata)
+    ntasks = ncores * tasks_per_core
+    if target_bytes:
+        totalbytes = sum(tree.zipbytes for tree in metadata)
+        ntasks = max(ntasks, ceil(totalbytes / target_bytes))
+        ntasks = ceil(ntasks / ncores) * ncores
+    return max(1, min(ntasks, nclusters))
+
+
+def get_cluster_boundaries(metadata: List[TreeMetadata], weights: List[float],
+                           npartitions: int) -> List[Tuple[int, float]]:
+    """
+    Same as `get_weighted_boundaries`, but the chunks are made of whole
+    clusters, so that every chunk holds at least one cluster and no task is
+    empty. The weight of a file is distributed among its clusters according to
+    their number of entries. Fewer than `npartitions` chunks are created if
+    there are not enough clusters.
+    """
+    nfiles = len(metadata)
+    # The file, first entry and weight of every non-empty cluster
+    clusters = [
+        (file_idx, start, weight * (end - start) / tree.entries)
+        for file_idx, (tree, weight) in enumerate(zip(metadata, weights))
+        for start, end in zip(tree.clusters[:-1], tree.clusters[1:])
+        if end > start
+    ]
+    if not clusters:
+        return [(0, 0.), (nfiles, 0.)]
+
+    nchunks = min(npartitions, len(clusters))
+    # Weight before each cluster, plus the total weight
+    cumulative = tuple(accumulate((0,) + tuple(weight for _, _, weight in clusters)))
+    total = cumulative[-1]
+
+    boundaries = [(0, 0.)]
+    previous = 0
+    for i in range(1, nchunks):
+        target = total * i / nchunks
+        # Cluster boundary closest to the target weight
+        idx = bisect_left(cumulative, target)
+        if idx > 0 and target - cumulative[idx - 1] < cumulative[idx] - target:
+            idx -= 1
+        # At least one cluster in this chunk and in each of the following ones
+        idx = min(max(idx, previous + 1), len(clusters) - (nchunks - i))
+        previous = idx
+
+        file_idx, start, _ = clusters[idx]
+        # Place the boundary in the middle of the first entry of the cluster,
+        # so that it is not moved to the previous entry by rounding errors
+        # when the tasks convert it back to an entry number
+        boundaries.append((file_idx, (start + 0.5) / metadata[file_idx].entries if start > 0 else 0.))
+    boundaries.append((nfiles, 0.))
+
+    return boundaries
+
+
+def get_locality_boundaries(weights: List[float], locations: List[str], npartitions: int,
+                            split: Optional[Callable[[int, int, int], List[Tuple[int, float]]]] = None
+                            ) -> List[Tuple[int, float]]:
+    """
+    Same as `get_weighted_boundaries`, but no chunk spans files with different
+    locations. Contiguous files with the same location form a group, each group
+    gets a number of chunks proportional to its weight, with at least one chunk
+    per group. Thus, more than `npartitions` chunks may be created if there are
+    more groups than partitions.
+
+    The files of each group are split by `split(start, end, nchunks)`, which
+    receives the indexes of the first and one past the last file of the group.
+    Defaults to `get_weighted_boundaries`.
+    """
+    if split is None:
+        def split(start, end, nchunks):
+            return get_weighted_boundaries(weights[start:end], nchunks)
+
+    # Find the (start, end) file indexes of each group of contiguous files with
+    # the same location
+    groups: List[Tuple[int, int]] = []
+    start = 0
+    for idx in range(1, len(locations) + 1):
+        if idx == len(locations) or locations[idx] != locations[start]:
+            groups.append((start, idx))
+            start = idx
+
+    group_weights = [sum(weights[s:e]) for s, e in groups]
+    total = sum(group_weights)
+    shares = ([npartitions * w / total for w in group_weights] if total > 0
+              else [npartitions * (e - s) / len(locations) for s, e in groups])
+    # Largest remainder apportionment of the chunks among the groups
+    chunks = [max(1, floor(share)) for share in shares]
+    leftover = npartitions - sum(chunks)
+    by_remainder = sorted(range(len(groups)), key=lambda i: shares[i] - floor(shares[i]), reverse=True)
+    for i in by_remainder[:max(0, leftover)]:
+        chunks[i] += 1
+
+    boundaries = [(0, 0.)]
+    for (s, e), nchunks in zip(groups, chunks):
+        group_boundaries = split(s, e, nchunks)
+        boundaries.extend((s + file_idx, perc) for file_idx, perc in group_boundaries[1:])
+
+    return boundaries
+
+
+def log_partitioning_plan(filenames: List[str], files_of_percentages: List[int],
+                          percentages_wrt_files: List[float], weights: Optional[List[float]]) -> None:
+    """
+    Logs how the files are split among the tasks: a summary of the amount of
+    work per task and, at debug level, the boundaries of each task. The amount
+    of work is measured in the same units of the weights, or in number of files
+    if no weights are provided.
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return
+
+    weights = weights if weights is not None else [1] * len(filenames)
+    cumulative = tuple(accumulate((0,) + tuple(weights)))
+
+    def position(file_idx: int, perc: float) -> float:
+        # Amount of work before the boundary
+        return cumulative[file_idx] + (perc * weights[file_idx] if file_idx < len(weights) else 0)
+
+    positions = [position(f, p) for f, p in zip(files_of_percentages, percentages_wrt_files)]
+    work = [end - start for start, end in zip(positions[:-1], positions[1:])]
+
+    logger.info("Partitioning plan: %d tasks over %d files, work per task min %.1f, max %.1f, mean %.1f",
+                len(work), len(filenames), min(work), max(work), sum(work) / len(work))
+
+    for task_id, task_work in enumerate(work):
+        logger.debug("Task %d: from file %d at %.3f to file %d at %.3f, work %.1f", task_id,
+                     files_of_percentages[task_id], percentages_wrt_files[task_id],
+                     files_of_percentages[task_id + 1], percentages_wrt_files[task_id + 1], task_work)
 
 
 def get_percentage_ranges(treenames: List[str], filenames: List[str], npartitions: int,
                           friendinfo: Optional[ROOT.Internal.TreeUtils.RFriendInfo],
-                          exec_id: ExecutionIdentifier) -> List[TreeRangePerc]:
+                          exec_id: ExecutionIdentifier,
+                          metadata: Optional[List[TreeMetadata]] = None,
+                          weights: Optional[List[float]] = None,
+                          locations: Optional[List[str]] = None,
+                          cluster_aligned: bool = False) -> List[TreeRangePerc]:
     """
     Create a list of tasks that will process the given trees partitioning them
-    by percentages.
+    by percentages. If the metadata of the trees is provided, it is attached to
+    the tasks so that they do not need to open the files to compute the
+    clustered ranges.
+
+    By default every file is considered to hold the same amount of work. If
+    `weights` is provided, the tasks are balanced according to the weight of
+    each file instead (see `get_weighted_boundaries`). If `locations` is
+    provided, no task spans files with different locations (see
+    `get_locality_boundaries`), which may lead to more than `npartitions`
+    tasks. If `cluster_aligned` is True, the metadata must be provided and the
+    tasks are made of whole clusters (see `get_cluster_boundaries`), which may
+    lead to fewer than `npartitions` tasks but never to empty ones.
     """
     nfiles = len(filenames)
-    files_per_partition = nfiles / npartitions
-    # Given a number of files, partition them in npartitions, considering each
-    # file as splittable in percentages [0, 1]. Gather:
-    # 1. A list of percentages according to how many partitions are required.
-    # 2. The corresponding list of file boundaries, as integers.
-    # 3. The difference between the two above, to know to which percentage of
-    #    a specific file any element of the first list belongs.
-    # Example with nfiles = 10 and npartitions = 7
-    # percentages = [0., 1.428, 2.857, 4.285, 5.714, 7.142, 8.571, 10.]
-    # files_of_percentages = [0, 1, 2, 4, 5, 7, 8, 10]
-    # percentages_wrt_files = [0., 0.428, 0.857, 0.285, 0.714, 0.142, 0.571, 0.]
-    percentages = [files_per_partition * i for i in range(npartitions+1)]
-    files_of_percentages = [floor(percentage) for percentage in percentages]
-    percentages_wrt_files = [perc - file for perc, file in zip(percentages, files_of_percentages)]
+    if weights is None and locations is None and not cluster_aligned:
+        files_per_partition = nfiles / npartitions
+        # Given a number of files, partition them in npartitions, considering each
+        # file as splittable in percentages [0, 1]. Gather:
+        # 1. A list of percentages according to how many partitions are required.
+        # 2. The corresponding list of file boundaries, as integers.
+        # 3. The difference between the two above, to know to which percentage of
+        #    a specific file any element of the first list belongs.
+        # Example with nfiles = 10 and npartitions = 7
+        # percentages = [0., 1.428, 2.857, 4.285, 5.714, 7.142, 8.571, 10.]
+        # files_of_percentages = [0, 1, 2, 4, 5, 7, 8, 10]
+        # percentages_wrt_files = [0., 0.428, 0.857, 0.285, 0.714, 0.142, 0.571, 0.]
+        percentages = [files_per_partition * i for i in range(npartitions+1)]
+        files_of_percentages = [floor(percentage) for percentage in percentages]
+        percentages_wrt_files = [perc - file for perc, file in zip(percentages, files_of_percentages)]
+    else:
+        # Same information as above, but the boundaries are placed according
+        # to the weight of each file
+        weights = weights if weights is not None else [1] * nfiles
+        if cluster_aligned:
+            def split(start, end, nchunks):
+                return get_cluster_boundaries(metadata[start:end], weights[start:end], nchunks)
+        else:
+            def split(start, end, nchunks):
+                return get_weighted_boundaries(weights[start:end], nchunks)
+        if locations is not None:
+            boundaries = get_locality_boundaries(weights, locations, npartitions, split)
+        else:
+            boundaries = split(0, nfiles, npartitions)
+        files_of_percentages = [file_idx for file_idx, _ in boundaries]
+        percentages_wrt_files = [perc for _, perc in boundaries]
+        # The locality constraint or the clusters may have changed the number
+        # of tasks
+        npartitions = len(boundaries) - 1
+
+    log_partitioning_plan(filenames, files_of_percentages, percentages_wrt_files, weights)
 
     # Compute which files are to be considered for the various tasks
     # The indexes of starting files in each task are simply the list of files
@@ -246,7 +481,7 @@ def get_percentage_ranges(treenames: List[str], filenames: List[str], npartition
         return [
             TreeRangePerc(
                 exec_id, rangeid, treenames, filenames, start_sample_idxs[rangeid], end_sample_idxs[rangeid],
-                first_tree_start_perc_tasks[rangeid], last_tree_end_perc_tasks[rangeid], friendinfo)
+                first_tree_start_perc_tasks[rangeid], last_tree_end_perc_tasks[rangeid], friendinfo, metadata)
             for rangeid in range(npartitions)
         ]
     else:
@@ -256,6 +491,8 @@ def get_percentage_ranges(treenames: List[str], filenames: List[str], npartition
         # from the full list of filenames.
         tasktreenames = [treenames[s:e] for s, e in zip(start_sample_idxs, end_sample_idxs)]
         taskfilenames = [filenames[s:e] for s, e in zip(start_sample_idxs, end_sample_idxs)]
+        taskmetadata = ([metadata[s:e] for s, e in zip(start_sample_idxs, end_sample_idxs)]
+                        if metadata is not None else [None] * npartitions)
         # On the other hand, when creating the TreeRangePerc tasks below, the
         # starting and ending indexes have to be task-local. In practice, the
         # task always starts from file index 0 and it always ends at file index
@@ -263,7 +500,8 @@ def get_percentage_ranges(treenames: List[str], filenames: List[str], npartition
         return [
             TreeRangePerc(
                 exec_id, rangeid, tasktreenames[rangeid], taskfilenames[rangeid], 0, len(taskfilenames[rangeid]),
-                first_tree_start_perc_tasks[rangeid], last_tree_end_perc_tasks[rangeid], friendinfo
+                first_tree_start_perc_tasks[rangeid], last_tree_end_perc_tasks[rangeid], friendinfo,
+                taskmetadata[rangeid]
             )
             for rangeid in range(npartitions)
         ]
@@ -341,11 +579,17 @@ def get_clustered_range_from_percs(percrange: TreeRangePerc) -> Tuple[Optional[T
 
     # Retrieve information from the trees assigned to this task. In case there
     # are friends, all files in the dataset are opened and their number of
-    # entries are retrieved in order to ensure friend alignment.
-    all_clusters_entries = (
-        get_clusters_and_entries(treename, filename)
-        for treename, filename in zip(percrange.treenames, percrange.filenames)
-    )
+    # entries are retrieved in order to ensure friend alignment. If the
+    # information was already gathered on the client, no file is opened.
+    if percrange.metadata is not None:
+        all_clusters_entries = (
+            (treemetadata.clusters, treemetadata.entries) for treemetadata in percrange.metadata
+        )
+    else:
+        all_clusters_entries = (
+            get_clusters_and_entries(treename, filename)
+            for treename, filename in zip(percrange.treenames, percrange.filenames)
+        )
     all_clusters, all_entries = zip(*all_clusters_entries)
     # Computing the offset of each tree is a cumulative sum over the entries in
     # the dataset. The initial offset is zero, so we define it in the following
@@ -17,12 +17,13 @@ import types
 
 import concurrent.futures
 
-from typing import TYPE_CHECKING
+from typing import Optional, TYPE_CHECKING
 
 from DistRDF.Backends import build_backends_submodules
 
 if TYPE_CHECKING:
-    from DistRDF.Proxy import ActionProxy, VariationsProxy
+    from DistRDF._profiling import ExecutionProfile
+    from DistRDF.Proxy import ActionProxy, Proxy, VariationsProxy
 
 logger = logging.getLogger(__name__)
 
@@ -71,7 +72,7 @@ def create_logger(level="WARNING", log_path="./DistRDF.log"):
     return logger
 
 
-def RunGraphs(proxies):
+def RunGraphs(proxies, fuse=False):
     """
     Trigger the execution of multiple RDataFrame computation graphs on a certain
     distributed backend. If the backend doesn't support multiple job
@@ -83,6 +84,13 @@ def RunGraphs(proxies):
             actions belonging to different RDataFrame graphs will be
             triggered to avoid useless calls.
 
+        fuse(bool): If True, the graphs that process the same dataset on the
+            same backend are executed in a single distributed job, where each
+            task runs all of them on its range with a single event loop. Thus,
+            the dataset is read once instead of once per graph. The options of
+            the job, e.g. the number of partitions, are taken from the first
+            dataframe of each group. Ignored in optimized mode.
+
     Example:
 
         @code{.py}
@@ -107,18 +115,35 @@ def RunGraphs(proxies):
 
     """
     # Import here to avoid circular dependencies in main module
-    from DistRDF.Proxy import execute_graph
+    import ROOT
+    from DistRDF.HeadNode import group_by_input
+    from DistRDF.Proxy import execute_fused_graphs
 
     if not proxies:
         raise ValueError("The list of result pointers passed to RunGraphs is empty.")
 
     # Get proxies belonging to distinct computation graphs
-    uniqueproxies = list({proxy.proxied_node.get_head(): proxy for proxy in proxies}.values())
+    uniqueproxies = {proxy.proxied_node.get_head(): proxy for proxy in proxies}
+
+    if fuse and ROOT.RDF.Experimental.Distributed.optimized:
+        logger.warning("Fusing the execution of multiple graphs is not supported in optimized mode, "
+                       "the graphs will be executed separately.")
+        fuse = False
+
+    # Either one group per graph or one group per dataset
+    if fuse:
+        groups = group_by_input(uniqueproxies)
+        logger.info("Executing %d computation graphs in %d distributed jobs", len(uniqueproxies), len(groups))
+    else:
+        groups = [[headnode] for headnode in uniqueproxies]
 
     # Submit all computation graphs concurrently from multiple Python threads.
     # The submission is not computationally intensive
-    with concurrent.futures.ThreadPoolExecutor(max_workers=len(uniqueproxies)) as executor:
-        futures = [executor.submit(execute_graph, proxy.proxied_node) for proxy in uniqueproxies]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(groups)) as executor:
+        futures = [
+            executor.submit(execute_fused_graphs, [uniqueproxies[headnode].proxied_node for headnode in group])
+            for group in groups
+        ]
         concurrent.futures.wait(futures)
 
 
@@ -130,6 +155,34 @@ def VariationsFor(actionproxy: ActionProxy) -> VariationsProxy:
     return actionproxy.create_variations()
 
 
+def GetProfile(proxy: Proxy) -> Optional[ExecutionProfile]:
+    """
+    Retrieves the timings of the tasks of the last execution of a distributed
+    RDataFrame computation graph. The dataframe must have been created with the
+    `profiling=True` option, otherwise None is returned.
+
+    Args:
+        proxy: The distributed RDataFrame or any node of its computation graph,
+            e.g. the result of an action.
+
+    Example:
+
+        @code{.py}
+        import ROOT
+        RDataFrame = ROOT.RDF.Experimental.Distributed.Dask.RDataFrame
+
+        df = RDataFrame("tree", "file.root", profiling=True)
+        h = df.Histo1D(("x", "x", 100, 0, 10), "x")
+        h.GetValue()
+
+        profile = ROOT.RDF.Experimental.Distributed.GetProfile(h)
+        print(profile.report())
+        profile.to_chrome_trace("trace.json")
+        @endcode
+    """
+    return proxy.proxied_node.get_head().profile
+
+
 def create_distributed_module(parentmodule):
     """
     Helper function to create the ROOT.RDF.Experimental.Distributed module.
@@ -153,6 +206,7 @@ def create_distributed_module(parentmodule):
     distributed.create_logger = create_logger
     distributed.RunGraphs = RunGraphs
     distributed.VariationsFor = VariationsFor
+    distributed.GetProfile = GetProfile
 
     # Set non-optimized default mode
     distributed.optimized = False
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+
+from functools import singledispatch
+from typing import Callable, List, Optional, Tuple, TYPE_CHECKING
+
+from DistRDF.Ranges import DataRange, EmptySourceRange, TreeRangePerc
+
+if TYPE_CHECKING:
+    from DistRDF.Backends.Base import TaskResult
+
+logger = logging.getLogger(__name__)
+
+
+@singledispatch
+def get_range_identity(current_range: DataRange) -> List:
+    """
+    Returns the properties of a range that determine the entries processed by
+    the task, i.e. everything but the identifier of the execution, which is
+    different every time the graph is run.
+    """
+    return [current_range.id]
+
+
+@get_range_identity.register
+def _(current_range: EmptySourceRange) -> List:
+    return [current_range.id, current_range.start, current_range.end]
+
+
+@get_range_identity.register
+def _(current_range: TreeRangePerc) -> List:
+    return [current_range.id, current_range.treenames, current_range.filenames,
+            current_range.first_file_idx, current_range.last_file_idx,
+            current_range.first_tree_start_perc, current_range.last_tree_end_perc]
+
+
+class CheckpointStore:
+    """
+    Persists the results of the completed tasks of a distributed execution in
+    a local directory, so that a new execution of the same graph on the same
+    dataset only runs the tasks that did not complete, e.g. after a failure.
+
+    Attributes:
+
+    directory: The directory holding the results of the tasks of this graph,
+        one file per range.
+    """
+
+    def __init__(self, checkpoint_dir: str, graph_key: str):
+        """
+        Args:
+            checkpoint_dir: The directory where checkpoints of all graphs are
+                stored.
+
+            graph_key: Identifies the graph and its dataset. The results of the
+                tasks are only reused by executions with the same key.
+        """
+        self.directory = os.path.join(checkpoint_dir, graph_key)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _get_path(self, current_range: DataRange) -> str:
+        range_hash = hashlib.sha1(repr(get_range_identity(current_range)).encode()).hexdigest()
+        return os.path.join(self.directory, f"range_{current_range.id}_{range_hash}.pkl")
+
+    def load(self, current_range: DataRange) -> Optional[TaskResult]:
+        """Returns the result stored for the range, None if there is none."""
+        path = self._get_path(current_range)
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError) as e:
+            logger.warning("Ignoring the corrupted checkpoint %s: %s", path, e)
+            return None
+
+    def save(self, current_range: DataRange, result: TaskResult) -> None:
+        """
+        Stores the result of the task processing the range. The file is written
+        atomically, so that a task interrupted while writing does not leave a
+        corrupted checkpoint behind.
+        """
+        fd, tmppath = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmppath, self._get_path(current_range))
+        except BaseException:
+            os.remove(tmppath)
+            raise
+
+    def split_ranges(self, ranges: List[DataRange]) -> Tuple[List[DataRange], List[TaskResult]]:
+        """
+        Separates the ranges that still need to be processed from the ones
+        already completed by a previous execution.
+
+        Returns:
+            The ranges to be processed and the stored results of the others.
+        """
+        pending: List[DataRange] = []
+        completed: List[TaskResult] = []
+        for current_range in ranges:
+            result = self.load(current_range)
+            if result is None:
+                pending.append(current_range)
+            else:
+                completed.append(result)
+        return pending, completed
+
+    def clear(self) -> None:
+        """Removes the results stored for this graph."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def checkpointing_mapper(store: CheckpointStore, mapper: Callable[[DataRange], TaskResult],
+                         current_range: DataRange) -> TaskResult:
+    """
+    Runs the mapper on the range and stores its result before returning it.
+    The checkpoint directory must be reachable from the workers, e.g. through
+    a shared filesystem.
+    """
+    result = mapper(current_range)
+    store.save(current_range, result)
+    return result
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import re
+import zlib
+
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+import ROOT
+
+try:
+    import numpy
+except ImportError:
+    # Without numpy the histograms are sent with the default serialization
+    numpy = None
+
+# The histograms that can be sent in the compact format, i.e. one, two and
+# three dimensional histograms that store their bins in a single array. The
+# last letter of the class name is the storage type of the bins. Profiles are
+# not included, they store more information per bin.
+_HISTOGRAM_CLASS = re.compile(r"^TH[123]([SIFD])$")
+
+_BIN_DTYPES = {"S": "int16", "I": "int32", "F": "float32", "D": "float64"}
+
+# Low compression level, most of the gain comes from dropping the empty bins
+_COMPRESSION_LEVEL = 1
+
+# Clones a histogram without its bins, by detaching the arrays of the bins
+# while the histogram is cloned. The arrays are public data members of TArray.
+_CLONE_WITHOUT_BINS = """
+namespace DistRDF {
+namespace Internal {
+template <typename Array>
+void SwapArrays(Array &first, Array &second)
+{
+   std::swap(first.fN, second.fN);
+   std::swap(first.fArray, second.fArray);
+}
+
+template <typename Hist, typename Array>
+Hist *CloneWithoutBins(Hist &histogram)
+{
+   Array bins;
+   TArrayD sumw2;
+   SwapArrays<Array>(histogram, bins);
+   SwapArrays(*histogram.GetSumw2(), sumw2);
+   auto clone = static_cast<Hist *>(histogram.Clone());
+   SwapArrays<Array>(histogram, bins);
+   SwapArrays(*histogram.GetSumw2(), sumw2);
+   return clone;
+}
+} // namespace Internal
+} // namespace DistRDF
+"""
+
+_clone_without_bins_declared = False
+
+
+@dataclass
+class BinPayload:
+    """
+    The bins of a histogram in a compact form.
+
+    Attributes:
+
+    ncells: The total number of bins, including underflow and overflow.
+
+    indices: The compressed indices of the bins stored in `contents` and
+        `sumw2`, as differences between consecutive indices, which compress
+        better than the indices themselves. None if all the bins are stored.
+
+    contents: The compressed contents of the stored bins.
+
+    sumw2: The compressed sums of the squared weights of the stored bins, None
+        if the histogram does not store them.
+    """
+    ncells: int
+    indices: Optional[bytes]
+    contents: bytes
+    sumw2: Optional[bytes]
+
+
+def _compress(array: numpy.ndarray) -> bytes:
+    return zlib.compress(numpy.ascontiguousarray(array).tobytes(), _COMPRESSION_LEVEL)
+
+
+def _decompress(data: bytes, dtype) -> numpy.ndarray:
+    return numpy.frombuffer(zlib.decompress(data), dtype=dtype)
+
+
+def _get_index_dtype(ncells: int):
+    return numpy.uint32 if ncells <= numpy.iinfo(numpy.uint32).max else numpy.uint64
+
+
+def encode_bins(contents: numpy.ndarray, sumw2: Optional[numpy.ndarray]) -> BinPayload:
+    """
+    Encodes the bins of a histogram keeping only the ones with a non-zero
+    content or sum of squared weights. If most of the bins are filled, all of
+    them are stored since the indices would take more space than the empty
+    bins.
+    """
+    ncells = len(contents)
+    filled = contents != 0
+    if sumw2 is not None:
+        filled |= sumw2 != 0
+    indices = numpy.flatnonzero(filled)
+
+    index_dtype = _get_index_dtype(ncells)
+    bin_size = contents.itemsize + (sumw2.itemsize if sumw2 is not None else 0)
+    if len(indices) * (bin_size + numpy.dtype(index_dtype).itemsize) >= ncells * bin_size:
+        return BinPayload(ncells, None, _compress(contents), _compress(sumw2) if sumw2 is not None else None)
+
+    deltas = numpy.diff(indices, prepend=0).astype(index_dtype)
+    return BinPayload(ncells, _compress(deltas), _compress(contents[indices]),
+                      _compress(sumw2[indices]) if sumw2 is not None else None)
+
+
+def decode_bins(payload: BinPayload, contents: numpy.ndarray, sumw2: Optional[numpy.ndarray]) -> None:
+    """
+    Writes the bins stored in the payload into the input arrays, which must be
+    zero-initialized and hold `payload.ncells` elements.
+    """
+    if payload.indices is None:
+        contents[:] = _decompress(payload.contents, contents.dtype)
+        if sumw2 is not None:
+            sumw2[:] = _decompress(payload.sumw2, sumw2.dtype)
+        return
+
+    indices = numpy.cumsum(_decompress(payload.indices, _get_index_dtype(payload.ncells)), dtype=numpy.int64)
+    contents[indices] = _decompress(payload.contents, contents.dtype)
+    if sumw2 is not None:
+        sumw2[indices] = _decompress(payload.sumw2, sumw2.dtype)
+
+
+def _get_bin_arrays(histogram: ROOT.TH1, dtype) -> List[Optional[numpy.ndarray]]:
+    """
+    Returns numpy views over the bin contents and the sums of squared weights
+    of the histogram, without copying them.
+    """
+    ncells = histogram.GetNcells()
+    contents = histogram.GetArray()
+    contents.reshape((ncells,))
+    sumw2 = None
+    if histogram.GetSumw2N() > 0:
+        sumw2 = histogram.GetSumw2().GetArray()
+        sumw2.reshape((ncells,))
+        sumw2 = numpy.asarray(sumw2, dtype="float64")
+    return [numpy.asarray(contents, dtype=dtype), sumw2]
+
+
+def _clone_without_bins(histogram: ROOT.TH1, storage: str) -> ROOT.TH1:
+    """
+    Returns a copy of the histogram with all its properties but without the
+    bins and the sums of squared weights, which are never copied, so that the
+    peak memory usage does not double for large histograms.
+    """
+    global _clone_without_bins_declared
+    if not _clone_without_bins_declared:
+        ROOT.gInterpreter.Declare(_CLONE_WITHOUT_BINS)
+        _clone_without_bins_declared = True
+    clone = ROOT.DistRDF.Internal.CloneWithoutBins[type(histogram), f"TArray{storage}"](histogram)
+    ROOT.SetOwnership(clone, True)
+    return clone
+
+
+class CompactHistogram(object):
+    """
+    Wraps the mergeable of a histogram so that, when it is pickled to be sent
+    between the workers and the client, only the filled bins are transferred.
+    The axes, the statistics and all other properties of the histogram are
+    streamed as usual with the bin arrays emptied, the bins are encoded with
+    `encode_bins`. This makes the size of the partial results scale with the
+    number of filled bins instead of the total number of bins, which matters
+    for large multidimensional histograms.
+    """
+
+    def __init__(self, mergeable: ROOT.Detail.RDF.RMergeableValueBase, storage: str) -> None:
+        self.mergeable = mergeable
+        # The last letter of the class name of the histogram
+        self._storage = storage
+
+    def GetValue(self):
+        return self.mergeable.GetValue()
+
+    def Merge(self, other: CompactHistogram) -> None:
+        ROOT.Detail.RDF.MergeValues(self.mergeable, other.mergeable)
+
+    def __getstate__(self):
+        histogram = self.mergeable.GetValue()
+        dtype = _BIN_DTYPES[self._storage]
+        payload = encode_bins(*_get_bin_arrays(histogram, dtype))
+
+        # Only the properties of the histogram are streamed, the bins are
+        # already in the payload
+        skeleton = _clone_without_bins(histogram, self._storage)
+        skeleton.SetDirectory(ROOT.nullptr)
+        return {"storage": self._storage, "skeleton": skeleton, "payload": payload}
+
+    def __setstate__(self, state) -> None:
+        self._storage = state["storage"]
+        payload = state["payload"]
+        histogram = state["skeleton"]
+        histogram.Set(payload.ncells)
+        if payload.sumw2 is not None:
+            histogram.GetSumw2().Set(payload.ncells)
+        decode_bins(payload, *_get_bin_arrays(histogram, _BIN_DTYPES[self._storage]))
+        self.mergeable = ROOT.Detail.RDF.RMergeableFill[type(histogram)](histogram)
+
+
+def make_compact(mergeable: Any) -> Any:
+    """
+    Wraps the mergeable in a CompactHistogram if it holds a histogram that can
+    be sent in the compact format, otherwise returns it unchanged.
+    """
+    if (numpy is None
+            or not isinstance(mergeable, ROOT.Detail.RDF.RMergeableValueBase)
+            or isinstance(mergeable, ROOT.Detail.RDF.RMergeableVariationsBase)):
+        return mergeable
+    value = mergeable.GetValue()
+    if not isinstance(value, ROOT.TH1):
+        return mergeable
+    match = _HISTOGRAM_CLASS.match(value.ClassName())
+    if match is None:
+        return mergeable
+    return CompactHistogram(mergeable, match.group(1))
@@ -1,8 +1,9 @@
 from __future__ import annotations
+from collections import OrderedDict
 from dataclasses import dataclass
 
 import uuid
-from typing import Dict, TYPE_CHECKING
+from typing import Optional, Union, TYPE_CHECKING
 
 if TYPE_CHECKING:
     import ROOT
@@ -21,10 +22,82 @@ class ExecutionIdentifier:
     rdf_uuid: An identifier for the specific RDataFrame instance.
     graph_uuid: An identifier for the computation graph sent to the workers for
         the current execution.
+    graph_hash: A hash of the content of the computation graph and of the
+        dataset it runs on. Executions with the same hash can reuse the same
+        jitted graph. None if the content of the graph could not be hashed.
     """
     rdf_uuid: uuid.UUID
     graph_uuid: uuid.UUID
+    graph_hash: Optional[str] = None
 
 
-_RDF_REGISTER: Dict[ExecutionIdentifier, ROOT.RDataFrame] = {}
-_ACTIONS_REGISTER: Dict[ExecutionIdentifier, RDataFrameFutureResult] = {}
+@dataclass
+class GraphCacheStats:
+    """
+    Counts how many tasks could reuse a computation graph already built and
+    jitted in the same worker process (hits), and how many had to build it
+    from scratch (misses).
+    """
+    hits: int = 0
+    misses: int = 0
+
+    def __add__(self, other: GraphCacheStats) -> GraphCacheStats:
+        return GraphCacheStats(self.hits + other.hits, self.misses + other.misses)
+
+    def __sub__(self, other: GraphCacheStats) -> GraphCacheStats:
+        return GraphCacheStats(self.hits - other.hits, self.misses - other.misses)
+
+
+# Maximum number of computation graphs kept alive in a worker process. When
+# the limit is reached, the least recently used graph is discarded.
+MAX_CACHED_GRAPHS: int = 32
+
+# The caches are keyed by the hash of the content of the graph, so that a new
+# execution of an identical graph does not need to jit it again. If the graph
+# could not be hashed, the execution identifier is used as key instead.
+CacheKey = Union[str, ExecutionIdentifier]
+
+_RDF_REGISTER: OrderedDict[CacheKey, ROOT.RDataFrame] = OrderedDict()
+_ACTIONS_REGISTER: OrderedDict[CacheKey, RDataFrameFutureResult] = OrderedDict()
+
+# Statistics of the cache accesses in this process since its start
+_STATS = GraphCacheStats()
+
+
+def get_cache_key(exec_id: ExecutionIdentifier) -> CacheKey:
+    """Returns the key of the caches for the input execution."""
+    return exec_id.graph_hash if exec_id.graph_hash is not None else exec_id
+
+
+def get_cached_rdf(exec_id: ExecutionIdentifier) -> Optional[ROOT.RDataFrame]:
+    """
+    Retrieves the RDataFrame of an identical computation graph from the cache,
+    marking it as the most recently used. Returns None if it is not present.
+    """
+    key = get_cache_key(exec_id)
+    rdf = _RDF_REGISTER.get(key)
+    if rdf is None:
+        _STATS.misses += 1
+        return None
+
+    _STATS.hits += 1
+    _RDF_REGISTER.move_to_end(key)
+    if key in _ACTIONS_REGISTER:
+        _ACTIONS_REGISTER.move_to_end(key)
+    return rdf
+
+
+def cache_rdf(exec_id: ExecutionIdentifier, rdf: ROOT.RDataFrame) -> None:
+    """
+    Stores the RDataFrame of the current execution in the cache, discarding
+    the least recently used graphs if the cache is full.
+    """
+    _RDF_REGISTER[get_cache_key(exec_id)] = rdf
+    while len(_RDF_REGISTER) > MAX_CACHED_GRAPHS:
+        key, _ = _RDF_REGISTER.popitem(last=False)
+        _ACTIONS_REGISTER.pop(key, None)
+
+
+def get_stats() -> GraphCacheStats:
+    """Returns a copy of the statistics of the cache in this process."""
+    return GraphCacheStats(_STATS.hits, _STATS.misses)
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of threads used to retrieve the metadata of the trees in the
+# dataset on the client
+_MAX_WORKERS = 32
+
+
+@dataclass
+class TreeMetadata:
+    """
+    Information about a tree in a file that is needed to build the entry
+    ranges of the distributed tasks.
+
+    Attributes:
+
+    entries: The number of entries in the tree.
+
+    clusters: The cluster boundaries of the tree, including both the first
+        entry (0) and the number of entries in the tree.
+
+    zipbytes: The number of compressed bytes of the tree.
+    """
+    entries: int
+    clusters: List[int]
+    zipbytes: int
+
+
+def get_cache_dir() -> str:
+    """
+    Directory where the metadata index is stored. It can be changed through
+    the DISTRDF_METADATA_CACHE_DIR environment variable.
+    """
+    cache_dir = os.environ.get("DISTRDF_METADATA_CACHE_DIR")
+    if cache_dir is None:
+        xdg_cache = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+        cache_dir = os.path.join(xdg_cache, "root", "distrdf", "metadata")
+    return cache_dir
+
+
+def _get_content_key(treename: str, filename: str) -> Optional[str]:
+    """
+    Computes a key identifying the content of the tree in the file. For local
+    files this includes the modification time and the size of the file, so
+    that a modified file is not looked up with stale metadata. Remote files
+    (i.e. with a protocol in the URL, like 'root://') cannot be checked without
+    opening them, thus they are assumed to be immutable and identified only by
+    their URL and tree name.
+    """
+    if "://" in filename and not filename.startswith("file://"):
+        identity = [filename, treename]
+    else:
+        path = filename[len("file://"):] if filename.startswith("file://") else filename
+        try:
+            stat = os.stat(path)
+        except OSError:
+            # Let ROOT deal with the file when opening it
+            return None
+        identity = [os.path.abspath(path), treename, stat.st_mtime_ns, stat.st_size]
+
+    return hashlib.sha1(json.dumps(identity).encode()).hexdigest()
+
+
+def _read_cached(key: str, cache_dir: str) -> Optional[TreeMetadata]:
+    """Retrieves the metadata from the on-disk index, if present."""
+    try:
+        with open(os.path.join(cache_dir, key + ".json")) as f:
+            entry = json.load(f)
+        return TreeMetadata(entry["entries"], entry["clusters"], entry["zipbytes"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _write_cached(key: str, cache_dir: str, metadata: TreeMetadata) -> None:
+    """
+    Stores the metadata in the on-disk index. The file is first written to a
+    temporary location then moved, so that concurrent processes never read a
+    partially written entry.
+    """
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmppath = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"entries": metadata.entries, "clusters": metadata.clusters, "zipbytes": metadata.zipbytes}, f)
+        os.replace(tmppath, os.path.join(cache_dir, key + ".json"))
+    except OSError as e:
+        # The cache is only an optimization, never fail because of it
+        logger.debug("Could not write the metadata cache entry %s: %s", key, e)
+
+
+def _read_tree_metadata(treename: str, filename: str) -> TreeMetadata:
+    """Opens the file and retrieves the metadata of the tree."""
+    import ROOT
+    # Avoid circular imports
+    from DistRDF.Ranges import get_tree_clusters_and_entries
+
+    with ROOT.TFile.Open(filename, "READ_WITHOUT_GLOBALREGISTRATION") as tfile:
+        ttree = tfile.Get(treename)
+        clusters, entries = get_tree_clusters_and_entries(ttree)
+        zipbytes = ttree.GetZipBytes()
+
+    return TreeMetadata(entries, clusters, zipbytes)
+
+
+def _get_tree_metadata(treename: str, filename: str, cache_dir: str) -> TreeMetadata:
+    """
+    Retrieves the metadata of one tree, from the on-disk index if available,
+    otherwise by opening the file. In the latter case the index is updated.
+    """
+    key = _get_content_key(treename, filename)
+    if key is not None:
+        metadata = _read_cached(key, cache_dir)
+        if metadata is not None:
+            return metadata
+
+    metadata = _read_tree_metadata(treename, filename)
+
+    if key is not None:
+        _write_cached(key, cache_dir, metadata)
+
+    return metadata
+
+
+def get_trees_metadata(treenames: List[str], filenames: List[str],
+                       cache_dir: Optional[str] = None) -> List[TreeMetadata]:
+    """
+    Retrieves the entries, cluster boundaries and compressed size of all the
+    trees in the dataset. Trees that are not already in the on-disk index are read
+    concurrently from multiple threads, then added to the index.
+
+    Args:
+        treenames: The names of the trees in the dataset.
+
+        filenames: The files where each tree is stored.
+
+        cache_dir: Directory of the on-disk index. Defaults to the value
+            returned by `get_cache_dir`.
+
+    Returns:
+        The metadata of each tree, in the same order as the input lists.
+    """
+    import ROOT
+    # Files are opened from multiple threads
+    ROOT.EnableThreadSafety()
+
+    cache_dir = cache_dir if cache_dir is not None else get_cache_dir()
+    unique_trees: List[Tuple[str, str]] = list(dict.fromkeys(zip(treenames, filenames)))
+
+    nworkers = max(1, min(_MAX_WORKERS, len(unique_trees)))
+    with ThreadPoolExecutor(max_workers=nworkers) as executor:
+        metadata = list(executor.map(lambda tree: _get_tree_metadata(*tree, cache_dir), unique_trees))
+
+    metadata_of_tree = dict(zip(unique_trees, metadata))
+    return [metadata_of_tree[tree] for tree in zip(treenames, filenames)]
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import json
+import os
+import pickle
+import socket
+import statistics
+import threading
+import time
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+# The phases that are recorded for a task, in the order they usually happen
+TASK_PHASES = ("declare", "setup", "build_rdf", "graph", "jit", "event_loop", "mergeables", "serialize")
+
+# Per-thread state of the profiler in a worker process
+_local = threading.local()
+
+
+@dataclass
+class TaskTiming:
+    """
+    Timing of a single distributed task, either a mapper or a reducer.
+
+    Attributes:
+
+    kind: Either "map" or "reduce".
+
+    task_id: The id of the range processed by a map task, None for a reducer.
+
+    host: The name of the machine where the task ran.
+
+    pid: The id of the process where the task ran.
+
+    start: The wall-clock time at which the task started, in seconds since the
+        epoch. Used to place the tasks of different machines on the same time
+        axis, thus it is only as precise as the clocks of the machines are
+        synchronized.
+
+    phases: The time spent in each phase of the task, in seconds, in the order
+        they happened.
+
+    serialized_size: The size in bytes of the pickled result of the task, if
+        it was measured.
+
+    counters: Other quantities measured during the task, e.g. the time saved
+        by not declaring again the headers already declared in the process.
+    """
+    kind: str
+    task_id: Optional[int]
+    host: str
+    pid: int
+    start: float
+    phases: Dict[str, float] = field(default_factory=dict)
+    serialized_size: Optional[int] = None
+    counters: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return sum(self.phases.values())
+
+
+def _new_timing(kind: str, task_id: Optional[int]) -> TaskTiming:
+    return TaskTiming(kind, task_id, socket.gethostname(), os.getpid(), time.time())
+
+
+def start_task(kind: str, task_id: Optional[int] = None) -> None:
+    """
+    Starts recording the phases of a task in the current thread. Phases that
+    were recorded before a map task, e.g. by the backend before calling the
+    mapper, are attributed to it.
+    """
+    timing = getattr(_local, "pending", None) if kind == "map" else None
+    if timing is None:
+        timing = _new_timing(kind, task_id)
+    else:
+        timing.task_id = task_id
+        _local.pending = None
+    _local.current = timing
+
+
+def end_task() -> Optional[TaskTiming]:
+    """Stops recording and returns the timing of the current task."""
+    timing = getattr(_local, "current", None)
+    _local.current = None
+    return timing
+
+
+def _get_timing() -> TaskTiming:
+    """
+    Returns the timing of the current task. If no task is being recorded,
+    returns the timing that will be used by the next task started in this
+    thread.
+    """
+    timing = getattr(_local, "current", None)
+    if timing is None:
+        timing = getattr(_local, "pending", None)
+        if timing is None:
+            timing = _local.pending = _new_timing("map", None)
+    return timing
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    Records the time spent in the body of the context manager as the input
+    phase of the current task. If no task is being recorded, the phase is kept
+    for the next task started in this thread.
+    """
+    timing = _get_timing()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.phases[name] = timing.phases.get(name, 0.) + time.perf_counter() - start
+
+
+def count(name: str, value: float) -> None:
+    """
+    Adds the value to the input counter of the current task, or of the phases
+    recorded for the next task. Does nothing outside of a task.
+    """
+    timing = getattr(_local, "current", None) or getattr(_local, "pending", None)
+    if timing is not None:
+        timing.counters[name] = timing.counters.get(name, 0.) + value
+
+
+def measure_serialized_size(timing: TaskTiming, obj: Any) -> None:
+    """
+    Measures the size of the input object once pickled, e.g. the result of a
+    task before it is sent back by the backend, storing it in the input timing.
+    The memory of objects supporting out-of-band serialization, e.g. numpy
+    arrays, is not copied.
+    """
+    start = time.perf_counter()
+    buffers = []
+    data = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    timing.serialized_size = len(data) + sum(buffer.raw().nbytes for buffer in buffers)
+    timing.phases["serialize"] = time.perf_counter() - start
+
+
+class ExecutionProfile:
+    """
+    The timings of all the tasks of a distributed execution, with methods to
+    summarize them. Retrieved on the client with
+    `ROOT.RDF.Experimental.Distributed.GetProfile`.
+
+    Attributes:
+
+    tasks: The timings of the tasks, ordered by their start time.
+    """
+
+    def __init__(self, tasks: List[TaskTiming]):
+        self.tasks = sorted(tasks, key=lambda task: task.start)
+
+    @property
+    def map_tasks(self) -> List[TaskTiming]:
+        return [task for task in self.tasks if task.kind == "map"]
+
+    def stragglers(self, factor: float = 2.) -> List[TaskTiming]:
+        """
+        Returns the map tasks that took more than `factor` times the median
+        duration of the map tasks, slowest first.
+        """
+        durations = [task.duration for task in self.map_tasks]
+        if not durations:
+            return []
+        threshold = factor * statistics.median(durations)
+        return sorted((task for task in self.map_tasks if task.duration > threshold),
+                      key=lambda task: task.duration, reverse=True)
+
+    def report(self, nslowest: int = 5) -> str:
+        """
+        Returns a human-readable summary with the total, mean and maximum time
+        spent in each phase by the map tasks, the time spent merging and the
+        slowest tasks.
+        """
+        maps = self.map_tasks
+        reduces = [task for task in self.tasks if task.kind == "reduce"]
+        lines = [f"{len(maps)} map tasks, {len(reduces)} merge steps"]
+
+        lines.append(f"{'phase':<12}{'total [s]':>12}{'mean [s]':>12}{'max [s]':>12}")
+        for name in TASK_PHASES:
+            values = [task.phases[name] for task in maps if name in task.phases]
+            if values:
+                lines.append(f"{name:<12}{sum(values):>12.3f}{sum(values) / len(values):>12.3f}{max(values):>12.3f}")
+        if reduces:
+            values = [task.duration for task in reduces]
+            lines.append(f"{'merge':<12}{sum(values):>12.3f}{sum(values) / len(values):>12.3f}{max(values):>12.3f}")
+
+        counters: Dict[str, float] = {}
+        for task in maps:
+            for name, value in task.counters.items():
+                counters[name] = counters.get(name, 0.) + value
+        for name, value in counters.items():
+            lines.append(f"{name}: {value:.3f} in total")
+
+        sizes = [task.serialized_size for task in maps if task.serialized_size is not None]
+        if sizes:
+            lines.append(f"Serialized results: {sum(sizes)} bytes in total, {max(sizes)} bytes at most")
+
+        lines.append(f"Slowest {min(nslowest, len(maps))} map tasks:")
+        for task in sorted(maps, key=lambda task: task.duration, reverse=True)[:nslowest]:
+            slowest_phase = max(task.phases, key=task.phases.get)
+            lines.append(f"  task {task.task_id} on {task.host} (pid {task.pid}): {task.duration:.3f} s, "
+                         f"mostly in '{slowest_phase}' ({task.phases[slowest_phase]:.3f} s)")
+
+        return "\n".join(lines)
+
+    def to_chrome_trace(self, path: str) -> None:
+        """
+        Writes the timings in the Chrome trace event format, which can be
+        opened e.g. in chrome://tracing or https://ui.perfetto.dev. Each machine
+        is shown as a process and each worker process as a thread.
+        """
+        origin = self.tasks[0].start if self.tasks else 0.
+        events = []
+        for task in self.tasks:
+            start = task.start - origin
+            name = f"task {task.task_id}" if task.kind == "map" else "merge"
+            events.append({"name": name, "ph": "X", "ts": start * 1e6, "dur": task.duration * 1e6,
+                           "pid": task.host, "tid": task.pid,
+                           "args": {"serialized_size": task.serialized_size}})
+            for phase_name, duration in task.phases.items():
+                events.append({"name": phase_name, "ph": "X", "ts": start * 1e6, "dur": duration * 1e6,
+                               "pid": task.host, "tid": task.pid})
+                start += duration
+
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
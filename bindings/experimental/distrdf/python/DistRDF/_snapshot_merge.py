@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, TYPE_CHECKING
+
+import ROOT
+
+from DistRDF.PythonMergeables import SnapshotResult
+
+if TYPE_CHECKING:
+    from DistRDF.Backends.Base import BaseBackend
+
+logger = logging.getLogger(__name__)
+
+# The partial outputs of a distributed Snapshot end with the id of the range
+# of entries written by their task, see `Utils.clone_action`
+_RANGE_ID = re.compile(r"_(\d+)\.root$")
+
+
+def _is_local(filename: str) -> bool:
+    """Whether the file can be accessed through the local filesystem."""
+    return "://" not in filename or filename.startswith("file://")
+
+
+def _local_path(filename: str) -> str:
+    """Removes the 'file://' protocol from the file name, if present."""
+    return filename[len("file://"):] if filename.startswith("file://") else filename
+
+
+def _get_range_key(filename: str) -> Tuple[int, int]:
+    """
+    Returns the key to sort the partial outputs by the id of their range of
+    entries. Files without a range id are kept after the others.
+    """
+    match = _RANGE_ID.search(filename)
+    return (0, int(match.group(1))) if match is not None else (1, 0)
+
+
+def get_file_size(filename: str) -> int:
+    """
+    Retrieves the size in bytes of a file written by a distributed task. Local
+    files are checked through the filesystem, remote files are opened with ROOT.
+    Returns zero if the size could not be retrieved.
+    """
+    if _is_local(filename):
+        try:
+            return os.path.getsize(_local_path(filename))
+        except OSError:
+            return 0
+
+    tfile = ROOT.TFile.Open(filename, "READ_WITHOUT_GLOBALREGISTRATION")
+    if not tfile:
+        return 0
+    size = tfile.GetSize()
+    tfile.Close()
+    return size
+
+
+@dataclass
+class MergeTask:
+    """
+    A group of partial Snapshot outputs to be merged in a single file by one
+    distributed task.
+
+    Attributes:
+
+    id: The index of the task, also used to order the outputs.
+
+    treename: The name of the snapshotted dataset.
+
+    inputs: The partial Snapshot files to be merged, in order.
+
+    output: The path to the merged file.
+    """
+    id: int
+    treename: str
+    inputs: List[str]
+    output: str
+
+
+def plan_merge_groups(sizes: List[int], target_size: int) -> List[List[int]]:
+    """
+    Groups consecutive files so that the total size of each group does not
+    exceed the target size, unless a single file is already bigger than it.
+    The order of the files is preserved, so that the order of the entries of
+    the merged dataset is the same as the one of the partial outputs.
+
+    Returns:
+        The indices of the files in each group.
+    """
+    groups: List[List[int]] = []
+    group_size = 0
+    for index, size in enumerate(sizes):
+        if not groups or group_size + size > target_size:
+            groups.append([])
+            group_size = 0
+        groups[-1].append(index)
+        group_size += size
+    return groups
+
+
+def merge_files(task: MergeTask) -> SnapshotResult:
+    """
+    Merges the input files of the task with the fast method of TFileMerger,
+    which copies the compressed baskets without decompressing them. The local
+    input files are then removed. A single local input file is just renamed.
+    """
+    if len(task.inputs) == 1 and _is_local(task.inputs[0]) and _is_local(task.output):
+        os.replace(_local_path(task.inputs[0]), _local_path(task.output))
+        return SnapshotResult(task.treename, [task.output], bytes_written=[get_file_size(task.output)])
+
+    merger = ROOT.TFileMerger(False, False)
+    merger.SetFastMethod(True)
+    merger.SetPrintLevel(0)
+    if not merger.OutputFile(task.output, "RECREATE"):
+        raise RuntimeError(f"Could not create the merged Snapshot output file '{task.output}'.")
+    for filename in task.inputs:
+        if not merger.AddFile(filename, False):
+            raise RuntimeError(f"Could not add the partial Snapshot output file '{filename}' to the merge.")
+    if not merger.Merge():
+        raise RuntimeError(f"Merging the partial Snapshot output files into '{task.output}' failed.")
+
+    for filename in task.inputs:
+        if _is_local(filename):
+            os.remove(_local_path(filename))
+
+    return SnapshotResult(task.treename, [task.output], bytes_written=[get_file_size(task.output)])
+
+
+def _merge_results(out: SnapshotResult, other: SnapshotResult) -> SnapshotResult:
+    out.Merge(other)
+    return out
+
+
+def write_manifest(path: str, snapshot: SnapshotResult, partial: SnapshotResult) -> None:
+    """
+    Writes a JSON file describing the output of a distributed Snapshot: the
+    final files with their size and the files written by each distributed task
+    with the bytes written, before merging. The manifest is only written to
+    the local filesystem, it is skipped for remote paths.
+    """
+    if not _is_local(path):
+        logger.info("Not writing the manifest of the Snapshot outputs to the remote path %s", path)
+        return
+
+    manifest = {
+        "treename": snapshot.treename,
+        "files": [{"name": name, "bytes": size} for name, size in zip(snapshot.filenames, snapshot.bytes_written)],
+        "tasks": [{"name": name, "bytes": size} for name, size in zip(partial.filenames, partial.bytes_written)],
+    }
+    with open(_local_path(path), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def merge_snapshot_outputs(snapshot: SnapshotResult, backend: BaseBackend, output_path: str,
+                           target_size: int, manifest_path: Optional[str] = None) -> SnapshotResult:
+    """
+    Merges the partial outputs of a distributed Snapshot in files of about the
+    target size. Each group of files is merged by a separate task on the same
+    backend that executed the Snapshot, so the groups are merged in parallel.
+
+    Args:
+        snapshot: The merged result of the distributed Snapshot, holding the
+            partial output files.
+
+        backend: The backend of the distributed RDataFrame.
+
+        output_path: The file name that was passed to Snapshot. If all the
+            partial outputs fit in a single file, this is the name of the merged
+            file. Otherwise, the merged files are named after it with the index
+            of the group appended.
+
+        target_size: The maximum size in bytes of the merged files.
+
+        manifest_path: Where to write the manifest of the output files, see
+            `write_manifest`. Defaults to the output path with the '.json'
+            extension.
+
+    Returns:
+        A SnapshotResult holding the merged files, in the order of the ranges
+        of entries of the partial outputs.
+    """
+    # The partial outputs are gathered in the order the tasks finish, restore
+    # the order of the entries
+    order = sorted(range(len(snapshot.filenames)), key=lambda i: _get_range_key(snapshot.filenames[i]))
+    snapshot = SnapshotResult(snapshot.treename, [snapshot.filenames[i] for i in order],
+                              bytes_written=[snapshot.bytes_written[i] for i in order])
+
+    groups = plan_merge_groups(snapshot.bytes_written, target_size)
+    basename = output_path[:-len(".root")] if output_path.endswith(".root") else output_path
+
+    logger.info("Snapshot wrote %d bytes in %d files, merging them in %d file(s)",
+                sum(snapshot.bytes_written), len(snapshot.filenames), len(groups))
+
+    if len(groups) == 1:
+        outputs = [output_path]
+    else:
+        outputs = [f"{basename}_merged_{index}.root" for index in range(len(groups))]
+
+    tasks = [
+        MergeTask(index, snapshot.treename, [snapshot.filenames[i] for i in group], output)
+        for index, (group, output) in enumerate(zip(groups, outputs))
+    ]
+    merged = backend.ProcessAndMerge(tasks, merge_files, _merge_results)
+
+    # The tasks may finish in any order, restore the order of the groups
+    bytes_of_file = dict(zip(merged.filenames, merged.bytes_written))
+    result = SnapshotResult(snapshot.treename, outputs, bytes_written=[bytes_of_file[output] for output in outputs])
+
+    write_manifest(manifest_path if manifest_path is not None else basename + ".json", result, snapshot)
+
+    return result
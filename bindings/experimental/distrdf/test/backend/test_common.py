@@ -1,3 +1,6 @@
+import os
+import pickle
+import tempfile
 import unittest
 
 import DistRDF
@@ -58,6 +61,88 @@ class DeclareHeadersTest(unittest.TestCase):
         Utils.declare_headers(["test_headers/header4.hxx"])
         self.assertEqual(ROOT.b(1), True)
 
+    def test_header_declared_once_per_content(self):
+        """
+        A header is declared only once per process, unless its content
+        changes.
+        """
+        with tempfile.TemporaryDirectory() as tmpdir:
+            header = os.path.join(tmpdir, "memoised.hxx")
+            with open(header, "w") as f:
+                f.write("int memoised_first() { return 1; }\n")
+
+            before = Utils.get_declaration_stats()
+            Utils.declare_headers([header])
+            Utils.declare_headers([header])
+            after = Utils.get_declaration_stats()
+            self.assertEqual(after.declared - before.declared, 1)
+            self.assertEqual(after.skipped - before.skipped, 1)
+            self.assertGreaterEqual(after.time_saved, before.time_saved)
+            self.assertEqual(ROOT.memoised_first(), 1)
+
+            # A file with the same name but a different content is shipped
+            # again, the new content must be declared
+            with open(header, "w") as f:
+                f.write("int memoised_second() { return 2; }\n")
+            Utils.declare_headers([header])
+            self.assertEqual(Utils.get_declaration_stats().declared - after.declared, 1)
+            self.assertEqual(ROOT.memoised_second(), 2)
+
+
+class DeclareSharedLibrariesTest(unittest.TestCase):
+    """Static method 'declare_shared_libraries' in Backend class."""
+
+    def test_changed_library_is_an_error(self):
+        """
+        A shared library cannot be loaded again from the same path, a change
+        of its content after it was loaded raises an error.
+        """
+        loaded = []
+        with tempfile.TemporaryDirectory() as tmpdir:
+            library = os.path.join(tmpdir, "libchanged.so")
+            with open(library, "w") as f:
+                f.write("first")
+
+            Utils._declare_once(library, loaded.append, redeclarable=False)
+            Utils._declare_once(library, loaded.append, redeclarable=False)
+            self.assertEqual(loaded, [library])
+
+            with open(library, "w") as f:
+                f.write("second")
+            with self.assertRaises(RuntimeError):
+                Utils._declare_once(library, loaded.append, redeclarable=False)
+            self.assertEqual(loaded, [library])
+
+
+class CompactHistogramTest(unittest.TestCase):
+    """Serialization of the histograms returned by the distributed tasks."""
+
+    def test_histogram_roundtrip(self):
+        """
+        A histogram mergeable is pickled with only its filled bins and can be
+        merged with another one after unpickling.
+        """
+        rdf = ROOT.RDataFrame(10).Define("x", "double(rdfentry_)").Define("w", "2.")
+        resptr = rdf.Histo3D(("h", "h", 100, 0, 10, 100, 0, 10, 100, 0, 10), "x", "x", "x", "w")
+        mergeable = Utils.get_mergeablevalue(resptr)
+
+        data = pickle.dumps(mergeable)
+        # Ten filled bins out of more than a million
+        self.assertLess(len(data), 100000)
+
+        out = pickle.loads(data)
+        Utils.merge_values(out, pickle.loads(data))
+        histogram = out.GetValue()
+
+        self.assertEqual(histogram.GetEntries(), 20)
+        self.assertEqual(histogram.GetBinContent(histogram.FindBin(5., 5., 5.)), 4.)
+        self.assertAlmostEqual(histogram.GetBinError(histogram.FindBin(5., 5., 5.)), 8. ** 0.5)
+        self.assertAlmostEqual(histogram.GetMean(), resptr.GetMean())
+
+        # The bins of the pickled histogram are left untouched
+        self.assertEqual(resptr.GetBinContent(resptr.FindBin(5., 5., 5.)), 2.)
+        self.assertAlmostEqual(resptr.GetBinError(resptr.FindBin(5., 5., 5.)), 2.)
+
 
 class InitializationTest(unittest.TestCase):
     """Check the initialize method"""
@@ -1,6 +1,11 @@
+import os
+import tempfile
 import unittest
 
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+
 from DistRDF import DataFrame
+from DistRDF import RunGraphs
 from DistRDF import HeadNode
 from DistRDF.Backends import Base
 
@@ -81,3 +86,212 @@ class DistRDataFrameInvariants(unittest.TestCase):
             headnode = HeadNode.get_headnode(backend, npartitions, treename, filenames)
             rdf = DataFrame.RDataFrame(headnode)
             self.assertEqual(rdf.Count().GetValue(), 100)
+
+    def test_count_result_invariance_dynamic_scheduling(self):
+        """
+        Same as above, but the dataset is split in many more tasks than
+        partitions, as happens with dynamic scheduling. Tasks that fall within
+        a single cluster do no work, but the total count must not change.
+        """
+        treename = "entries"
+        filenames = ["1cluster_20entries.root"] * 5
+
+        for npartitions in range(1, 6):
+            backend = DistRDataFrameInvariants.TestBackend()
+            headnode = HeadNode.get_headnode(backend, npartitions, treename, filenames, scheduling="dynamic")
+            self.assertEqual(headnode.ntasks, npartitions * headnode.TASKS_PER_PARTITION_DYNAMIC)
+            rdf = DataFrame.RDataFrame(headnode)
+            self.assertEqual(rdf.Count().GetValue(), 100)
+
+    def test_fused_graphs(self):
+        """
+        Graphs over the same dataset are executed in a single job when fused,
+        each keeping its own results. Graphs over other datasets run in their
+        own job.
+        """
+        treename = "entries"
+        filenames = ["1cluster_20entries.root"] * 5
+
+        class CountingBackend(DistRDataFrameInvariants.TestBackend):
+            njobs = 0
+
+            def ProcessAndMerge(self, ranges, mapper, reducer):
+                CountingBackend.njobs += 1
+                return super().ProcessAndMerge(ranges, mapper, reducer)
+
+        backend = CountingBackend()
+        proxies = [
+            DataFrame.RDataFrame(HeadNode.get_headnode(backend, 2, treename, filenames)).Define("x", f"{value}").Sum("x")
+            for value in range(3)
+        ]
+        other = DataFrame.RDataFrame(HeadNode.get_headnode(backend, 2, treename, filenames[:1])).Count()
+
+        RunGraphs(proxies + [other], fuse=True)
+
+        self.assertEqual(CountingBackend.njobs, 2)
+        self.assertEqual(other.GetValue(), 20)
+        for value, proxy in enumerate(proxies):
+            self.assertEqual(proxy.GetValue(), 100 * value)
+
+    def test_stop_with_final_result(self):
+        """
+        A callback that asks to stop when called with the final result, in
+        tree reduction mode or on a backend without dynamic scheduling, does
+        not cut the execution short: the results are checked and complete.
+        """
+        treename = "entries"
+        filenames = ["1cluster_20entries.root"] * 5
+
+        for reduction in ("tree", "streaming"):
+            backend = DistRDataFrameInvariants.TestBackend()
+            headnode = HeadNode.get_headnode(backend, 2, treename, filenames, reduction=reduction)
+            partial_values = []
+            count = DataFrame.RDataFrame(headnode).Count().OnPartialResult(
+                lambda value: partial_values.append(value) or True)
+
+            self.assertEqual(count.GetValue(), 100)
+            self.assertListEqual(partial_values, [100])
+            self.assertFalse(headnode._stopped_early)
+
+    def test_resume_from_checkpoint(self):
+        """
+        After a failed execution, running the graph again only runs the tasks
+        that did not complete, for both kinds of head nodes.
+        """
+        class FailingBackend(DistRDataFrameInvariants.TestBackend):
+            fail_at = None
+            processed = []
+
+            def ProcessAndMerge(self, ranges, mapper, reducer):
+                def failing_mapper(current_range):
+                    if current_range.id == self.fail_at:
+                        raise RuntimeError("Worker died")
+                    self.processed.append(current_range.id)
+                    return mapper(current_range)
+                return super().ProcessAndMerge(ranges, failing_mapper, reducer)
+
+        datasets = [((100,), 100), (("entries", ["1cluster_20entries.root"] * 5), 100)]
+        for args, nentries in datasets:
+            with tempfile.TemporaryDirectory() as checkpoint_dir:
+                backend = FailingBackend()
+                headnode = HeadNode.get_headnode(backend, 4, *args, checkpoint_dir=checkpoint_dir)
+                count = DataFrame.RDataFrame(headnode).Count()
+
+                backend.fail_at, backend.processed = 2, []
+                with self.assertRaises(RuntimeError):
+                    count.GetValue()
+                self.assertListEqual(backend.processed, [0, 1])
+
+                backend.fail_at, backend.processed = None, []
+                self.assertEqual(count.GetValue(), nentries)
+                self.assertListEqual(backend.processed, [2, 3])
+                # The checkpoint is removed once the graph completed
+                self.assertListEqual(os.listdir(checkpoint_dir), [])
+
+
+class DynamicSchedulingTest(unittest.TestCase):
+    """Tests for the generic dynamic scheduler of the tasks."""
+
+    class Range:
+        def __init__(self, id):
+            self.id = id
+
+    @staticmethod
+    def wait_first(futures):
+        return wait(futures, return_when=FIRST_COMPLETED).done
+
+    @staticmethod
+    def reducer(out, other):
+        out.extend(other)
+        return out
+
+    def test_straggler_merged_once(self):
+        """
+        The last running task gets a backup copy. Its result must be merged
+        exactly once and the straggler copy must be cancelled.
+        """
+        ranges = [DynamicSchedulingTest.Range(i) for i in range(40)]
+        submitted = []
+        straggler = Future()
+
+        def submit(current_range):
+            submitted.append(current_range.id)
+            if current_range.id == 39 and len(submitted) <= len(ranges):
+                # First copy of the last task never finishes on its own
+                return straggler
+            future = Future()
+            future.set_result([current_range.id])
+            return future
+
+        result = Base.process_and_merge_dynamically(
+            ranges, submit, self.wait_first, self.reducer, speculative=True)
+
+        self.assertListEqual(sorted(result), list(range(40)))
+        self.assertEqual(submitted.count(39), 2)
+        self.assertTrue(straggler.cancelled())
+
+    def test_failed_task_with_backup(self):
+        """A failing task does not stop the execution if its backup succeeds."""
+        ranges = [DynamicSchedulingTest.Range(i) for i in range(3)]
+        first_attempt = Future()
+
+        def submit(current_range):
+            if current_range.id == 2:
+                if not first_attempt.done() and submit.attempts == 0:
+                    submit.attempts += 1
+                    return first_attempt
+                # The first attempt fails while its backup copy is running
+                first_attempt.set_exception(RuntimeError("worker died"))
+            future = Future()
+            future.set_result([current_range.id])
+            return future
+        submit.attempts = 0
+
+        result = Base.process_and_merge_dynamically(
+            ranges, submit, self.wait_first, self.reducer, speculative=True)
+
+        self.assertListEqual(sorted(result), [0, 1, 2])
+
+    def test_no_speculation(self):
+        """Without speculation, every range is submitted exactly once."""
+        ranges = [DynamicSchedulingTest.Range(i) for i in range(10)]
+        submitted = []
+
+        def submit(current_range):
+            submitted.append(current_range.id)
+            future = Future()
+            future.set_result([current_range.id])
+            return future
+
+        result = Base.process_and_merge_dynamically(
+            ranges, submit, self.wait_first, self.reducer, speculative=False)
+
+        self.assertListEqual(sorted(result), list(range(10)))
+        self.assertListEqual(sorted(submitted), list(range(10)))
+
+    def test_partial_results_stop_early(self):
+        """
+        The partial result is passed to the callback after every merge, and
+        the remaining tasks are cancelled as soon as the callback returns True.
+        """
+        ranges = [DynamicSchedulingTest.Range(i) for i in range(10)]
+        never_finishing = [Future() for _ in range(5)]
+        partial_sizes = []
+
+        def submit(current_range):
+            if current_range.id >= 5:
+                return never_finishing[current_range.id - 5]
+            future = Future()
+            future.set_result([current_range.id])
+            return future
+
+        def on_partial_result(result, final):
+            partial_sizes.append(len(result))
+            return len(result) == 3
+
+        result = Base.process_and_merge_dynamically(
+            ranges, submit, self.wait_first, self.reducer, speculative=False, on_partial_result=on_partial_result)
+
+        self.assertEqual(len(result), 3)
+        self.assertListEqual(partial_sizes, [1, 2, 3])
+        self.assertTrue(all(future.cancelled() for future in never_finishing))
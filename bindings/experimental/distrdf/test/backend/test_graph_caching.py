@@ -5,6 +5,7 @@ import unittest
 from DistRDF.Backends import Base
 from DistRDF.DataFrame import RDataFrame
 from DistRDF.HeadNode import get_headnode
+from DistRDF import _graph_cache
 from DistRDF._graph_cache import _ACTIONS_REGISTER, _RDF_REGISTER
 
 
@@ -187,6 +188,46 @@ class GraphCaching(unittest.TestCase):
                 for cached_rdf in _RDF_REGISTER.values():
                     self.assertEqual(cached_rdf.GetNRuns(), npartitions)
 
+    def test_identical_graphs_reuse_jitted_graph(self):
+        """
+        A new execution of a graph identical to a previous one reuses the
+        graph jitted by the previous execution.
+        """
+        treename = "myTree"
+        filenames = ["4clusters.root"] * 2
+        backend = GraphCaching.TestBackend()
+        npartitions = 4
+
+        for run in range(1, 3):
+            headnode = get_headnode(backend, npartitions, treename, filenames)
+            distrdf = RDataFrame(headnode)
+            self.assertEqual(distrdf.Define("x", "b1 * 2").Sum("x").GetValue(),
+                             2 * RDataFrame(get_headnode(backend, 1, treename, filenames)).Sum("b1").GetValue())
+
+            # Only the first task of the first execution jits the graph
+            stats = headnode.graph_cache_stats
+            self.assertEqual(stats.hits + stats.misses, npartitions)
+            self.assertEqual(stats.misses, 1 if run == 1 else 0)
+
+        self.assertEqual(len(_RDF_REGISTER), 2)
+        self.assertEqual(len(_ACTIONS_REGISTER), len(_RDF_REGISTER))
+
+    def test_lru_eviction(self):
+        """The least recently used graphs are evicted from the cache."""
+        backend = GraphCaching.TestBackend()
+        old_max = _graph_cache.MAX_CACHED_GRAPHS
+        _graph_cache.MAX_CACHED_GRAPHS = 2
+        try:
+            for value in range(3):
+                distrdf = RDataFrame(get_headnode(backend, 1, 10))
+                self.assertEqual(distrdf.Define("x", str(value)).Sum("x").GetValue(), 10 * value)
+                self.assertLessEqual(len(_RDF_REGISTER), 2)
+        finally:
+            _graph_cache.MAX_CACHED_GRAPHS = old_max
+
+        self.assertEqual(len(_RDF_REGISTER), 2)
+        self.assertEqual(len(_ACTIONS_REGISTER), len(_RDF_REGISTER))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,103 @@
+import os
+import threading
+import unittest
+
+from DistRDF import RunGraphs
+from DistRDF.Backends.Local import Backend
+from DistRDF.Backends.Local import RDataFrame
+
+
+class Range:
+    def __init__(self, id):
+        self.id = id
+
+
+def reducer(out, other):
+    out.extend(other)
+    return out
+
+
+class LocalBackendTest(unittest.TestCase):
+    """Tests of the process pool of the local backend."""
+
+    def test_default_npartitions(self):
+        """By default, one partition per core of the machine."""
+        backend = Backend.LocalBackend()
+        self.assertEqual(backend.optimize_npartitions(), os.cpu_count())
+        self.assertEqual(Backend.LocalBackend(nworkers=3).optimize_npartitions(), 3)
+
+        with self.assertRaises(ValueError):
+            Backend.LocalBackend(nworkers=0)
+
+    def test_mapper_runs_in_other_processes(self):
+        """
+        The mapper is a closure that cannot be pickled. It is inherited by the
+        forked worker processes.
+        """
+        client_pid = os.getpid()
+
+        def mapper(current_range):
+            return [(current_range.id, os.getpid())]
+
+        backend = Backend.LocalBackend(nworkers=2)
+        result = backend.ProcessAndMerge([Range(i) for i in range(6)], mapper, reducer)
+
+        self.assertListEqual(sorted(id for id, _ in result), list(range(6)))
+        self.assertNotIn(client_pid, [pid for _, pid in result])
+
+    def test_dynamic_with_early_stop(self):
+        """The remaining tasks are not run after an early stop."""
+        def mapper(current_range):
+            return [current_range.id]
+
+        backend = Backend.LocalBackend(nworkers=1)
+        result = backend.ProcessAndMergeDynamic([Range(i) for i in range(20)], mapper, reducer,
+                                                speculative=False, on_partial_result=lambda res, final: len(res) >= 2)
+
+        self.assertGreaterEqual(len(result), 2)
+        self.assertLess(len(result), 20)
+
+    def test_concurrent_executions(self):
+        """
+        Executions that run concurrently in the client, e.g. from RunGraphs,
+        each run their own mapper in their workers.
+        """
+        nexecutions = 4
+        barrier = threading.Barrier(nexecutions)
+        results = [None] * nexecutions
+
+        def execute(index):
+            def mapper(current_range):
+                return [(index, current_range.id)]
+
+            backend = Backend.LocalBackend(nworkers=2)
+            barrier.wait()
+            results[index] = backend.ProcessAndMergeDynamic([Range(i) for i in range(8)], mapper, reducer,
+                                                            speculative=False)
+
+        threads = [threading.Thread(target=execute, args=(index,)) for index in range(nexecutions)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for index, result in enumerate(results):
+            self.assertListEqual(sorted(result), [(index, i) for i in range(8)])
+
+    def test_rungraphs(self):
+        """Different graphs run together with RunGraphs get their own results."""
+        df1 = RDataFrame(100, npartitions=2, nworkers=2).Define("x", "rdfentry_")
+        df2 = RDataFrame(50, npartitions=2, nworkers=2).Define("y", "2 * rdfentry_")
+        sum1 = df1.Sum("x")
+        sum2 = df2.Sum("y")
+        count2 = df2.Filter("y % 4 == 0").Count()
+
+        RunGraphs([sum1, sum2, count2])
+
+        self.assertEqual(sum1.GetValue(), 4950)
+        self.assertEqual(sum2.GetValue(), 2450)
+        self.assertEqual(count2.GetValue(), 25)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+
+from DistRDF import _checkpoint
+from DistRDF.Backends.Base import TaskResult
+from DistRDF.Ranges import EmptySourceRange
+
+
+class CheckpointStoreTest(unittest.TestCase):
+    """Tests for the storage of the results of completed tasks."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = _checkpoint.CheckpointStore(self.tmpdir.name, "graph")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_save_and_load(self):
+        """A stored result is found again for the same range."""
+        current_range = EmptySourceRange(None, 0, 0, 10)
+        self.assertIsNone(self.store.load(current_range))
+
+        self.store.save(current_range, TaskResult([42], None))
+
+        self.assertListEqual(self.store.load(current_range).mergeables, [42])
+
+    def test_range_identity_ignores_execution(self):
+        """
+        The result of a range is reused by other executions, but not by a range
+        with the same id covering different entries.
+        """
+        self.store.save(EmptySourceRange("first execution", 0, 0, 10), TaskResult([1], None))
+
+        self.assertIsNotNone(self.store.load(EmptySourceRange("second execution", 0, 0, 10)))
+        self.assertIsNone(self.store.load(EmptySourceRange("second execution", 0, 0, 20)))
+
+    def test_split_ranges(self):
+        """Only the ranges without a stored result are still pending."""
+        ranges = [EmptySourceRange(None, i, 10 * i, 10 * (i + 1)) for i in range(4)]
+        self.store.save(ranges[1], TaskResult([1], None))
+        self.store.save(ranges[3], TaskResult([3], None))
+
+        pending, completed = self.store.split_ranges(ranges)
+
+        self.assertListEqual([current_range.id for current_range in pending], [0, 2])
+        self.assertListEqual([result.mergeables for result in completed], [[1], [3]])
+
+    def test_checkpointing_mapper(self):
+        """The mapper stores its result before returning it."""
+        current_range = EmptySourceRange(None, 0, 0, 10)
+
+        result = _checkpoint.checkpointing_mapper(self.store, lambda r: TaskResult([r.end], None), current_range)
+
+        self.assertListEqual(result.mergeables, [10])
+        self.assertListEqual(self.store.load(current_range).mergeables, [10])
+
+    def test_clear(self):
+        """Clearing the store removes its directory."""
+        self.store.save(EmptySourceRange(None, 0, 0, 10), TaskResult([1], None))
+        self.store.clear()
+        self.assertFalse(os.path.exists(self.store.directory))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+import numpy
+
+from DistRDF import _compact_histogram
+
+
+def roundtrip(contents, sumw2):
+    payload = _compact_histogram.encode_bins(contents, sumw2)
+    decoded_contents = numpy.zeros_like(contents)
+    decoded_sumw2 = numpy.zeros_like(sumw2) if sumw2 is not None else None
+    _compact_histogram.decode_bins(payload, decoded_contents, decoded_sumw2)
+    return payload, decoded_contents, decoded_sumw2
+
+
+class BinEncodingTest(unittest.TestCase):
+    """Tests for the compact encoding of the bins of a histogram."""
+
+    def test_sparse_bins(self):
+        """Only the filled bins are stored when most bins are empty."""
+        contents = numpy.zeros(100000)
+        contents[[0, 17, 500, 99999]] = [1., 2., 3., 4.]
+        sumw2 = numpy.zeros(100000)
+        sumw2[[0, 17, 500, 99999]] = [1., 4., 9., 16.]
+        # A bin with only a sum of squared weights must be kept too
+        sumw2[42] = 0.5
+
+        payload, decoded_contents, decoded_sumw2 = roundtrip(contents, sumw2)
+
+        self.assertIsNotNone(payload.indices)
+        self.assertLess(len(payload.indices) + len(payload.contents) + len(payload.sumw2), 1000)
+        numpy.testing.assert_array_equal(decoded_contents, contents)
+        numpy.testing.assert_array_equal(decoded_sumw2, sumw2)
+
+    def test_dense_bins(self):
+        """All the bins are stored when most of them are filled."""
+        contents = numpy.arange(1, 1001, dtype=numpy.float32)
+        contents[::10] = 0
+
+        payload, decoded_contents, decoded_sumw2 = roundtrip(contents, None)
+
+        self.assertIsNone(payload.indices)
+        self.assertIsNone(payload.sumw2)
+        self.assertIsNone(decoded_sumw2)
+        numpy.testing.assert_array_equal(decoded_contents, contents)
+
+    def test_empty_histogram(self):
+        """A histogram without entries is encoded without any bin."""
+        contents = numpy.zeros(10, dtype=numpy.int32)
+
+        payload, decoded_contents, _ = roundtrip(contents, None)
+
+        self.assertIsNotNone(payload.indices)
+        numpy.testing.assert_array_equal(decoded_contents, contents)
+
+
+if __name__ == "__main__":
+    unittest.main()
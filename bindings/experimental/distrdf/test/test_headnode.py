@@ -140,6 +140,30 @@ class DataFrameConstructorTests(unittest.TestCase):
         # instance stores it as list[str]
         self.assertListEqual(hn_3.inputfiles, rdf_2_files)
 
+    def test_execution_options(self):
+        """Options of the distributed execution are validated and stored."""
+        hn = get_headnode(None, None, "treename", "file.root", scheduling="dynamic", partitioning="bytes",
+                          locality="url")
+        self.assertEqual(hn.scheduling, "dynamic")
+        self.assertEqual(hn.partitioning, "bytes")
+        self.assertEqual(hn.locality, "url")
+        self.assertEqual(hn.reduction, "tree")
+        self.assertFalse(hn.profiling)
+        self.assertIsNone(hn.profile)
+
+        with self.assertRaises(ValueError):
+            get_headnode(None, None, "treename", "file.root", scheduling="random")
+        with self.assertRaises(ValueError):
+            get_headnode(None, None, "treename", "file.root", partitioning="random")
+        with self.assertRaises(ValueError):
+            get_headnode(None, None, "treename", "file.root", locality="random")
+        with self.assertRaises(ValueError):
+            get_headnode(None, None, "treename", "file.root", reduction="random")
+        with self.assertRaises(ValueError):
+            get_headnode(None, None, "treename", "file.root", target_task_bytes=0)
+        with self.assertRaises(ValueError):
+            get_headnode(None, None, "treename", "file.root", target_task_duration=-1.)
+
     def test_three_args_with_single_file(self):
         """Constructor with TTree, one input file and selected branches"""
         rdf_branches = ["branch1", "branch2"]
@@ -0,0 +1,113 @@
+import json
+import os
+import tempfile
+import unittest
+
+from DistRDF import _profiling
+from DistRDF.Backends import Base
+
+
+def make_timing(task_id, start, **phases):
+    return _profiling.TaskTiming("map", task_id, "host", 1, start, phases)
+
+
+class PhaseRecordingTest(unittest.TestCase):
+    """Tests for the recording of the phases of a task."""
+
+    def test_phases_of_task(self):
+        """The phases recorded between the start and the end of a task are kept in order."""
+        _profiling.start_task("map", 3)
+        with _profiling.phase("setup"):
+            pass
+        with _profiling.phase("event_loop"):
+            pass
+        timing = _profiling.end_task()
+
+        self.assertEqual(timing.kind, "map")
+        self.assertEqual(timing.task_id, 3)
+        self.assertListEqual(list(timing.phases), ["setup", "event_loop"])
+        self.assertTrue(all(duration >= 0 for duration in timing.phases.values()))
+
+    def test_phase_before_task(self):
+        """A phase recorded before a task starts is attributed to the next task."""
+        with _profiling.phase("declare"):
+            pass
+        _profiling.start_task("map", 0)
+        timing = _profiling.end_task()
+        self.assertIn("declare", timing.phases)
+
+        # The pending phase is consumed by the first task
+        _profiling.start_task("map", 1)
+        timing = _profiling.end_task()
+        self.assertNotIn("declare", timing.phases)
+
+    def test_counters(self):
+        """Counters are summed per task and ignored outside of a task."""
+        _profiling.count("ignored", 1.)
+        _profiling.start_task("map", 0)
+        _profiling.count("declare_time_saved", 0.5)
+        _profiling.count("declare_time_saved", 0.25)
+        timing = _profiling.end_task()
+        self.assertDictEqual(timing.counters, {"declare_time_saved": 0.75})
+
+    def test_serialized_size(self):
+        """The size of the pickled result is stored in the timing."""
+        timing = make_timing(0, 0.)
+        _profiling.measure_serialized_size(timing, b"x" * 1000)
+        self.assertGreaterEqual(timing.serialized_size, 1000)
+        self.assertIn("serialize", timing.phases)
+
+    def test_reducer_gathers_timings(self):
+        """The reducer concatenates the timings of the tasks and adds its own."""
+        first = Base.TaskResult(None, None, timings=[make_timing(0, 0., event_loop=1.)])
+        second = Base.TaskResult(None, None, timings=[make_timing(1, 0., event_loop=1.)])
+
+        merged = Base.distrdf_reducer(first, second)
+
+        self.assertListEqual([timing.kind for timing in merged.timings], ["map", "map", "reduce"])
+
+    def test_reducer_without_profiling(self):
+        """No timings are returned if the tasks were not profiled."""
+        merged = Base.distrdf_reducer(Base.TaskResult(None, None), Base.TaskResult(None, None))
+        self.assertIsNone(merged.timings)
+
+
+class ExecutionProfileTest(unittest.TestCase):
+    """Tests for the summaries of the timings of an execution."""
+
+    def setUp(self):
+        self.profile = _profiling.ExecutionProfile([
+            make_timing(task_id, float(task_id), setup=0.1, event_loop=duration)
+            for task_id, duration in enumerate([1., 1.2, 0.9, 5., 1.1])
+        ])
+
+    def test_stragglers(self):
+        """Only the tasks much slower than the median are stragglers."""
+        self.assertListEqual([task.task_id for task in self.profile.stragglers()], [3])
+        self.assertListEqual(self.profile.stragglers(factor=10.), [])
+
+    def test_report(self):
+        """The report lists the phases and the slowest task first."""
+        report = self.profile.report(nslowest=2)
+        self.assertIn("5 map tasks", report)
+        self.assertIn("event_loop", report)
+        self.assertIn("task 3 on host", report)
+        self.assertLess(report.index("task 3 on host"), report.index("task 1 on host"))
+
+    def test_chrome_trace(self):
+        """Each task and each of its phases is a complete event in the trace."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "trace.json")
+            self.profile.to_chrome_trace(path)
+            with open(path) as f:
+                events = json.load(f)["traceEvents"]
+
+        self.assertEqual(len(events), 5 * 3)
+        self.assertTrue(all(event["ph"] == "X" for event in events))
+        task_event = next(event for event in events if event["name"] == "task 3")
+        self.assertAlmostEqual(task_event["ts"], 3e6)
+        self.assertAlmostEqual(task_event["dur"], 5.1e6)
+
+
+if __name__ == "__main__":
+    unittest.main()
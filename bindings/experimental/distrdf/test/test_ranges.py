@@ -1,8 +1,10 @@
 import os
+import shutil
+import tempfile
 import unittest
 
 from DistRDF.HeadNode import get_headnode
-from DistRDF import Ranges
+from DistRDF import Ranges, _metadata_cache
 
 import ROOT
 
@@ -518,3 +520,176 @@ class TreeRanges(unittest.TestCase):
         ]
 
         self.assertListEqual(ranges, ranges_reqd)
+
+
+class WeightedRanges(unittest.TestCase):
+    """
+    Test cases with ranges balanced according to the amount of work in each
+    file, rather than the number of files.
+    """
+
+    def test_weighted_boundaries_equal_weights(self):
+        """Equal weights give the same boundaries as splitting by files."""
+        boundaries = Ranges.get_weighted_boundaries([10, 10, 10, 10], 2)
+        self.assertListEqual(boundaries, [(0, 0.), (2, 0.), (4, 0.)])
+
+    def test_weighted_boundaries_mixed_sizes(self):
+        """A small and a big file: all but the first task read only the big file."""
+        treenames = ["t"] * 2
+        filenames = ["small.root", "big.root"]
+        weights = [50, 5000]
+
+        percranges = Ranges.get_percentage_ranges(
+            treenames, filenames, 4, friendinfo=None, exec_id=None, weights=weights)
+
+        self.assertListEqual([r.filenames for r in percranges],
+                             [filenames, ["big.root"], ["big.root"], ["big.root"]])
+        # Each task holds a quarter of the total work
+        work = [
+            (1 - r.first_tree_start_perc) * 50 + r.last_tree_end_perc * 5000 if len(r.filenames) == 2
+            else (r.last_tree_end_perc - r.first_tree_start_perc) * 5000
+            for r in percranges
+        ]
+        for task_work in work:
+            self.assertAlmostEqual(task_work, 5050 / 4)
+
+    def test_weighted_boundaries_empty_files(self):
+        """Files with zero weight are still assigned to a task."""
+        filenames = ["a.root", "empty.root", "b.root"]
+        percranges = Ranges.get_percentage_ranges(
+            ["t"] * 3, filenames, 2, friendinfo=None, exec_id=None, weights=[1, 0, 1])
+
+        self.assertListEqual([r.filenames for r in percranges], [["a.root", "empty.root"], ["b.root"]])
+
+    def test_locality_boundaries(self):
+        """Tasks do not span files stored in different locations."""
+        filenames = ["a1.root", "a2.root", "b1.root", "b2.root"]
+        locations = ["site_a", "site_a", "site_b", "site_b"]
+
+        percranges = Ranges.get_percentage_ranges(
+            ["t"] * 4, filenames, 2, friendinfo=None, exec_id=None, weights=[1, 1, 1, 100], locations=locations)
+
+        self.assertListEqual([r.filenames for r in percranges], [["a1.root", "a2.root"], ["b1.root", "b2.root"]])
+
+    def test_locality_more_groups_than_partitions(self):
+        """At least one task is created per location."""
+        filenames = ["a.root", "b.root", "c.root"]
+        locations = ["site_a", "site_b", "site_a"]
+
+        percranges = Ranges.get_percentage_ranges(
+            ["t"] * 3, filenames, 1, friendinfo=None, exec_id=None, locations=locations)
+
+        self.assertListEqual([r.filenames for r in percranges], [["a.root"], ["b.root"], ["c.root"]])
+
+
+class AutomaticPartitioning(unittest.TestCase):
+    """
+    Test cases with the number of tasks computed from the cluster boundaries
+    and sizes of the trees in the dataset.
+    """
+
+    def setUp(self):
+        # A big file with 10 clusters, an empty file, a small file with 2 clusters
+        self.metadata = [
+            _metadata_cache.TreeMetadata(100, list(range(0, 101, 10)), 1000),
+            _metadata_cache.TreeMetadata(0, [0], 0),
+            _metadata_cache.TreeMetadata(7, [0, 3, 7], 70),
+        ]
+
+    def test_oversubscription(self):
+        """Each core gets a few tasks, but never more tasks than clusters."""
+        self.assertEqual(Ranges.get_auto_ntasks(self.metadata, 2), 2 * Ranges.AUTO_TASKS_PER_CORE)
+        self.assertEqual(Ranges.get_auto_ntasks(self.metadata, 100), 12)
+
+    def test_target_bytes(self):
+        """Tasks hold about the target bytes, in full waves of tasks on all cores."""
+        # 1070 bytes in tasks of at most 200 bytes, rounded to a multiple of 4 cores
+        self.assertEqual(Ranges.get_auto_ntasks(self.metadata, 4, tasks_per_core=1, target_bytes=200), 8)
+
+    def test_cluster_aligned_ranges_are_never_empty(self):
+        """Every task starts at a cluster boundary and reads at least one cluster."""
+        filenames = ["big.root", "empty.root", "small.root"]
+        for ntasks in range(1, 20):
+            percranges = Ranges.get_percentage_ranges(
+                ["t"] * 3, filenames, ntasks, friendinfo=None, exec_id=None, metadata=self.metadata,
+                weights=[tree.zipbytes for tree in self.metadata], cluster_aligned=True)
+
+            self.assertEqual(len(percranges), min(ntasks, 12))
+            for percrange in percranges:
+                clusteredrange, _ = Ranges.get_clustered_range_from_percs(percrange)
+                self.assertIsNotNone(clusteredrange)
+                self.assertGreater(clusteredrange.globalend, clusteredrange.globalstart)
+
+
+class TreeMetadataCache(unittest.TestCase):
+    """
+    Tests for the on-disk index of the entries and cluster boundaries of the
+    trees in the dataset.
+    """
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_metadata_matches_file(self):
+        """The metadata is the same whether it comes from the file or from the index."""
+        treenames = ["myTree"] * 2
+        filenames = ["backend/2clusters.root", "backend/4clusters.root"]
+
+        metadata = _metadata_cache.get_trees_metadata(treenames, filenames, self.cache_dir)
+        # One entry per unique tree in the index
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+        cached = _metadata_cache.get_trees_metadata(treenames, filenames, self.cache_dir)
+
+        for treename, filename, meta, cachedmeta in zip(treenames, filenames, metadata, cached):
+            clusters, entries = Ranges.get_clusters_and_entries(treename, filename)
+            self.assertEqual(meta.entries, entries)
+            self.assertListEqual(meta.clusters, clusters)
+            self.assertEqual(cachedmeta, meta)
+
+    def test_clustered_ranges_with_metadata(self):
+        """
+        Ranges built from the metadata sent with the task are the same as those
+        built by opening the files in the task.
+        """
+        treenames = ["myTree"] * 3
+        filenames = ["backend/2clusters.root", "backend/4clusters.root", "backend/1000clusters.root"]
+        metadata = _metadata_cache.get_trees_metadata(treenames, filenames, self.cache_dir)
+
+        for npartitions in (1, 2, 5, 13):
+            with self.subTest(npartitions=npartitions):
+                percranges = Ranges.get_percentage_ranges(
+                    treenames, filenames, npartitions, friendinfo=None, exec_id=None)
+                percranges_meta = Ranges.get_percentage_ranges(
+                    treenames, filenames, npartitions, friendinfo=None, exec_id=None, metadata=metadata)
+
+                for percrange, percrange_meta in zip(percranges, percranges_meta):
+                    self.assertListEqual(
+                        [tree.entries for tree in percrange_meta.metadata],
+                        [Ranges.get_clusters_and_entries(t, f)[1]
+                         for t, f in zip(percrange.treenames, percrange.filenames)])
+
+                    clustered, entries = Ranges.get_clustered_range_from_percs(percrange)
+                    clustered_meta, entries_meta = Ranges.get_clustered_range_from_percs(percrange_meta)
+                    self.assertEqual(entries, entries_meta)
+                    if clustered is None:
+                        self.assertIsNone(clustered_meta)
+                    else:
+                        self.assertEqual((clustered.globalstart, clustered.globalend),
+                                         (clustered_meta.globalstart, clustered_meta.globalend))
+
+    def test_modified_file_invalidates_entry(self):
+        """A file with a different content does not reuse stale metadata."""
+        treename, filename = "entries", "distrdf_unittests_metadata.root"
+        try:
+            ROOT.RDataFrame(10).Define("x", "rdfentry_").Snapshot(treename, filename)
+            first = _metadata_cache.get_trees_metadata([treename], [filename], self.cache_dir)
+            ROOT.RDataFrame(20).Define("x", "rdfentry_").Snapshot(treename, filename)
+            second = _metadata_cache.get_trees_metadata([treename], [filename], self.cache_dir)
+        finally:
+            os.remove(filename)
+
+        self.assertEqual(first[0].entries, 10)
+        self.assertEqual(second[0].entries, 20)
@@ -0,0 +1,108 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from DistRDF import _snapshot_merge
+from DistRDF.Backends import Base
+from DistRDF.PythonMergeables import SnapshotResult
+
+import ROOT
+
+
+class SequentialBackend(Base.BaseBackend):
+    """Dummy backend running the tasks one after the other."""
+
+    def ProcessAndMerge(self, ranges, mapper, reducer):
+        results = [mapper(current_range) for current_range in ranges]
+        while len(results) > 1:
+            results.append(reducer(results.pop(0), results.pop(0)))
+        return results.pop()
+
+    def distribute_unique_paths(self, paths):
+        pass
+
+    def make_dataframe(self, *args, **kwargs):
+        pass
+
+    def optimize_npartitions(self):
+        pass
+
+
+class MergeGroupsTest(unittest.TestCase):
+    """Tests for the grouping of the partial Snapshot outputs."""
+
+    def test_groups_below_target_size(self):
+        """Consecutive files are grouped up to the target size."""
+        self.assertListEqual(_snapshot_merge.plan_merge_groups([3, 3, 3, 3, 3], 6), [[0, 1], [2, 3], [4]])
+        self.assertListEqual(_snapshot_merge.plan_merge_groups([1, 1, 1], 100), [[0, 1, 2]])
+
+    def test_big_files_alone(self):
+        """Files bigger than the target size are kept in their own group."""
+        self.assertListEqual(_snapshot_merge.plan_merge_groups([10, 1, 1, 10], 5), [[0], [1, 2], [3]])
+
+
+class MergeSnapshotOutputsTest(unittest.TestCase):
+    """Tests for the merge stage of the distributed Snapshot."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        filenames = []
+        for i in range(4):
+            filename = os.path.join(self.tmpdir, f"snap_{i}.root")
+            ROOT.RDataFrame(10).Define("x", f"(int)rdfentry_ + {i * 10}").Snapshot("tree", filename)
+            filenames.append(filename)
+        self.snapshot = SnapshotResult("tree", filenames,
+                                       bytes_written=[_snapshot_merge.get_file_size(f) for f in filenames])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_merge_in_single_file(self):
+        """With a big target size, the output is the file requested by the user."""
+        output = os.path.join(self.tmpdir, "snap.root")
+        merged = _snapshot_merge.merge_snapshot_outputs(self.snapshot, SequentialBackend(), output, 10**9)
+
+        self.assertListEqual(merged.filenames, [output])
+        self.assertListEqual(sorted(os.listdir(self.tmpdir)), ["snap.json", "snap.root"])
+
+        values = ROOT.RDataFrame("tree", output).AsNumpy(["x"])["x"]
+        self.assertListEqual(list(values), list(range(40)))
+
+        with open(os.path.join(self.tmpdir, "snap.json")) as f:
+            manifest = json.load(f)
+        self.assertEqual(manifest["files"][0]["name"], output)
+        self.assertListEqual([task["bytes"] for task in manifest["tasks"]], self.snapshot.bytes_written)
+
+    def test_merge_in_multiple_files(self):
+        """The order of the entries is kept across multiple merged files."""
+        output = os.path.join(self.tmpdir, "snap.root")
+        target_size = self.snapshot.bytes_written[0] * 2
+        merged = _snapshot_merge.merge_snapshot_outputs(self.snapshot, SequentialBackend(), output, target_size)
+
+        self.assertGreater(len(merged.filenames), 1)
+        chain = ROOT.TChain("tree")
+        for filename in merged.filenames:
+            chain.Add(filename)
+        values = ROOT.RDataFrame(chain).AsNumpy(["x"])["x"]
+        self.assertListEqual(list(values), list(range(40)))
+
+    def test_merge_in_range_order(self):
+        """The partial outputs are merged in the order of their ranges, not of the tasks."""
+        output = os.path.join(self.tmpdir, "snap.root")
+        shuffled = SnapshotResult("tree", [self.snapshot.filenames[i] for i in (2, 0, 3, 1)],
+                                  bytes_written=[self.snapshot.bytes_written[i] for i in (2, 0, 3, 1)])
+        _snapshot_merge.merge_snapshot_outputs(shuffled, SequentialBackend(), output, 10**9)
+
+        values = ROOT.RDataFrame("tree", output).AsNumpy(["x"])["x"]
+        self.assertListEqual(list(values), list(range(40)))
+
+    def test_remote_manifest_skipped(self):
+        """The manifest is not written to a remote path."""
+        _snapshot_merge.write_manifest("root://eos.example//snap.json", self.snapshot, self.snapshot)
+        self.assertEqual(len(os.listdir(self.tmpdir)), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+'''
+Benchmark of the time spent in `import ROOT`, broken down by phase.
+
+Every run imports ROOT in a new Python interpreter with `-X importtime` and
+attributes the reported times to the phases of the import:
+
+- cppyy: import of cppyy, including the loading of libCore and libCling and
+  the initialization of the interpreter;
+- libROOTPythonizations: import of the C++ extension module of PyROOT;
+- pythonizations: import of the modules of ROOT._pythonization;
+- facade: import of the module facade;
+- other: the rest of `import ROOT`, e.g. the modules of the standard library.
+
+The time of the first access to the ROOT module, which completes the setup of
+the facade, and of the first use of a class, which imports its pythonizations,
+are measured in the same interpreter. The median of the runs is printed.
+
+Usage:
+    python bench_import.py [--runs N] [--class-name TFile]
+'''
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+
+# The code run in each interpreter, prints the times after the import in
+# microseconds
+_CODE = '''
+import time
+import ROOT
+imported = time.perf_counter()
+ROOT.gROOT
+setup = time.perf_counter()
+getattr(ROOT, {class_name!r})
+used = time.perf_counter()
+print("first access", (setup - imported) * 1e6)
+print("first use of {class_name}", (used - setup) * 1e6)
+'''
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( +)(\S+)$')
+
+
+def _get_phase(module):
+    if module == 'cppyy' or module.startswith('cppyy.') or module in ('libcppyy', 'cppyy_backend'):
+        return 'cppyy'
+    if module.startswith('libROOTPythonizations'):
+        return 'libROOTPythonizations'
+    if module.startswith('ROOT._pythonization'):
+        return 'pythonizations'
+    if module == 'ROOT._facade':
+        return 'facade'
+    return None
+
+
+def _parse_imports(output):
+    '''
+    Parses the output of `-X importtime`, in which the line of a module comes
+    after the lines of the modules it imports, indented by one more level.
+
+    Returns:
+        list: the modules imported at the top level, as tuples of the module
+            name, the time spent in the module itself in microseconds and the
+            list of the modules it imported.
+    '''
+    # The imports waiting for the line of the module that imported them, by
+    # indentation level
+    pending = {}
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match is None:
+            continue
+        level = (len(match.group(3)) - 1) // 2
+        module = (match.group(4), int(match.group(1)), pending.pop(level + 1, []))
+        pending.setdefault(level, []).append(module)
+    return pending.get(0, [])
+
+
+def _add_times(module, phase, times):
+    '''
+    Adds the time spent in the module and its imports to `times`. The time of
+    a module goes to its phase, or to the phase of the closest module that
+    imported it.
+    '''
+    name, self_time, imports = module
+    phase = _get_phase(name) or phase
+    times[phase] = times.get(phase, 0) + self_time
+    for imported in imports:
+        _add_times(imported, phase, times)
+
+
+def run(class_name):
+    '''
+    Imports ROOT in a new interpreter.
+
+    Returns:
+        dict: the time in microseconds of each phase.
+    '''
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', _CODE.format(class_name=class_name)],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+
+    root = [module for module in _parse_imports(result.stderr) if module[0] == 'ROOT']
+    if not root:
+        raise RuntimeError('Could not find the import of ROOT in the output:\n' + result.stderr)
+
+    times = {phase: 0 for phase in ('cppyy', 'libROOTPythonizations', 'pythonizations', 'facade', 'other')}
+    _add_times(root[0], 'other', times)
+    times['import ROOT'] = sum(times.values())
+
+    for line in result.stdout.splitlines():
+        name, value = line.rsplit(' ', 1)
+        times[name] = float(value)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10, help='number of interpreters that import ROOT')
+    parser.add_argument('--class-name', default='TFile', help='class used after the import')
+    args = parser.parse_args()
+
+    runs = [run(args.class_name) for _ in range(args.runs)]
+    print('{:<40} {:>12}'.format('phase', 'median [ms]'))
+    for phase in runs[0]:
+        print('{:<40} {:>12.1f}'.format(phase, statistics.median(r.get(phase, 0) for r in runs) / 1000))
+
+
+if __name__ == '__main__':
+    main()
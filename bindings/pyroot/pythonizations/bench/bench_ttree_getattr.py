@@ -0,0 +1,94 @@
+'''
+Benchmark of the access of the branches of a TTree as attributes, `tree.x`.
+
+In an event loop over a tree with many branches, the access through the
+accessors cached at the first access of an attribute is compared with the
+resolution of the branch at every access, which is what every access did
+before the accessors were cached. The resolution is forced by dropping the
+accessors of the tree before each access. The time of the event loop without
+accesses, and of the one that only drops the accessors, is subtracted.
+
+The attributes are the first and the last of the float branches, since the
+search of a branch goes through the list of branches of the tree, and a
+branch of std::vector<double>. The median of the runs is printed.
+
+Usage:
+    python bench_ttree_getattr.py [--entries N] [--branches N] [--runs N]
+'''
+
+import argparse
+import statistics
+import time
+
+import ROOT
+from libROOTPythonizations import ResetBranchAccessors
+
+_CREATE_TREE = '''
+TTree *bench_ttree_getattr_create(int nentries, int nbranches)
+{
+   auto tree = new TTree("bench_ttree_getattr", "bench_ttree_getattr");
+   tree->SetDirectory(nullptr);
+   std::vector<float> values(nbranches);
+   for (int i = 0; i < nbranches; ++i)
+      tree->Branch(("x" + std::to_string(i)).c_str(), &values[i]);
+   std::vector<double> v;
+   tree->Branch("v", &v);
+   for (int entry = 0; entry < nentries; ++entry) {
+      for (int i = 0; i < nbranches; ++i)
+         values[i] = entry + i;
+      v.assign(entry % 10, entry);
+      tree->Fill();
+   }
+   tree->ResetBranchAddresses();
+   return tree;
+}
+'''
+
+
+def _loop(tree, name, access, reset):
+    '''
+    Returns the time in seconds of an event loop over the tree.
+    '''
+    start = time.perf_counter()
+    for event in tree:
+        if reset:
+            ResetBranchAccessors(event)
+        if access:
+            getattr(event, name)
+    return time.perf_counter() - start
+
+
+def run(tree, name):
+    '''
+    Returns:
+        tuple: the time in nanoseconds of an access with and without the
+            cached accessors.
+    '''
+    nentries = tree.GetEntries()
+    empty = _loop(tree, name, access=False, reset=False)
+    cached = _loop(tree, name, access=True, reset=False)
+    reset = _loop(tree, name, access=False, reset=True)
+    uncached = _loop(tree, name, access=True, reset=True)
+    return (cached - empty) / nentries * 1e9, (uncached - reset) / nentries * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=100000, help='number of entries of the tree')
+    parser.add_argument('--branches', type=int, default=200, help='number of float branches of the tree')
+    parser.add_argument('--runs', type=int, default=5, help='number of event loops per measurement')
+    args = parser.parse_args()
+
+    ROOT.gInterpreter.Declare(_CREATE_TREE)
+    tree = ROOT.bench_ttree_getattr_create(args.entries, args.branches)
+
+    print('{:<12} {:>14} {:>14} {:>10}'.format('attribute', 'cached [ns]', 'uncached [ns]', 'speedup'))
+    for name in ('x0', 'x{}'.format(args.branches - 1), 'v'):
+        runs = [run(tree, name) for _ in range(args.runs)]
+        cached = statistics.median(r[0] for r in runs)
+        uncached = statistics.median(r[1] for r in runs)
+        print('{:<12} {:>14.0f} {:>14.0f} {:>10.1f}'.format(name, cached, uncached, uncached / cached))
+
+
+if __name__ == '__main__':
+    main()
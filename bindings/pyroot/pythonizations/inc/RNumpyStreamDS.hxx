@@ -0,0 +1,264 @@
+/*************************************************************************
+ * Copyright (C) 1995-2022, Rene Brun and Fons Rademakers.               *
+ * All rights reserved.                                                  *
+ *                                                                       *
+ * For the licensing terms see $ROOTSYS/LICENSE.                         *
+ * For the list of contributors see $ROOTSYS/README/CREDITS.             *
+ *************************************************************************/
+
+// Include Python.h first before any standard header
+#include "Python.h"
+
+#include "ROOT/RDataFrame.hxx"
+#include "ROOT/RDataSource.hxx"
+#include "ROOT/RDF/Utils.hxx"
+
+#include <algorithm>
+#include <cstddef>
+#include <stdexcept>
+#include <string>
+#include <typeinfo>
+#include <utility>
+#include <vector>
+
+#ifndef ROOT_RNUMPYSTREAMDS
+#define ROOT_RNUMPYSTREAMDS
+
+namespace ROOT {
+
+namespace Internal {
+
+namespace RDF {
+
+////////////////////////////////////////////////////////////////////////////////////////////////
+/// \brief A RDataSource implementation reading chunks of numpy arrays produced by Python
+///
+/// The chunks are requested one at a time to a Python object, the chunk source,
+/// every time RDataFrame asks for new entry ranges. Each chunk is split in one
+/// range per processing slot, so that its entries are processed in parallel
+/// if the implicit multi-threading is enabled. Only the arrays of the current
+/// chunk are kept alive by the chunk source, so the memory usage does not
+/// depend on the size of the dataset.
+///
+/// The chunk source must provide the following methods:
+/// - start(): called at the beginning of the event loop.
+/// - next_chunk(): returns None at the end of the data, otherwise a tuple with
+///   the number of entries of the next chunk, which must not be empty, and a
+///   list with the addresses of its contiguous arrays, in the order of the
+///   columns.
+/// - close(): called at the end of the event loop.
+/// Errors are reported by raising a Python exception, which is turned into a
+/// std::runtime_error.
+class RNumpyStreamDS final : public ROOT::RDF::RDataSource {
+   PyObject *fSource;
+   const std::vector<std::string> fColNames;
+   const std::vector<std::string> fColTypes;
+   const std::vector<std::size_t> fItemSizes;
+   /// The address of the arrays of the current chunk, one per column
+   std::vector<char *> fChunkData;
+   /// The entry corresponding to the first element of the arrays of the current chunk
+   ULong64_t fChunkBegin = 0;
+   /// The first entry of the next chunk
+   ULong64_t fNextEntry = 0;
+   unsigned int fNSlots = 0;
+   /// The address of the value of the current entry, per column and per slot
+   std::vector<std::vector<void *>> fValuePtrs;
+
+   /// Calls a method of the chunk source, throwing if it raises an exception
+   PyObject *CallSource(const char *method)
+   {
+      auto result = PyObject_CallMethod(fSource, method, nullptr);
+      if (!result) {
+         PyObject *type = nullptr, *value = nullptr, *traceback = nullptr;
+         PyErr_Fetch(&type, &value, &traceback);
+         std::string msg = "RNumpyStreamDS: the chunk source raised an exception";
+         if (value) {
+            if (auto str = PyObject_Str(value)) {
+               if (auto cstr = PyUnicode_AsUTF8(str))
+                  msg += std::string(": ") + cstr;
+               Py_DECREF(str);
+            }
+         }
+         PyErr_Clear();
+         Py_XDECREF(type);
+         Py_XDECREF(value);
+         Py_XDECREF(traceback);
+         throw std::runtime_error(msg);
+      }
+      return result;
+   }
+
+   /// Requests the next chunk, returns its number of entries or 0 at the end of the data.
+   /// Must be called holding the GIL.
+   ULong64_t FetchChunk()
+   {
+      auto chunk = CallSource("next_chunk");
+      if (chunk == Py_None) {
+         Py_DECREF(chunk);
+         return 0;
+      }
+
+      ULong64_t nEntries = 0;
+      PyObject *addresses = nullptr;
+      if (!PyArg_ParseTuple(chunk, "KO", &nEntries, &addresses) || !PyList_Check(addresses) ||
+          static_cast<std::size_t>(PyList_Size(addresses)) != fColNames.size()) {
+         PyErr_Clear();
+         Py_DECREF(chunk);
+         throw std::runtime_error("RNumpyStreamDS: the chunk source returned an invalid chunk.");
+      }
+      for (std::size_t i = 0; i < fColNames.size(); ++i)
+         fChunkData[i] = static_cast<char *>(PyLong_AsVoidPtr(PyList_GetItem(addresses, i)));
+      Py_DECREF(chunk);
+      return nEntries;
+   }
+
+protected:
+   std::string AsString() { return "Numpy stream data source"; };
+
+   Record_t GetColumnReadersImpl(std::string_view colName, const std::type_info &id)
+   {
+      const auto index = std::distance(fColNames.begin(), std::find(fColNames.begin(), fColNames.end(), colName));
+      const auto colType = GetTypeName(colName);
+      const auto idName = ROOT::Internal::RDF::TypeID2TypeName(id);
+      if (colType != idName)
+         throw std::runtime_error("Column " + std::string(colName) + " has type " + colType +
+                                  " while the id specified is associated to type " + idName);
+
+      Record_t ret(fNSlots);
+      for (unsigned int slot = 0; slot < fNSlots; ++slot)
+         ret[slot] = &fValuePtrs[index][slot];
+      return ret;
+   }
+
+public:
+   RNumpyStreamDS(PyObject *source, const std::vector<std::string> &colNames, const std::vector<std::string> &colTypes,
+                  const std::vector<std::size_t> &itemSizes)
+      : fSource(source), fColNames(colNames), fColTypes(colTypes), fItemSizes(itemSizes), fChunkData(colNames.size())
+   {
+      PyGILState_STATE state = PyGILState_Ensure();
+      // Take a reference to the chunk source, released with the data source
+      Py_INCREF(fSource);
+      PyGILState_Release(state);
+   }
+
+   ~RNumpyStreamDS()
+   {
+      PyGILState_STATE state = PyGILState_Ensure();
+      Py_DECREF(fSource);
+      PyGILState_Release(state);
+   }
+
+   const std::vector<std::string> &GetColumnNames() const { return fColNames; }
+
+   bool HasColumn(std::string_view colName) const
+   {
+      return std::find(fColNames.begin(), fColNames.end(), colName) != fColNames.end();
+   }
+
+   std::string GetTypeName(std::string_view colName) const
+   {
+      const auto it = std::find(fColNames.begin(), fColNames.end(), colName);
+      if (it == fColNames.end())
+         throw std::runtime_error("The specified column name, \"" + std::string(colName) +
+                                  "\" is not known to the data source.");
+      return fColTypes[std::distance(fColNames.begin(), it)];
+   }
+
+   void SetNSlots(unsigned int nSlots)
+   {
+      fNSlots = nSlots;
+      fValuePtrs.assign(fColNames.size(), std::vector<void *>(nSlots, nullptr));
+   }
+
+   void Initialize()
+   {
+      fChunkBegin = 0;
+      fNextEntry = 0;
+      PyGILState_STATE state = PyGILState_Ensure();
+      try {
+         Py_DECREF(CallSource("start"));
+      } catch (...) {
+         PyGILState_Release(state);
+         throw;
+      }
+      PyGILState_Release(state);
+   }
+
+   std::vector<std::pair<ULong64_t, ULong64_t>> GetEntryRanges()
+   {
+      ULong64_t nEntries = 0;
+      PyGILState_STATE state = PyGILState_Ensure();
+      try {
+         nEntries = FetchChunk();
+      } catch (...) {
+         PyGILState_Release(state);
+         throw;
+      }
+      PyGILState_Release(state);
+
+      std::vector<std::pair<ULong64_t, ULong64_t>> ranges;
+      if (nEntries == 0)
+         return ranges;
+
+      fChunkBegin = fNextEntry;
+      fNextEntry += nEntries;
+
+      // Split the chunk in one range per slot, the remainder is distributed
+      // among the first ranges
+      const auto nRanges = std::min<ULong64_t>(fNSlots, nEntries);
+      const auto rangeSize = nEntries / nRanges;
+      auto remainder = nEntries % nRanges;
+      auto begin = fChunkBegin;
+      for (ULong64_t i = 0; i < nRanges; ++i) {
+         auto end = begin + rangeSize;
+         if (remainder > 0) {
+            --remainder;
+            ++end;
+         }
+         ranges.emplace_back(begin, end);
+         begin = end;
+      }
+      return ranges;
+   }
+
+   bool SetEntry(unsigned int slot, ULong64_t entry)
+   {
+      const auto index = entry - fChunkBegin;
+      for (std::size_t i = 0; i < fColNames.size(); ++i)
+         fValuePtrs[i][slot] = fChunkData[i] + index * fItemSizes[i];
+      return true;
+   }
+
+   void Finalize()
+   {
+      PyGILState_STATE state = PyGILState_Ensure();
+      try {
+         Py_DECREF(CallSource("close"));
+      } catch (...) {
+         PyGILState_Release(state);
+         throw;
+      }
+      PyGILState_Release(state);
+   }
+
+   std::string GetLabel() { return "RNumpyStreamDS"; }
+};
+
+////////////////////////////////////////////////////////////////////////////////////////////////
+/// \brief Create a RDataFrame reading the chunks of numpy arrays of a Python chunk source
+/// \param[in] source The chunk source, see RNumpyStreamDS.
+/// \param[in] colNames The names of the columns.
+/// \param[in] colTypes The C++ types of the columns.
+/// \param[in] itemSizes The size in bytes of the values of the columns.
+inline ROOT::RDataFrame MakeNumpyStreamDataFrame(PyObject *source, const std::vector<std::string> &colNames,
+                                                 const std::vector<std::string> &colTypes,
+                                                 const std::vector<std::size_t> &itemSizes)
+{
+   return ROOT::RDataFrame(std::make_unique<RNumpyStreamDS>(source, colNames, colTypes, itemSizes));
+}
+
+} // namespace RDF
+} // namespace Internal
+} // namespace ROOT
+
+#endif // ROOT_RNUMPYSTREAMDS
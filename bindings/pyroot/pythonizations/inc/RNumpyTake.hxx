@@ -0,0 +1,194 @@
+/*************************************************************************
+ * Copyright (C) 1995-2022, Rene Brun and Fons Rademakers.               *
+ * All rights reserved.                                                  *
+ *                                                                       *
+ * For the licensing terms see $ROOTSYS/LICENSE.                         *
+ * For the list of contributors see $ROOTSYS/README/CREDITS.             *
+ *************************************************************************/
+
+#include "ROOT/RDataFrame.hxx"
+#include "ROOT/RDF/RActionImpl.hxx"
+#include "ROOT/TypeTraits.hxx"
+
+#include <cstdint>
+#include <memory>
+#include <numeric>
+#include <stdexcept>
+#include <string>
+#include <vector>
+
+#ifndef ROOT_RNUMPYTAKE
+#define ROOT_RNUMPYTAKE
+
+namespace ROOT {
+
+namespace Internal {
+
+namespace RDF {
+
+////////////////////////////////////////////////////////////////////////////////////////////////
+/// \brief An action helper writing the values of a column in a preallocated buffer
+///
+/// The value of each entry is written at the position given by its rdfentry_,
+/// relative to the first entry of the event loop. The processing slots thus
+/// write their entries directly at their final position, without growing a
+/// collection per slot and concatenating them at the end of the event loop.
+/// This requires all the entries of the range to reach the action, i.e. no
+/// Filter or Range between the head node and the action, see
+/// ROOT::Internal::RDF::GetKnownEntryRange.
+///
+/// The result of the action is the number of values written in the buffer.
+template <typename T>
+class TakeIntoBufferHelper : public ROOT::Detail::RDF::RActionImpl<TakeIntoBufferHelper<T>> {
+   T *fBuffer;
+   ULong64_t fBegin;
+   ULong64_t fSize;
+   std::shared_ptr<ULong64_t> fNWrittenTotal;
+   std::vector<ULong64_t> fNWritten; ///< Number of values written by each slot
+
+public:
+   using Result_t = ULong64_t;
+   using ColumnTypes_t = ROOT::TypeTraits::TypeList<ULong64_t, T>;
+
+   TakeIntoBufferHelper(T *buffer, ULong64_t begin, ULong64_t size, unsigned int nSlots)
+      : fBuffer(buffer), fBegin(begin), fSize(size), fNWrittenTotal(std::make_shared<ULong64_t>(0)),
+        fNWritten(nSlots, 0)
+   {
+   }
+   TakeIntoBufferHelper(TakeIntoBufferHelper &&) = default;
+   TakeIntoBufferHelper(const TakeIntoBufferHelper &) = delete;
+
+   void InitTask(TTreeReader *, unsigned int) {}
+
+   void Initialize() { /* noop */}
+
+   void Exec(unsigned int slot, ULong64_t entry, const T &value)
+   {
+      if (entry < fBegin || entry - fBegin >= fSize)
+         throw std::out_of_range("Entry " + std::to_string(entry) +
+                                 " is outside of the range of entries of the preallocated AsNumpy buffer.");
+      fBuffer[entry - fBegin] = value;
+      ++fNWritten[slot];
+   }
+
+   void Finalize() { *fNWrittenTotal = std::accumulate(fNWritten.begin(), fNWritten.end(), ULong64_t(0)); }
+
+   std::shared_ptr<ULong64_t> GetResultPtr() const { return fNWrittenTotal; }
+
+   std::string GetActionName() { return "AsNumpy"; }
+};
+
+////////////////////////////////////////////////////////////////////////////////////////////////
+/// \brief Book an action writing the values of a column in a preallocated buffer
+/// \param[in] node The node of the computation graph providing the column.
+/// \param[in] column The name of the column.
+/// \param[in] buffer The address of a buffer of `size` elements of type T.
+/// \param[in] begin The first value of rdfentry_ in the event loop.
+/// \param[in] size The number of entries of the event loop.
+template <typename T>
+ROOT::RDF::RResultPtr<ULong64_t>
+TakeIntoBuffer(ROOT::RDF::RNode node, const std::string &column, std::uintptr_t buffer, ULong64_t begin, ULong64_t size)
+{
+   TakeIntoBufferHelper<T> helper(reinterpret_cast<T *>(buffer), begin, size, node.GetNSlots());
+   return node.Book<ULong64_t, T>(std::move(helper), {"rdfentry_", column});
+}
+
+////////////////////////////////////////////////////////////////////////////////////////////////
+/// \brief The values of a column of collections, flattened in a single array
+template <typename T>
+struct RJaggedColumn {
+   std::vector<T> fContent;         ///< The elements of all the collections, one collection after the other
+   std::vector<Long64_t> fOffsets{0}; ///< The position in fContent of the first element of each collection, followed
+                                    ///< by the total number of elements
+};
+
+////////////////////////////////////////////////////////////////////////////////////////////////
+/// \brief An action helper flattening a column of collections, e.g. RVecs
+///
+/// The elements of the collections are appended to a single vector per slot,
+/// together with the offsets of the collections. At the end of the event loop
+/// the vectors of the slots are appended to the ones of the first slot, which
+/// are the result, so that in single-thread runs the values are copied once.
+/// The result can be adopted by two numpy arrays without copying it.
+template <typename C>
+class TakeJaggedHelper : public ROOT::Detail::RDF::RActionImpl<TakeJaggedHelper<C>> {
+public:
+   using Value_t = typename C::value_type;
+   using Result_t = RJaggedColumn<Value_t>;
+   using ColumnTypes_t = ROOT::TypeTraits::TypeList<C>;
+
+private:
+   /// The first element is the result, filled by the first slot
+   std::vector<std::shared_ptr<Result_t>> fColumns;
+
+public:
+   TakeJaggedHelper(const std::shared_ptr<Result_t> &result, unsigned int nSlots)
+   {
+      fColumns.emplace_back(result);
+      for (unsigned int i = 1; i < nSlots; ++i)
+         fColumns.emplace_back(std::make_shared<Result_t>());
+   }
+   TakeJaggedHelper(TakeJaggedHelper &&) = default;
+   TakeJaggedHelper(const TakeJaggedHelper &) = delete;
+
+   void InitTask(TTreeReader *, unsigned int) {}
+
+   void Initialize() { /* noop */}
+
+   void Exec(unsigned int slot, const C &collection)
+   {
+      auto &column = *fColumns[slot];
+      column.fContent.insert(column.fContent.end(), collection.begin(), collection.end());
+      column.fOffsets.push_back(column.fContent.size());
+   }
+
+   void Finalize()
+   {
+      auto &result = *fColumns[0];
+      std::size_t contentSize = result.fContent.size();
+      std::size_t offsetsSize = result.fOffsets.size();
+      for (unsigned int i = 1; i < fColumns.size(); ++i) {
+         contentSize += fColumns[i]->fContent.size();
+         offsetsSize += fColumns[i]->fOffsets.size() - 1;
+      }
+      result.fContent.reserve(contentSize);
+      result.fOffsets.reserve(offsetsSize);
+
+      for (unsigned int i = 1; i < fColumns.size(); ++i) {
+         auto &column = *fColumns[i];
+         const Long64_t start = result.fContent.size();
+         result.fContent.insert(result.fContent.end(), column.fContent.begin(), column.fContent.end());
+         for (auto offset = column.fOffsets.begin() + 1; offset != column.fOffsets.end(); ++offset)
+            result.fOffsets.push_back(start + *offset);
+         column = Result_t();
+      }
+   }
+
+   std::shared_ptr<Result_t> GetResultPtr() const { return fColumns[0]; }
+
+   std::string GetActionName() { return "AsNumpy"; }
+
+   TakeJaggedHelper MakeNew(void *newResult)
+   {
+      auto &result = *static_cast<std::shared_ptr<Result_t> *>(newResult);
+      *result = Result_t();
+      return TakeJaggedHelper(result, fColumns.size());
+   }
+};
+
+////////////////////////////////////////////////////////////////////////////////////////////////
+/// \brief Book an action flattening a column of collections of type C
+/// \param[in] node The node of the computation graph providing the column.
+/// \param[in] column The name of the column.
+template <typename C>
+ROOT::RDF::RResultPtr<RJaggedColumn<typename C::value_type>> TakeJagged(ROOT::RDF::RNode node, const std::string &column)
+{
+   TakeJaggedHelper<C> helper(std::make_shared<RJaggedColumn<typename C::value_type>>(), node.GetNSlots());
+   return node.Book<C>(std::move(helper), {column});
+}
+
+} // namespace RDF
+} // namespace Internal
+} // namespace ROOT
+
+#endif // ROOT_RNUMPYTAKE
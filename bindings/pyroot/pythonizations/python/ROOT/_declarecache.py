@@ -0,0 +1,333 @@
+'''
+Persistent cache of the C++ code declared to the interpreter from Python
+
+Analyses declare the same helper code with gInterpreter.Declare or cppyy.cppdef
+at the start of every process, e.g. every batch job or every worker of a
+distributed RDataFrame analysis, which parses and jits it again each time.
+When the cache is enabled, the declared code is written to a file of the cache
+and compiled with ACLiC into a shared library with its dictionary. Later
+declarations of the same code, also from other processes, load the library
+instead of jitting the code.
+
+The key of an entry is the hash of the code, of the version of ROOT and of the
+command and flags with which ACLiC compiles. ACLiC checks at every load that
+the library is newer than the headers it depends on, and recompiles it
+otherwise. Code that cannot be compiled on its own, e.g. because it uses
+declarations that exist only in the interpreter, is declared as usual, also
+by later processes.
+
+The cache is opt-in: it is enabled by setting the ROOT_DECLARE_CACHE_DIR
+environment variable to the directory of the cache before importing ROOT. The
+least recently used entries are removed when the total size of the cache
+exceeds ROOT_DECLARE_CACHE_SIZE megabytes, by default 512.
+
+When the cache is enabled, every call of gInterpreter.Declare with a single
+string goes through it, also the ones made by libraries such as cppyy, e.g.
+cppyy.cppdef, or by JupyROOT for the cells of a notebook. The first
+declaration of some code is then a full compilation with ACLiC, which takes
+seconds instead of the milliseconds needed to jit a small declaration, and
+only pays off when the same code is declared again by many processes. Code
+made only of #include directives is declared as usual, since the headers are
+usually already known to the interpreter.
+'''
+
+import hashlib
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    # Without file locks, processes that compile the same entry concurrently
+    # rely on ACLiC to replace the library atomically
+    fcntl = None
+
+import cppyy
+
+_DEFAULT_CACHE_SIZE_MB = 512
+
+# Version of the layout of the entries, part of the keys
+_FORMAT_VERSION = 1
+
+# Length of the keys, the files of an entry start with its key
+_KEY_LENGTH = 64
+
+_FAILED_SUFFIX = '.failed'
+_LOCK_SUFFIX = '.lock'
+
+# The original TInterpreter::Declare, set when the cache is enabled
+_original_declare = None
+
+# The keys of the entries loaded in this process
+_loaded = set()
+_loaded_lock = threading.Lock()
+
+
+def get_cache_dir():
+    '''
+    Returns the directory of the cache, None if the cache is disabled.
+    '''
+    return os.environ.get('ROOT_DECLARE_CACHE_DIR') or None
+
+
+def _get_max_size():
+    try:
+        return int(float(os.environ.get('ROOT_DECLARE_CACHE_SIZE', _DEFAULT_CACHE_SIZE_MB)) * 1024 * 1024)
+    except ValueError:
+        return _DEFAULT_CACHE_SIZE_MB * 1024 * 1024
+
+
+def make_key(code, extension):
+    '''
+    Returns the key of the entry of the code, stored in a file with the given
+    extension. The include paths are not part of the key: the headers that the
+    code includes are checked by ACLiC.
+    '''
+    gROOT = cppyy.gbl.gROOT
+    gSystem = cppyy.gbl.gSystem
+    config = (_FORMAT_VERSION, extension, gROOT.GetVersion(), gROOT.GetGitCommit(), gSystem.GetBuildCompilerVersion(),
+              gSystem.GetMakeSharedLib(), gSystem.GetFlagsOpt())
+
+    hasher = hashlib.sha256()
+    for value in config:
+        hasher.update(str(value).encode())
+        hasher.update(b'\0')
+    hasher.update(code.encode() if isinstance(code, str) else code)
+    return hasher.hexdigest()
+
+
+def declare_uncached(code):
+    '''
+    Declares the code to the interpreter without the cache. Used for the code
+    declared by ROOT itself, which either includes headers of ROOT or embeds
+    addresses of the current process.
+    '''
+    interpreter = cppyy.gbl.gInterpreter
+    if _original_declare is None:
+        return bool(interpreter.Declare(code))
+    return bool(_original_declare(interpreter, code))
+
+
+class _Lock(object):
+    '''
+    Serializes the processes that compile the same entry.
+    '''
+
+    def __init__(self, path):
+        self._path = path
+        self._file = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._file = open(self._path, 'a')
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *args):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+
+
+def _write(path, content):
+    '''
+    Writes the file unless it already exists, atomically so that concurrent
+    processes never compile a partial file. An existing file is left untouched,
+    since ACLiC recompiles the library if its source is newer.
+    '''
+    if os.path.exists(path):
+        return
+    tmppath = '{}.{}.tmp'.format(path, os.getpid())
+    try:
+        with open(tmppath, 'wb') as f:
+            f.write(content)
+        os.replace(tmppath, path)
+    except BaseException:
+        _remove(tmppath)
+        raise
+
+
+def _compile_and_load(key, extension, content):
+    '''
+    Compiles the entry with ACLiC if its library does not exist or is out of
+    date, and loads it.
+
+    Returns:
+        bool: True if the library of the entry is loaded, False if the entry
+            cannot be compiled.
+    '''
+    with _loaded_lock:
+        if key in _loaded:
+            return True
+
+        directory = get_cache_dir()
+        base = os.path.join(directory, key)
+        if os.path.exists(base + _FAILED_SUFFIX):
+            return False
+
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with _Lock(base + _LOCK_SUFFIX):
+                source = base + extension
+                _write(source, content)
+                # The library is created in the cache directory, also if the
+                # user set a build directory for ACLiC
+                compiled = bool(cppyy.gbl.gSystem.CompileMacro(source, 'kOs-', '', directory))
+                if not compiled and os.path.exists(source):
+                    # Later processes declare the code without trying again.
+                    # A missing source is not a failure of the code itself
+                    open(base + _FAILED_SUFFIX, 'w').close()
+        except OSError:
+            # The cache is an optimization, the code is declared as usual
+            return False
+
+        if not compiled:
+            return False
+        _loaded.add(key)
+
+    # Mark the entry as recently used for the eviction. The source is left
+    # untouched, ACLiC would recompile it if it were newer than the library
+    try:
+        os.utime(base + _LOCK_SUFFIX)
+    except OSError:
+        pass
+    _evict(directory, _get_max_size())
+    return True
+
+
+def _is_include_only(code):
+    '''
+    Whether the code only includes headers.
+    '''
+    lines = [line.strip() for line in code.splitlines()]
+    return all(not line or line.startswith('#include') for line in lines)
+
+
+def declare(code):
+    '''
+    Declares the code to the interpreter, through the cache if it is enabled.
+
+    Returns:
+        bool: whether the declaration succeeded.
+    '''
+    if get_cache_dir() is None or _is_include_only(code):
+        return declare_uncached(code)
+    if _compile_and_load(make_key(code, '.cxx'), '.cxx', code.encode()):
+        return True
+    return declare_uncached(code)
+
+
+def declare_header(path):
+    '''
+    Includes the header in the interpreter, through the cache if it is
+    enabled. The entry is keyed by the content of the header instead of its
+    path, so that copies of the same header, e.g. the ones sent to the workers
+    of a distributed analysis, share the entry.
+
+    Returns:
+        bool: whether the declaration succeeded.
+    '''
+    include_code = '#include "{}"\n'.format(path)
+    if get_cache_dir() is None:
+        return declare_uncached(include_code)
+    try:
+        with open(path, 'rb') as f:
+            content = f.read()
+    except OSError:
+        # The interpreter reports the error
+        return declare_uncached(include_code)
+    if _compile_and_load(make_key(content, '.h'), '.h', content):
+        return True
+    return declare_uncached(include_code)
+
+
+def enable(klass):
+    '''
+    Replaces the Declare method of the TInterpreter class with one that
+    declares through the cache. Calls with a second argument, to retrieve the
+    declaration, always use the interpreter. See the documentation of the
+    module for the cost of the first declaration of some code.
+    '''
+    global _original_declare
+    if _original_declare is not None:
+        return
+    _original_declare = klass.Declare
+
+    def Declare(self, code, *args):
+        if args or not isinstance(code, str):
+            return _original_declare(self, code, *args)
+        return declare(code)
+
+    klass.Declare = Declare
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _try_lock(path):
+    '''
+    Takes the lock of an entry without waiting.
+
+    Returns:
+        file: the open lock file, to be closed to release the lock, None if
+            another process holds the lock, e.g. because it is compiling or
+            loading the entry.
+    '''
+    try:
+        lock_file = open(path, 'a')
+    except OSError:
+        return None
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+def _evict(directory, max_size):
+    '''
+    Removes the least recently used entries until the total size of the cache
+    is below `max_size` bytes. The files of an entry start with its key, the
+    entry is as recent as its most recent file. The entries loaded in this
+    process and the ones whose lock is held by another process are kept. The
+    lock files are never removed, since a process waiting on a removed lock
+    file would not exclude the processes locking a new one.
+    '''
+    entries = {}
+    try:
+        with os.scandir(directory) as it:
+            for dir_entry in it:
+                key = dir_entry.name[:_KEY_LENGTH]
+                if len(key) < _KEY_LENGTH or dir_entry.name.endswith('.tmp'):
+                    continue
+                stat = dir_entry.stat()
+                mtime, size, paths = entries.get(key, (0, 0, []))
+                if not dir_entry.name.endswith(_LOCK_SUFFIX):
+                    paths.append(dir_entry.path)
+                entries[key] = (max(mtime, stat.st_mtime), size + stat.st_size, paths)
+    except OSError:
+        return
+
+    total_size = sum(size for _, size, _ in entries.values())
+    for key, (_, size, paths) in sorted(entries.items(), key=lambda item: item[1][0]):
+        if total_size <= max_size:
+            break
+        if key in _loaded or not paths:
+            continue
+        lock_file = None
+        if fcntl is not None:
+            lock_file = _try_lock(os.path.join(directory, key + _LOCK_SUFFIX))
+            if lock_file is None:
+                continue
+        try:
+            for path in paths:
+                _remove(path)
+        finally:
+            if lock_file is not None:
+                lock_file.close()
+        total_size -= size
@@ -6,11 +6,11 @@ from functools import partial
 
 import libcppyy as cppyy_backend
 from cppyy import gbl as gbl_namespace
-from cppyy import cppdef, include
 from libROOTPythonizations import gROOT, CreateBufferFromAddress
 from cppyy.gbl import gSystem
 
 from ._application import PyROOTApplication
+from ._declarecache import declare_uncached
 _numba_pyversion = (2, 7, 5)
 if sys.version_info[:3] > _numba_pyversion:
     # Python <= 2.7.5 cannot use exec in an inner function
@@ -329,6 +329,14 @@ class ROOTFacade(types.ModuleType):
             from libROOTPythonizations import MakeNumpyDataFrame
             ns.FromNumpy = MakeNumpyDataFrame
 
+            # Inject FromArrow function accepting pyarrow tables, which falls
+            # back to the C++ function, if available, for C++ tables
+            from ._pythonization._rdataframe import _make_from_arrow, RDFFromNumpyStream
+            ns.FromArrow = _make_from_arrow(getattr(ns, 'FromArrow', None))
+
+            # Inject FromNumpyStream function
+            ns.FromNumpyStream = RDFFromNumpyStream
+
             if sys.version_info >= (3, 8):
                 try:
                     # Inject Experimental.Distributed package into namespace RDF if available
@@ -373,7 +381,7 @@ class ROOTFacade(types.ModuleType):
     def Numba(self):
         if sys.version_info[:3] <= _numba_pyversion:
             raise Exception('ROOT.Numba requires Python above version {}.{}.{}'.format(*_numba_pyversion))
-        cppdef('namespace Numba {}')
+        declare_uncached('namespace Numba {}')
         ns = self._fallback_getattr('Numba')
         ns.Declare = staticmethod(_NumbaDeclareDecorator)
         del type(self).Numba
@@ -396,7 +404,7 @@ class ROOTFacade(types.ModuleType):
     # Get TPyDispatcher for programming GUI callbacks
     @property
     def TPyDispatcher(self):
-        include('ROOT/TPyDispatcher.h')
+        declare_uncached('#include "ROOT/TPyDispatcher.h"')
         tpd = gbl_namespace.TPyDispatcher
         type(self).TPyDispatcher = tpd
         return tpd
@@ -0,0 +1,313 @@
+'''
+Persistent cache of the Python callables jitted with numba by ROOT.Numba.Declare
+
+Compiling a Python callable with numba takes up to seconds, which every new
+interpreter pays again, e.g. every batch job or every worker of a distributed
+RDataFrame analysis. This module stores on disk the object code of the jitted
+C-friendly wrapper of the callable, together with the Python wrapper code and
+the inferred return type. A later declaration of a callable with the same
+bytecode, the same values of the captured variables and the same signature
+loads the object code instead of compiling it.
+
+The cache is stored in the directory given by the ROOT_NUMBA_CACHE_DIR
+environment variable, by default `$XDG_CACHE_HOME/ROOT/numba` or
+`~/.cache/ROOT/numba`. Setting the variable to an empty string disables the
+cache. The least recently used entries are removed when the total size of the
+cache exceeds ROOT_NUMBA_CACHE_SIZE megabytes, by default 256.
+'''
+
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import types
+
+_DEFAULT_CACHE_SIZE_MB = 256
+_ENTRY_SUFFIX = '.nbc'
+
+# Version of the format of the entries, part of the keys
+_FORMAT_VERSION = 2
+
+# Maximum depth of the functions called by the callable that are hashed
+_MAX_HASH_DEPTH = 8
+
+# The functions of these modules are hashed by name instead of by content
+_LIBRARY_MODULES = ('math', 'cmath', 'numpy', 'numba', 'scipy')
+
+
+def get_cache_dir():
+    '''
+    Returns the directory of the cache, None if the cache is disabled.
+    '''
+    directory = os.environ.get('ROOT_NUMBA_CACHE_DIR')
+    if directory is None:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        directory = os.path.join(base, 'ROOT', 'numba')
+    return directory or None
+
+
+def _get_max_size():
+    try:
+        return int(float(os.environ.get('ROOT_NUMBA_CACHE_SIZE', _DEFAULT_CACHE_SIZE_MB)) * 1024 * 1024)
+    except ValueError:
+        return _DEFAULT_CACHE_SIZE_MB * 1024 * 1024
+
+
+class _NotCacheable(Exception):
+    '''
+    Raised while hashing a callable that captures values whose content cannot
+    be hashed reliably.
+    '''
+
+
+class _Hasher(object):
+    '''
+    Hashes a Python callable with the values it depends on: its bytecode and
+    constants, the values of its closure variables and of the global names it
+    uses, recursively for the functions it calls.
+    '''
+
+    def __init__(self):
+        self._hash = hashlib.sha256()
+        self._visited = set()
+
+    def update(self, *values):
+        for value in values:
+            self._hash.update(repr(value).encode())
+            self._hash.update(b'\0')
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+    def add_code(self, code):
+        '''
+        Adds the parts of a code object that determine its behaviour. The file
+        name and line numbers are left out, so that moving a function in its
+        file does not invalidate the cache.
+        '''
+        self.update('code', code.co_argcount, code.co_kwonlyargcount, code.co_flags, code.co_code,
+                    code.co_names, code.co_varnames, code.co_freevars, code.co_cellvars)
+        for const in code.co_consts:
+            if isinstance(const, types.CodeType):
+                self.add_code(const)
+            else:
+                self.add_value(const, 0)
+
+    def _get_global_names(self, code):
+        names = set(code.co_names)
+        for const in code.co_consts:
+            if isinstance(const, types.CodeType):
+                names |= self._get_global_names(const)
+        return names
+
+    def add_function(self, func, depth):
+        if id(func) in self._visited:
+            self.update('visited', func.__qualname__)
+            return
+        if depth > _MAX_HASH_DEPTH:
+            raise _NotCacheable()
+        self._visited.add(id(func))
+
+        code = func.__code__
+        self.add_code(code)
+        self.update('defaults', func.__defaults__ is not None)
+        for default in func.__defaults__ or ():
+            self.add_value(default, depth + 1)
+
+        if func.__closure__:
+            for name, cell in zip(code.co_freevars, func.__closure__):
+                self.update('closure', name)
+                try:
+                    contents = cell.cell_contents
+                except ValueError:
+                    raise _NotCacheable()
+                self.add_value(contents, depth + 1)
+
+        builtins = func.__globals__.get('__builtins__', {})
+        if isinstance(builtins, types.ModuleType):
+            builtins = builtins.__dict__
+        for name in sorted(self._get_global_names(code)):
+            if name in func.__globals__:
+                self.update('global', name)
+                self.add_value(func.__globals__[name], depth + 1)
+            elif name in builtins:
+                self.update('builtin', name)
+
+    def add_value(self, value, depth):
+        if value is None or isinstance(value, (bool, int, float, complex, str, bytes)):
+            self.update(type(value).__name__, value)
+        elif isinstance(value, (tuple, list, frozenset)):
+            self.update(type(value).__name__, len(value))
+            items = sorted(value, key=repr) if isinstance(value, frozenset) else value
+            for item in items:
+                self.add_value(item, depth)
+        elif isinstance(value, types.ModuleType):
+            self.update('module', value.__name__, getattr(value, '__version__', None))
+        elif isinstance(value, types.FunctionType):
+            module = getattr(value, '__module__', None) or ''
+            if module.split('.')[0] in _LIBRARY_MODULES:
+                # Functions of the libraries supported by numba are
+                # identified by their name, the versions are in the key
+                self.update('library function', module, value.__qualname__)
+            else:
+                self.update('function', value.__qualname__)
+                self.add_function(value, depth)
+        elif isinstance(value, types.BuiltinFunctionType):
+            self.update('builtin', getattr(value, '__module__', None), value.__qualname__)
+        elif hasattr(value, 'py_func') and isinstance(value.py_func, types.FunctionType):
+            # A numba dispatcher, its compilation options are part of its type
+            self.update('dispatcher', type(value).__name__, getattr(value, 'targetoptions', None))
+            self.add_function(value.py_func, depth)
+        elif type(value).__module__ == 'numpy':
+            if type(value).__name__ == 'ufunc':
+                self.update('ufunc', value.__name__)
+            elif hasattr(value, 'dtype') and hasattr(value, 'tobytes'):
+                # Arrays and scalars are compile time constants for numba
+                self.update('numpy', str(value.dtype), getattr(value, 'shape', ()))
+                self._hash.update(value.tobytes())
+            else:
+                raise _NotCacheable()
+        else:
+            raise _NotCacheable()
+
+
+def make_key(func, input_types, return_type):
+    '''
+    Returns the key of the cache entry of a callable jitted with the given
+    C++ types, None if the callable depends on values that cannot be hashed or
+    if the cache is disabled.
+    '''
+    if get_cache_dir() is None:
+        return None
+
+    import numba as nb
+    from numba.core.registry import cpu_target
+
+    hasher = _Hasher()
+    hasher.update(_FORMAT_VERSION, sys.version_info[:3], nb.__version__,
+                  cpu_target.target_context.codegen().magic_tuple(), list(input_types), return_type)
+    try:
+        hasher.add_function(func, 0)
+    except _NotCacheable:
+        return None
+    return hasher.hexdigest()
+
+
+class CachedCFunc(object):
+    '''
+    Stands for the numba.cfunc of a callable loaded from the cache. Like a
+    numba.cfunc, it provides the address of the compiled function and can be
+    called from Python, through the numba dispatcher of the callable.
+    '''
+
+    def __init__(self, library, wrapper_name, dispatcher):
+        self._library = library
+        self.address = library.get_pointer_to_function(wrapper_name)
+        self._dispatcher = dispatcher
+
+    def __call__(self, *args):
+        return self._dispatcher(*args)
+
+
+def _get_path(key):
+    return os.path.join(get_cache_dir(), key + _ENTRY_SUFFIX)
+
+
+def load(key, dispatcher):
+    '''
+    Loads the entry of the key.
+
+    Returns:
+        tuple: the CachedCFunc of the wrapper, the return type and the Python
+            wrapper code, None if there is no valid entry.
+    '''
+    path = _get_path(key)
+    try:
+        with open(path, 'rb') as f:
+            entry = pickle.load(f)
+    except OSError:
+        return None
+    except Exception:
+        # A corrupted entry is removed, it is written again after compiling
+        _remove(path)
+        return None
+
+    try:
+        from numba.core.registry import cpu_target
+        library = cpu_target.target_context.codegen().unserialize_library(entry['library'])
+        cfunc = CachedCFunc(library, entry['wrapper_name'], dispatcher)
+    except Exception:
+        _remove(path)
+        return None
+
+    # Mark the entry as recently used for the eviction
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return cfunc, entry['return_type'], entry['py_wrapper']
+
+
+def store(key, nbcfunc, return_type, py_wrapper):
+    '''
+    Stores the object code of the jitted wrapper. Wrappers that embed
+    addresses of the current process cannot be reused by another process and
+    are not stored.
+    '''
+    library = nbcfunc._library
+    if getattr(library, 'has_dynamic_globals', True):
+        return
+
+    directory = get_cache_dir()
+    try:
+        entry = {
+            'library': library.serialize_using_object_code(),
+            'wrapper_name': nbcfunc._wrapper_name,
+            'return_type': return_type,
+            'py_wrapper': py_wrapper,
+        }
+        os.makedirs(directory, exist_ok=True)
+        fd, tmppath = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmppath, _get_path(key))
+        except BaseException:
+            _remove(tmppath)
+            raise
+    except Exception:
+        # The cache is an optimization, failing to write it is not an error
+        return
+
+    _evict(directory, _get_max_size())
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _evict(directory, max_size):
+    '''
+    Removes the least recently used entries until the total size of the cache
+    is below `max_size` bytes.
+    '''
+    entries = []
+    try:
+        with os.scandir(directory) as it:
+            for dir_entry in it:
+                if dir_entry.name.endswith(_ENTRY_SUFFIX):
+                    stat = dir_entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, dir_entry.path))
+    except OSError:
+        return
+
+    total_size = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total_size <= max_size:
+            break
+        _remove(path)
+        total_size -= size
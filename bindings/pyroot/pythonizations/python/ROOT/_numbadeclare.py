@@ -1,5 +1,7 @@
 from cppyy import gbl as gbl_namespace
 
+from . import _declarecache, _numbacache
+
 
 def _NumbaDeclareDecorator(input_types, return_type = None, name=None):
     '''
@@ -17,21 +19,26 @@ def _NumbaDeclareDecorator(input_types, return_type = None, name=None):
     which converts the Python signature to a C-friendly signature. The wrapper code is accessible by
     the attribute __py_wrapper__. Next, the Python wrapper is given to cling to jit a C++ wrapper function,
     making the original Python callable accessible in C++. The wrapper code in C++ is accessible by
-    the attribute __cpp_wrapper__.
+    the attribute __cpp_wrapper__ and its return type by the attribute __cpp_return_type__.
 
     Note that the callable is fully compiled without side-effects. The numba jitting uses the nopython
     option which does not allow interaction with the Python interpreter. This means that you can use
     the resulting function also safely in multi-threaded environments.
+
+    If the callable returns an RVec, the C++ wrapper function has an additional overload taking the
+    RVec as output parameter as last argument. The returned array is written in the memory of this RVec,
+    which is grown only if the array does not fit, so that calling it repeatedly with the same RVec does
+    not allocate memory once the RVec is large enough.
+
+    The compiled wrapper is stored in a persistent cache on disk, so that declaring the same callable
+    with the same signature in another process does not compile it again. See the _numbacache module
+    for the location and the size of the cache.
     '''
     # Make required imports
     try:
         import numba as nb
     except:
         raise Exception('Failed to import numba')
-    try:
-        import cffi
-    except:
-        raise Exception('Failed to import cffi')
     import re, sys
 
     if sys.version_info >= (3, 7) and hasattr(nb, 'version_info') and nb.version_info >= (0, 54):
@@ -110,15 +117,15 @@ def _NumbaDeclareDecorator(input_types, return_type = None, name=None):
             else:
                 c_input_types.append(get_numba_type(t))
         if 'RVec' in return_type:
-            # We return an RVec through pointers as part of the input arguments. Note that the
-            # pointer type in numba is always an int64 and is later on cast in C++ to the correct type.
-            # In addition, we provide the size of the data type of the array for preallocating memory of
-            # the returned array.
+            # We return an RVec by writing it into an output buffer provided by the caller, passed
+            # as part of the input arguments together with its capacity. The size of the returned
+            # array is always written, so that the caller can grow the buffer if the array does not fit.
             # See the Python wrapper for further information why we are using these types.
             c_return_type = nb.void
             c_input_types += [
-                    nb.types.CPointer(nb.int64), # Pointer to the data (the first element of the array)
-                    nb.types.CPointer(nb.int64)] # Size of the array in elements
+                    nb.types.CPointer(get_numba_type(get_inner_type(return_type))), # Pointer to the output buffer
+                    nb.int64, # Capacity of the output buffer in elements
+                    nb.types.CPointer(nb.int64)] # Size of the returned array in elements
         else:
             c_return_type = get_numba_type(return_type)
         return c_return_type, c_input_types
@@ -167,73 +174,83 @@ def _NumbaDeclareDecorator(input_types, return_type = None, name=None):
         Inner decorator without arguments, see outer decorator for documentation
         '''
 
-        # Jit the given Python callable with numba
-        nb_return_type, nb_input_types = get_numba_signature(input_types, return_type)
-        try:
-            if nb_return_type is not None:
-                nbjit = nb.jit(nb_return_type(*nb_input_types), nopython=True, inline='always')(func)
-            else:
-                nbjit = nb.jit(tuple(nb_input_types), nopython=True, inline='always')(func)
-                nb_return_type = nbjit.nopython_signatures[-1].return_type
-        except:
-            raise Exception('Failed to jit Python callable {} with numba.jit'.format(func))
-        func.numba_func = nbjit
-        # return_type = "int"
-        if return_type is None:
-            type_map = {
-                nb.types.boolean: 'bool',
-                nb.types.uint8: 'unsigned int',
-                nb.types.uint16: 'unsigned int',
-                nb.types.uint32: 'unsigned int',
-                nb.types.uint64: 'unsigned long',
-                nb.types.char: 'int',
-                nb.types.int8: 'int',
-                nb.types.int16: 'int',
-                nb.types.int32: 'int',
-                nb.types.int64: 'long',
-                nb.types.float32: 'float',
-                nb.types.float64: 'double',
-            }
-
-            if nb_return_type in type_map:
-                return_type = type_map[nb_return_type]
-            elif "array" in nb.typeof(nb_return_type).name:
-                return_type = "RVec<" + type_map[nb_return_type.dtype] + ">"
-        # Create Python wrapper with C++ friendly signature
-
-        # Define signature
-        pywrapper_signature = [
-                'ptr_{0}, size_{0}'.format(i) if 'RVec' in t else 'x_{}'.format(i) \
-                        for i, t in enumerate(input_types)]
-        if 'RVec' in return_type:
-            # If we return an RVec, we return via pointer the pointer of the allocated data,
-            # the size in elements. In addition, we provide the size of the datatype in bytes.
-            pywrapper_signature += ['ptrptr_r, ptrsize_r']
+        # Look for the compiled wrapper in the persistent cache, see _numbacache
+        cache_key = _numbacache.make_key(func, input_types, return_type)
+        cached = None
+        if cache_key is not None:
+            # The callable is compiled by numba only if called from Python
+            nbjit = nb.jit(nopython=True, inline='always')(func)
+            cached = _numbacache.load(cache_key, nbjit)
+
+        if cached is not None:
+            nbcfunc, return_type, pywrappercode = cached
+            func.numba_func = nbjit
+            func.__py_wrapper__ = pywrappercode
+            func.__numba_cfunc__ = nbcfunc
+        else:
+            # Jit the given Python callable with numba
+            nb_return_type, nb_input_types = get_numba_signature(input_types, return_type)
+            try:
+                if nb_return_type is not None:
+                    nbjit = nb.jit(nb_return_type(*nb_input_types), nopython=True, inline='always')(func)
+                else:
+                    nbjit = nb.jit(tuple(nb_input_types), nopython=True, inline='always')(func)
+                    nb_return_type = nbjit.nopython_signatures[-1].return_type
+            except:
+                raise Exception('Failed to jit Python callable {} with numba.jit'.format(func))
+            func.numba_func = nbjit
+            # return_type = "int"
+            if return_type is None:
+                type_map = {
+                    nb.types.boolean: 'bool',
+                    nb.types.uint8: 'unsigned int',
+                    nb.types.uint16: 'unsigned int',
+                    nb.types.uint32: 'unsigned int',
+                    nb.types.uint64: 'unsigned long',
+                    nb.types.char: 'int',
+                    nb.types.int8: 'int',
+                    nb.types.int16: 'int',
+                    nb.types.int32: 'int',
+                    nb.types.int64: 'long',
+                    nb.types.float32: 'float',
+                    nb.types.float64: 'double',
+                }
 
-        # Define arguments for jit function
-        pywrapper_args_def = [
-                'x_{0} = nb.carray(ptr_{0}, (size_{0},))'.format(i) if 'RVec' in t else 'x_{}'.format(i) \
-                        for i, t in enumerate(input_types)]
-        pywrapper_args = ['x_{}'.format(i) for i in range(len(input_types))]
+                if nb_return_type in type_map:
+                    return_type = type_map[nb_return_type]
+                elif "array" in nb.typeof(nb_return_type).name:
+                    return_type = "RVec<" + type_map[nb_return_type.dtype] + ">"
+            # Create Python wrapper with C++ friendly signature
 
-        # Define return operation
-        if 'RVec' in return_type:
-            innert = get_inner_type(return_type)
-            dtypesize = 1 if innert == 'bool' else int(get_numba_type(innert).bitwidth / 8)
-            pywrapper_return = '\n    '.join([
-                '# Because we cannot manipulate the memory management of the numpy array we copy the data',
-                'ptr = malloc(r.size * {})'.format(dtypesize),
-                'cp = nb.carray(ptr, r.size, dtype_r)',
-                'cp[:] = r[:]',
-                '# Return size of the array and the pointer to the copied data',
-                'ptrsize_r[0] = r.size',
-                'ptrptr_r[0] = cp.ctypes.data'
-                ])
-        else:
-            pywrapper_return = 'return r'
+            # Define signature
+            pywrapper_signature = [
+                    'ptr_{0}, size_{0}'.format(i) if 'RVec' in t else 'x_{}'.format(i) \
+                            for i, t in enumerate(input_types)]
+            if 'RVec' in return_type:
+                # If we return an RVec, we get the output buffer and its capacity in elements and
+                # we return via pointer the size of the array in elements.
+                pywrapper_signature += ['ptr_r, capacity_r, ptrsize_r']
 
-        # Build wrapper code
-        pywrappercode = '''\
+            # Define arguments for jit function
+            pywrapper_args_def = [
+                    'x_{0} = nb.carray(ptr_{0}, (size_{0},))'.format(i) if 'RVec' in t else 'x_{}'.format(i) \
+                            for i, t in enumerate(input_types)]
+            pywrapper_args = ['x_{}'.format(i) for i in range(len(input_types))]
+
+            # Define return operation
+            if 'RVec' in return_type:
+                pywrapper_return = '\n    '.join([
+                    '# Because the numpy array does not outlive the call we copy the data in the output buffer,',
+                    '# if it fits. Otherwise the caller grows the buffer and calls again.',
+                    'ptrsize_r[0] = r.size',
+                    'if r.size <= capacity_r:',
+                    '    nb.carray(ptr_r, (r.size,))[:] = r[:]'
+                    ])
+            else:
+                pywrapper_return = 'return r'
+
+            # Build wrapper code
+            pywrappercode = '''\
 def pywrapper({SIGNATURE}):
     """
     Wrapper function for the jitted Python callable with special treatment of arrays
@@ -245,40 +262,35 @@ def pywrapper({SIGNATURE}):
     # Return the result
     {RETURN}
         '''.format(
-                SIGNATURE=', '.join(pywrapper_signature),
-                ARGS_DEF='\n    '.join(pywrapper_args_def),
-                ARGS=', '.join(pywrapper_args),
-                RETURN=pywrapper_return
-                )
-
-        glob = dict(globals()) # Make a shallow copy of the dictionary so we don't pollute the global scope
-        glob['nb'] = nb
-        glob['nbjit'] = nbjit
-
-        ffi = cffi.FFI()
-        ffi.cdef('void* malloc(long size);')
-        C = ffi.dlopen(None)
-        glob['malloc'] = C.malloc
-
-        if 'RVec' in return_type:
-            glob['dtype_r'] = get_numba_type(get_inner_type(return_type))
+                    SIGNATURE=', '.join(pywrapper_signature),
+                    ARGS_DEF='\n    '.join(pywrapper_args_def),
+                    ARGS=', '.join(pywrapper_args),
+                    RETURN=pywrapper_return
+                    )
+
+            glob = dict(globals()) # Make a shallow copy of the dictionary so we don't pollute the global scope
+            glob['nb'] = nb
+            glob['nbjit'] = nbjit
+
+            if sys.version_info[0] >= 3:
+                exec(pywrappercode, glob, locals()) in {}
+            else:
+                exec(pywrappercode) in glob, locals()
 
-        if sys.version_info[0] >= 3:
-            exec(pywrappercode, glob, locals()) in {}
-        else:
-            exec(pywrappercode) in glob, locals()
+            if not 'pywrapper' in locals():
+                raise Exception('Failed to create Python wrapper function:\n{}'.format(pywrappercode))
 
-        if not 'pywrapper' in locals():
-            raise Exception('Failed to create Python wrapper function:\n{}'.format(pywrappercode))
+            # Jit the Python wrapper code
+            c_return_type, c_input_types = get_c_signature(input_types, return_type)
+            try:
+                nbcfunc = nb.cfunc(c_return_type(*c_input_types), nopython=True)(locals()['pywrapper'])
+            except:
+                raise Exception('Failed to jit Python wrapper with numba.cfunc')
+            func.__py_wrapper__ = pywrappercode
+            func.__numba_cfunc__ = nbcfunc
 
-        # Jit the Python wrapper code
-        c_return_type, c_input_types = get_c_signature(input_types, return_type)
-        try:
-            nbcfunc = nb.cfunc(c_return_type(*c_input_types), nopython=True)(locals()['pywrapper'])
-        except:
-            raise Exception('Failed to jit Python wrapper with numba.cfunc')
-        func.__py_wrapper__ = pywrappercode
-        func.__numba_cfunc__ = nbcfunc
+            if cache_key is not None:
+                _numbacache.store(cache_key, nbcfunc, return_type, pywrappercode)
 
         # Get address of jitted wrapper function
         address = nbcfunc.address
@@ -306,14 +318,14 @@ def pywrapper({SIGNATURE}):
                 input_types_ref.append(t)
                 func_ptr_input_types.append(t)
 
-        input_signature = ', '.join('{} x_{}'.format(t, i) for i, t in enumerate(input_types_ref))
+        input_signature = ['{} x_{}'.format(t, i) for i, t in enumerate(input_types_ref)]
 
         if 'RVec' in return_type:
             # See C++ wrapper code for the reason using these types
             innert = get_inner_type(return_type)
-            func_ptr_input_types += ['{}**, long*'.format('char' if innert == 'bool' else innert)]
+            func_ptr_input_types += ['{}*, long, long*'.format('char' if innert == 'bool' else innert)]
         func_ptr_type = '{RETURN_TYPE}(*)({INPUT_TYPES})'.format(
-                RETURN_TYPE='void*' if 'RVec' in return_type else return_type,
+                RETURN_TYPE='void' if 'RVec' in return_type else return_type,
                 INPUT_TYPES=', '.join(func_ptr_input_types)
                 )
 
@@ -329,25 +341,29 @@ def pywrapper({SIGNATURE}):
                     vecbool_conversion += ['ROOT::RVec<char> xb_{0} = x_{0};'.format(i)]
             else:
                 func_args += ['x_{}'.format(i)]
-        if 'RVec' in return_type:
-            # See C++ wrapper code for the reason using these arguments
-            func_args += ['&ptr, &size']
 
         # Define return operation
         if 'RVec' in return_type:
-            innert = get_inner_type(return_type)
-            if innert == 'bool': innert = 'char'
+            # The returned RVec is an output parameter, the memory of which is reused by the jitted
+            # Python wrapper. An overload returning the RVec by value is defined below.
+            rvec_return_type = 'ROOT::' + return_type
+            return_type_cpp = 'void'
+            # Numpy stores bools in one byte, as RVec<bool>
+            ptr_r = 'reinterpret_cast<char*>(x_r.data())' if get_inner_type(return_type) == 'bool' else 'x_r.data()'
             return_op = '\n    '.join([
-                '// Because an RVec cannot take the ownership of external data, we have to copy the returned array',
+                '// The jitted Python wrapper writes the returned array in the memory of x_r if it fits in',
+                '// its capacity. The elements are not initialized before, set_size only updates the size',
                 'long size; // Size of the returned array',
-                '{}* ptr; // Pointer to the data of the returned array'.format(innert),
-                'funcptr({});'.format(', '.join(func_args)),
-                # TODO: Remove this copy as soon as RVec can adopt the ownership
-                'ROOT::RVec<{}> x_r(ptr, ptr + size);'.format(innert),
-                'free(ptr);',
-                # If we return a RVec<bool>, we rely here on the automatic conversion of RVec<char> to RVec<bool>
-                'return x_r;'])
+                'funcptr({});'.format(', '.join(func_args + [ptr_r, 'static_cast<long>(x_r.capacity())', '&size'])),
+                'if (size > static_cast<long>(x_r.capacity())) {',
+                '   // The returned array does not outlive the call, we grow x_r and call again',
+                '   x_r.clear();',
+                '   x_r.reserve(size);',
+                '   funcptr({});'.format(', '.join(func_args + [ptr_r, 'static_cast<long>(x_r.capacity())', '&size'])),
+                '}',
+                'x_r.set_size(size);'])
         else:
+            return_type_cpp = return_type
             return_op = 'return funcptr({});'.format(', '.join(func_args))
 
         # Build wrapper code
@@ -365,19 +381,44 @@ namespace Numba {{
     {RETURN_OP}
 }}
 }}""".format(
-                RETURN_TYPE='ROOT::' + return_type if 'RVec' in return_type else return_type,
+                RETURN_TYPE=return_type_cpp,
                 FUNC_NAME=name,
-                INPUT_SIGNATURE=input_signature,
+                INPUT_SIGNATURE=', '.join(input_signature + (['{}& x_r'.format(rvec_return_type)] \
+                        if 'RVec' in return_type else [])),
                 FUNC_PTR=address,
                 FUNC_PTR_TYPE=func_ptr_type,
                 VECBOOL_CONVERSION='\n    '.join(vecbool_conversion),
                 RETURN_OP=return_op)
 
-        # Jit wrapper C++ code
-        err = gbl_namespace.gInterpreter.Declare(cppwrappercode)
+        if 'RVec' in return_type:
+            # Returning by value requires a new RVec per call. The array is written in a buffer of the
+            # thread, large enough after the first calls, and copied in an RVec of the right size, so that
+            # the jitted Python wrapper is called only once and small arrays use the RVec inline storage.
+            cppwrappercode = """\
+{OUTPUT_PARAMETER_WRAPPER}
+namespace Numba {{
+/*
+ * C++ wrapper function returning the RVec by value
+ */
+{RETURN_TYPE} {FUNC_NAME}({INPUT_SIGNATURE}) {{
+    thread_local {RETURN_TYPE} buffer;
+    {FUNC_NAME}({ARGS});
+    return {RETURN_TYPE}(buffer.begin(), buffer.end());
+}}
+}}""".format(
+                    OUTPUT_PARAMETER_WRAPPER=cppwrappercode,
+                    RETURN_TYPE=rvec_return_type,
+                    FUNC_NAME=name,
+                    INPUT_SIGNATURE=', '.join(input_signature),
+                    ARGS=', '.join(['x_{}'.format(i) for i in range(len(input_types))] + ['buffer']))
+
+        # Jit wrapper C++ code, which embeds the address of the jitted function
+        # and thus cannot go through the cache of the declarations
+        err = _declarecache.declare_uncached(cppwrappercode)
         if not err:
             raise Exception('Failed to jit C++ wrapper code with cling:\n{}'.format(cppwrappercode))
         func.__cpp_wrapper__ = cppwrappercode
+        func.__cpp_return_type__ = rvec_return_type if 'RVec' in return_type else return_type_cpp
 
         return func
 
@@ -10,7 +10,6 @@
 
 import importlib
 import inspect
-import pkgutil
 import re
 import sys
 import traceback
@@ -20,6 +19,80 @@ gbl_namespace = cppyy.gbl
 
 from ._generic import pythonize_generic
 
+# Modules of this package with the ROOT pythonizations that are imported only
+# when a class that they pythonize is first used, by namespace. Each module is
+# associated with prefixes of the names of the classes it pythonizes. When
+# cppyy creates the proxy of a class whose name starts with one of these
+# prefixes, the module is imported and the pythonizors it registers are
+# applied to the class. A module with new pythonizors must be added here.
+_LAZY_PYTHONIZATIONS = {
+    '': [
+        ('TArray', '_tarray'),
+        ('TButton', '_drawables'),
+        ('TChain', '_ttree'),
+        ('TClonesArray', '_tclonesarray'),
+        ('TCollection', '_tcollection'),
+        ('TColorWheel', '_drawables'),
+        ('TComplex', '_tcomplex'),
+        ('TDirectoryFile', '_tdirectoryfile'),
+        ('TFile', '_tfile'),
+        ('TH1', '_th1'),
+        ('TObjString', '_tobjstring'),
+        ('TPad', '_drawables'),
+        ('TPolyLine3D', '_drawables'),
+        ('TPolyMarker', '_drawables'),
+        ('TSeqCollection', '_tseqcollection'),
+        ('TSlider', '_drawables'),
+        ('TString', '_tstring'),
+        ('TTree', '_ttree'),
+        ('TVector3', '_tvector3'),
+        ('TVectorT', '_tvectort'),
+        ('Roo', '_roofit'),
+    ],
+    'ROOT::RDF': [
+        ('RDFDescription', '_rdfdescription'),
+        ('RInterface<', '_rdataframe'),
+    ],
+    'ROOT::VecOps': [
+        ('RVec<', '_rvec'),
+    ],
+    'TDirectory': [
+        ('TContext', '_tcontext'),
+    ],
+    'TMVA': [
+        ('CrossValidation', '_tmva'),
+        ('DataLoader', '_tmva'),
+        ('Factory', '_tmva'),
+    ],
+    'TMVA::Experimental': [
+        ('RBDT', '_tmva'),
+        ('RTensor<', '_tmva'),
+        ('SaveXGBoost', '_tmva'),
+    ],
+    'std': [
+        ('vector<', '_stl_vector'),
+    ],
+}
+
+# Modules of this package that add pythonizations when they are imported, e.g.
+# to classes that are always used such as TObject, instead of registering
+# pythonizors. They are imported together with ROOT.
+_EAGER_PYTHONIZATIONS = [
+    '_cppinstance',
+    '_tclass',
+    '_tdirectory',
+    '_tgraph',
+    '_tinterpreter',
+    '_titer',
+    '_tobject',
+]
+
+# The pythonizors registered with the @pythonization decorator, by namespace.
+# A single function per namespace is registered in cppyy, which invokes them:
+# cppyy does not support registering pythonizors while it runs the ones of the
+# same namespace, which happens when a module is imported lazily.
+_pythonizors = {}
+
 
 def pythonization(class_name, ns='::', is_prefix=False):
     '''
@@ -112,16 +185,11 @@ def pythonization(class_name, ns='::', is_prefix=False):
                     to be pythonized.
             '''
 
-            fqn = klass.__cpp_name__
-
-            # Add pretty printing (done on all classes)
-            pythonize_generic(klass, fqn)
-
             if passes_filter(name):
-                _invoke(user_pythonizor, npars, klass, fqn)
+                _invoke(user_pythonizor, npars, klass, klass.__cpp_name__)
 
         # Register pythonizor in its namespace
-        cppyy.py.add_pythonization(cppyy_pythonizor, ns)
+        _get_pythonizors(ns).append(cppyy_pythonizor)
 
         # Return the original user function.
         # We don't want to modify the user function, we just use the decorator
@@ -340,12 +408,85 @@ def _find_namespace_end(fqn):
 
     return last_found
 
+def _get_pythonizors(ns):
+    '''
+    Returns the list of the pythonizors of the classes of namespace `ns`. The
+    first time, the function that invokes them is registered in cppyy.
+
+    Args:
+        ns (string): namespace of the classes to be pythonized.
+
+    Returns:
+        list[function]: functions with the parameters that cppyy requires for
+            a pythonizor (class proxy and class name).
+    '''
+
+    if ns not in _pythonizors:
+        _pythonizors[ns] = []
+
+        def namespace_pythonizor(klass, name):
+            _pythonize(ns, klass, name)
+
+        cppyy.py.add_pythonization(namespace_pythonizor, ns)
+
+    return _pythonizors[ns]
+
+def _pythonize(ns, klass, name):
+    '''
+    Pythonizes a class of namespace `ns` whose proxy is being created by
+    cppyy: imports the modules with the ROOT pythonizations of the class if
+    they were not imported yet, then invokes the pythonizors of the namespace.
+
+    Args:
+        ns (string): namespace of the class.
+        klass (class type): cppyy proxy of the class.
+        name (string): name of the class, without the namespace.
+    '''
+
+    # Add pretty printing (done on all classes)
+    pythonize_generic(klass, klass.__cpp_name__)
+
+    _import_lazy_pythonizations(ns, name)
+
+    # The list can grow while the pythonizors run, if they use classes for the
+    # first time
+    for pythonizor in list(_pythonizors[ns]):
+        pythonizor(klass, name)
+
+def _import_lazy_pythonizations(ns, name):
+    '''
+    Imports the modules of the lazy ROOT pythonizations of namespace `ns`
+    that pythonize the class `name`.
+
+    Args:
+        ns (string): namespace of the class.
+        name (string): name of the class, without the namespace.
+    '''
+
+    for prefix, module_name in _LAZY_PYTHONIZATIONS.get(ns, ()):
+        if name.startswith(prefix) and module_name not in _imported_modules:
+            # Mark the module first, importing it can use the class again
+            _imported_modules.add(module_name)
+            try:
+                importlib.import_module(__name__ + '.' + module_name)
+            except Exception:
+                print('Error importing the pythonizations of class {}:'.format(name))
+                traceback.print_exc()
+                raise RuntimeError
+
+# The modules of the lazy ROOT pythonizations that were imported
+_imported_modules = set()
+
 def _register_pythonizations():
     '''
-    Registers the ROOT pythonizations with cppyy for lazy injection.
+    Registers the ROOT pythonizations with cppyy for lazy injection. The
+    modules in _LAZY_PYTHONIZATIONS are imported when a class that they
+    pythonize is first used, only the ones in _EAGER_PYTHONIZATIONS are
+    imported now.
     '''
 
-    exclude = [ '_rdf_utils', '_rdf_pyz', '_rdf_conversion_maps' ]
-    for _, module_name, _ in  pkgutil.walk_packages(__path__):
-        if module_name not in exclude:
-            importlib.import_module(__name__ + '.' + module_name)
+    for ns in _LAZY_PYTHONIZATIONS:
+        _get_pythonizors(ns)
+
+    for module_name in _EAGER_PYTHONIZATIONS:
+        importlib.import_module(__name__ + '.' + module_name)
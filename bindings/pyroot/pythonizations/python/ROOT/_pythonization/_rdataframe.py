@@ -95,7 +95,13 @@ df.Define('array', 'ROOT::RVecF{1.,2.,3.}')\
   .Define('arraySquared', 'Numba::pypowarray(array, 2)')
 ~~~
 
-Note that this functionality requires the Python packages `numba` and `cffi` to be installed.
+Functions returning an `RVec` also get an overload taking the returned `RVec` as last argument, e.g.
+`Numba::pypowarray(array, 2, result)`. The returned array is written in the memory of `result`, which is
+reused across calls and grown only when needed, so that C++ code calling the function in a loop does not
+allocate memory for each call. `Define()` with a Python callable returning an array uses this overload with
+one `RVec` per processing slot, owned by the defined column.
+
+Note that this functionality requires the Python package `numba` to be installed.
 
 ### Interoperability with NumPy
 
@@ -111,6 +117,53 @@ cols = df.Filter("x > 10").AsNumpy(["x", "y"]) # retrieve columns "x" and "y" as
 print(cols["x"], cols["y"]) # the values of the cols dictionary are NumPy arrays
 ~~~
 
+#### Columns of variable-length collections
+
+By default, a column of collections such as `RVec<float>` is returned as a NumPy array of objects holding one
+collection per entry. With `jagged="flat"`, the collections of fundamental types are flattened in C++ during the
+event loop and the column is returned as a `JaggedArray`, which holds the elements of all the collections in the
+`content` array and the position of the first element of each collection in the `offsets` array. The two arrays can be
+used directly, e.g. to build an awkward array, or `jagged="awkward"` returns the awkward array right away.
+
+~~~{.py}
+cols = df.AsNumpy(["Muon_pt"], jagged="flat")
+pts = cols["Muon_pt"]
+print(pts.content, pts.offsets, pts.counts) # all the values, the start of each entry, the size of each entry
+print(pts[3]) # the values of the fourth entry, as a view of pts.content
+muon_pt = pts.to_awkward() # or df.AsNumpy(["Muon_pt"], jagged="awkward")["Muon_pt"]
+~~~
+
+#### Streaming batches of NumPy arrays
+
+`AsNumpy()` keeps all the values of the requested columns in memory. To process datasets that do not fit in memory,
+`AsNumpyBatches()` returns a generator of dictionaries of NumPy arrays with `batch_size` entries each (the last batch
+may be smaller). The event loop runs in a background thread while the batches are consumed, and at most
+`max_queued_batches` batches are kept waiting, so the memory usage does not depend on the size of the dataset.
+
+~~~{.py}
+for batch in df.Filter("x > 10").AsNumpyBatches(["x", "y"], batch_size=100000):
+    process(batch["x"], batch["y"])
+~~~
+
+If implicit multi-threading is enabled, the batches hold entries from different threads, so their order does not
+follow the order of the entries in the dataset. Stopping the iteration early interrupts the event loop.
+
+#### Interoperability with Apache Arrow
+
+`AsArrow()` returns the columns as a `pyarrow.Table`, or as a generator of `pyarrow.RecordBatch` objects if `batch_size`
+is given. The Arrow arrays use the memory of the NumPy arrays of `AsNumpy()`, including the flattened content and
+offsets of the RVec columns of fundamental types. In the other direction, `ROOT.RDF.FromArrow` creates an RDataFrame
+reading a `pyarrow.Table`, `pyarrow.RecordBatch` or `pyarrow.RecordBatchReader` through the Arrow C stream interface,
+without copying the data owned by pyarrow. It requires ROOT to be built with Arrow support (`-Darrow=ON`).
+
+~~~{.py}
+table = df.AsArrow(["x", "y"])
+pandas_df = table.to_pandas()
+
+df2 = ROOT.RDF.FromArrow(table)
+print(df2.Sum("x").GetValue())
+~~~
+
 #### Processing data stored in NumPy arrays
 
 In case you have data in NumPy arrays in Python and you want to process the data with ROOT, you can easily
@@ -131,6 +184,22 @@ df = ROOT.RDF.FromNumpy({"x": x, "y": y})
 df.Define("z", "x + y").Snapshot("tree", "file.root")
 ~~~
 
+If the data does not fit in memory, `ROOT.RDF.FromNumpyStream` creates an RDataFrame reading an iterable of such
+dictionaries, e.g. a generator reading a file piece by piece. The chunks are requested by the event loop when it needs
+more entries and only the current chunk is kept in memory. The entries of each chunk are processed in parallel if
+implicit multi-threading is enabled. The columns and their types are taken from the first chunk, and since the iterable
+is consumed, the RDataFrame can run a single event loop.
+
+~~~{.py}
+def read_chunks(filename, chunk_size):
+    with h5py.File(filename) as f:
+        for start in range(0, len(f["x"]), chunk_size):
+            yield {"x": f["x"][start:start + chunk_size], "y": f["y"][start:start + chunk_size]}
+
+df = ROOT.RDF.FromNumpyStream(read_chunks("data.h5", 1000000))
+h = df.Histo1D(("h", "h", 100, 0, 10), "x")
+~~~
+
 ### Construct histogram and profile models from a tuple
 
 The Histo1D(), Histo2D(), Histo3D(), Profile1D() and Profile2D() methods return
@@ -172,12 +241,43 @@ df2_transformed = ROOT.MyTransformation(ROOT.RDF.AsRNode(df2))
 \anchor reference
 */
 '''
+import ctypes
+import queue
+import re
 import sys
+import threading
+from .. import _declarecache
 from . import pythonization
 from ._pyz_utils import MethodTemplateGetter, MethodTemplateWrapper
 
 
-def RDataFrameAsNumpy(df, columns=None, exclude=None, lazy=False):
+def _select_columns(df, columns, exclude, method_name):
+    """Validates the column arguments of AsNumpy and AsNumpyBatches and returns
+    the names of the columns to be read out.
+    """
+    # Sanitize input arguments
+    if isinstance(columns, str):
+        raise TypeError("The columns argument requires a list of strings")
+    if isinstance(exclude, str):
+        raise TypeError("The exclude argument requires a list of strings")
+
+    # Early check for numpy
+    try:
+        import numpy
+    except:
+        raise ImportError("Failed to import numpy during call of RDataFrame.{}.".format(method_name))
+
+    # Find all column names in the dataframe if no column are specified
+    if not columns:
+        columns = [str(c) for c in df.GetColumnNames()]
+
+    # Exclude the specified columns
+    if exclude == None:
+        exclude = []
+    return [col for col in columns if not col in exclude]
+
+
+def RDataFrameAsNumpy(df, columns=None, exclude=None, lazy=False, jagged=None):
     """Read-out the RDataFrame as a collection of numpy arrays.
 
     The values of the dataframe are read out as numpy array of the respective type
@@ -191,6 +291,20 @@ def RDataFrameAsNumpy(df, columns=None, exclude=None, lazy=False):
     The reading is performed in multiple threads if the implicit multi-threading of
     ROOT is enabled.
 
+    If the action is instant and no Filter or Range is applied to a dataset whose
+    number of entries is known in advance, i.e. an empty source or a TTree without
+    entry list, the columns of fundamental types are written directly in numpy
+    arrays allocated before the event loop. Each entry is written at its final
+    position by the thread processing it, without intermediate collections.
+
+    By default, the columns of variable-length collections such as RVec<float> are
+    read out as numpy arrays of objects, one RVec per entry. With `jagged="flat"`, the
+    collections of fundamental types are instead flattened in C++ during the event loop
+    and each of these columns is returned as a JaggedArray, i.e. a numpy array with the
+    elements of all the collections and a numpy array with their offsets. With
+    `jagged="awkward"`, these columns are returned as awkward arrays built on the same
+    memory, which requires the awkward package.
+
     Note that this is an instant action of the RDataFrame graph and will trigger the
     event-loop.
 
@@ -198,40 +312,38 @@ def RDataFrameAsNumpy(df, columns=None, exclude=None, lazy=False):
         columns: If None return all branches as columns, otherwise specify names in iterable.
         exclude: Exclude branches from selection.
         lazy: Determines whether this action is instant (False, default) or lazy (True).
+        jagged: How the columns of collections are read out: None (default) for numpy
+            arrays of objects, "flat" for JaggedArray objects or "awkward" for awkward
+            arrays.
 
     Returns:
         dict or AsNumpyResult: if instant (default), dict with column names as keys and
             1D numpy arrays with content as values; if lazy, AsNumpyResult containing
             the result pointers obtained from the Take actions.
     """
-    # Sanitize input arguments
-    if isinstance(columns, str):
-        raise TypeError("The columns argument requires a list of strings")
-    if isinstance(exclude, str):
-        raise TypeError("The exclude argument requires a list of strings")
+    if jagged not in (None, "flat", "awkward"):
+        raise ValueError("The jagged argument must be None, 'flat' or 'awkward', got {}".format(repr(jagged)))
 
-    # Early check for numpy
-    try:
-        import numpy
-    except:
-        raise ImportError("Failed to import numpy during call of RDataFrame.AsNumpy.")
+    columns = _select_columns(df, columns, exclude, "AsNumpy")
 
-    # Find all column names in the dataframe if no column are specified
-    if not columns:
-        columns = [str(c) for c in df.GetColumnNames()]
-
-    # Exclude the specified columns
-    if exclude == None:
-        exclude = []
-    columns = [col for col in columns if not col in exclude]
+    # If the event loop runs right away, the columns of fundamental types are
+    # written directly in preallocated arrays when possible
+    buffers, first_entry = ({}, 0) if lazy else _allocate_buffers(df, columns)
 
     # Register Take action for each column
     result_ptrs = {}
+    jagged_columns = {}
     for column in columns:
         column_type = df.GetColumnType(column)
-        result_ptrs[column] = df.Take[column_type](column)
+        if column in buffers:
+            result_ptrs[column] = _take_into_buffer(df, column, column_type, buffers[column], first_entry)
+        elif jagged is not None and _is_flattenable(column_type):
+            result_ptrs[column] = _take_jagged(df, column, column_type)
+            jagged_columns[column] = jagged
+        else:
+            result_ptrs[column] = df.Take[column_type](column)
 
-    result = AsNumpyResult(result_ptrs, columns)
+    result = AsNumpyResult(result_ptrs, columns, buffers, jagged_columns)
 
     if lazy:
         return result
@@ -239,6 +351,115 @@ def RDataFrameAsNumpy(df, columns=None, exclude=None, lazy=False):
         return result.GetValue()
 
 
+# The numpy data types of the column types that can be written directly in a
+# preallocated numpy array. These are restricted to the types whose Take
+# results are adopted through the array interface when the arrays are not
+# preallocated, e.g. with lazy=True or in distributed RDataFrame, so that the
+# data type of an array does not depend on how it was filled. The columns of
+# other types, e.g. bool or short, are returned as arrays of objects.
+_BUFFER_DTYPES = {
+    "int": "int32", "Int_t": "int32",
+    "unsigned int": "uint32", "UInt_t": "uint32",
+    "long long": "int64", "Long64_t": "int64",
+    "unsigned long long": "uint64", "ULong64_t": "uint64",
+    "float": "float32", "Float_t": "float32",
+    "double": "float64", "Double_t": "float64",
+}
+
+# Whether the header with the actions of AsNumpy implemented in C++ could be
+# declared, None if it was not tried yet
+_numpy_take_declared = None
+
+
+def _declare_numpy_take():
+    """Declares the actions of AsNumpy implemented in C++ to the interpreter,
+    the first time it is called.
+
+    Returns:
+        bool: whether the actions are available.
+    """
+    global _numpy_take_declared
+    if _numpy_take_declared is None:
+        _numpy_take_declared = _declarecache.declare_uncached('#include "ROOT/RNumpyTake.hxx"')
+    return _numpy_take_declared
+
+
+def _allocate_buffers(df, columns):
+    """Allocates one numpy array per column of fundamental type, if the entries
+    reaching the node are known before running the event loop. This is the
+    case if no Filter or Range is applied to the dataset, and if the dataset
+    is either empty or a TTree without an entry list.
+
+    Returns:
+        tuple: a dictionary where the key is the column name and the value is
+            the array with one element per entry of the dataset, empty if the
+            entries are not known, and the value of rdfentry_ of the first
+            entry.
+    """
+    import numpy
+    from cppyy.gbl.ROOT import RDF, Internal
+
+    dtypes = {}
+    for column in columns:
+        dtype = _BUFFER_DTYPES.get(df.GetColumnType(column))
+        if dtype is not None:
+            dtypes[column] = dtype
+    if not dtypes:
+        return {}, 0
+
+    entry_range = Internal.RDF.GetKnownEntryRange(RDF.AsRNode(df))
+    if entry_range.first < 0:
+        return {}, 0
+
+    if not _declare_numpy_take():
+        return {}, 0
+
+    nentries = entry_range.second - entry_range.first
+    return {column: numpy.empty(nentries, dtype=dtype) for column, dtype in dtypes.items()}, entry_range.first
+
+
+def _take_into_buffer(df, column, column_type, array, first_entry):
+    """Books the action writing the values of the column at their final
+    position in the preallocated array.
+
+    Returns:
+        RResultPtr: the number of values written in the array.
+    """
+    from cppyy.gbl.ROOT import RDF, Internal
+
+    return Internal.RDF.TakeIntoBuffer[column_type](RDF.AsRNode(df), column, array.ctypes.data, first_entry,
+                                                    len(array))
+
+
+# The collections whose elements can be flattened in a single numpy array. The
+# aliases such as RVecF are resolved by the interpreter to the full type name.
+_COLLECTION_TYPE = re.compile(r"^(?:ROOT::VecOps::RVec|ROOT::RVec|RVec|std::vector|vector)<(.+)>$")
+
+
+def _is_flattenable(column_type):
+    """Whether the column is a collection of fundamental types that can be
+    read out as a JaggedArray. The content and the offsets are adopted through
+    the array interface, thus the element types are restricted to the ones in
+    `_BUFFER_DTYPES`. Collections of other types, e.g. bool or short, are read
+    out as arrays of objects.
+    """
+    match = _COLLECTION_TYPE.match(column_type.strip())
+    if match is None:
+        return False
+    return match.group(1).strip() in _BUFFER_DTYPES and _declare_numpy_take()
+
+
+def _take_jagged(df, column, column_type):
+    """Books the action flattening the collections of the column.
+
+    Returns:
+        RResultPtr: the elements of all the collections and their offsets.
+    """
+    from cppyy.gbl.ROOT import RDF, Internal
+
+    return Internal.RDF.TakeJagged[column_type](RDF.AsRNode(df), column)
+
+
 class AsNumpyResult(object):
     """Future-like class that represents the result of an AsNumpy call.
 
@@ -249,10 +470,21 @@ class AsNumpyResult(object):
             AsNumpy.
         _py_arrays (dict): results of the AsNumpy action. The key is the
             column name, the value is the NumPy array for that column.
+        _py_chunks (list): results of other AsNumpy actions merged into this
+            one, e.g. from the tasks of a distributed execution. Each element
+            is a dictionary like `_py_arrays`. The arrays are concatenated only
+            once, when the value is retrieved.
         _result_ptrs (dict): results of the AsNumpy action. The key is the
             column name, the value is the result pointer for that column.
+        _buffers (dict): preallocated arrays filled directly by the event
+            loop. The key is the column name, the value is the NumPy array for
+            that column. The result pointer of these columns holds the number
+            of values written in the array.
+        _jagged (dict): columns of collections flattened by the event loop.
+            The key is the column name, the value is "flat" or "awkward", the
+            format in which the column is returned.
     """
-    def __init__(self, result_ptrs, columns):
+    def __init__(self, result_ptrs, columns, buffers=None, jagged=None):
         """Constructs an AsNumpyResult object.
 
         Parameters:
@@ -260,11 +492,18 @@ class AsNumpyResult(object):
                 column name, the value is the result pointer for that column.
             columns (list): list of the names of the columns returned by
                 AsNumpy.
+            buffers (dict): preallocated arrays of the columns that are
+                written directly by the event loop, if any.
+            jagged (dict): formats of the columns of collections flattened
+                by the event loop, if any.
         """
 
         self._result_ptrs = result_ptrs
         self._columns = columns
+        self._buffers = buffers if buffers is not None else {}
+        self._jagged = jagged if jagged is not None else {}
         self._py_arrays = None
+        self._py_chunks = None
 
     def GetValue(self):
         """Triggers, if necessary, the event loop to run the Take actions for
@@ -275,13 +514,32 @@ class AsNumpyResult(object):
                 column.
         """
 
+        if self._py_arrays is None and self._py_chunks is not None:
+            self._py_arrays = self._concatenate_chunks()
+
         if self._py_arrays is None:
             import numpy
-            from ROOT._pythonization._rdf_utils import ndarray
+            from ROOT._pythonization._rdf_utils import JaggedArray, ndarray
 
             # Convert the C++ vectors to numpy arrays
             self._py_arrays = {}
             for column in self._columns:
+                if column in self._buffers:
+                    nwritten = self._result_ptrs[column].GetValue()
+                    if nwritten != len(self._buffers[column]):
+                        raise RuntimeError("AsNumpy expected {} entries for column '{}' but the event loop processed "
+                                           "{}.".format(len(self._buffers[column]), column, nwritten))
+                    self._py_arrays[column] = ndarray(self._buffers[column], self._result_ptrs[column])
+                    continue
+
+                if column in self._jagged:
+                    cpp_reference = self._result_ptrs[column].GetValue()
+                    # The arrays adopt the memory of the C++ vectors
+                    array = JaggedArray(ndarray(cpp_reference.fContent, self._result_ptrs[column]),
+                                        ndarray(cpp_reference.fOffsets, self._result_ptrs[column]))
+                    self._py_arrays[column] = array.to_awkward() if self._jagged[column] == "awkward" else array
+                    continue
+
                 cpp_reference = self._result_ptrs[column].GetValue()
                 if hasattr(cpp_reference, "__array_interface__"):
                     tmp = numpy.asarray(cpp_reference) # This adopts the memory of the C++ object.
@@ -294,54 +552,606 @@ class AsNumpyResult(object):
 
         return self._py_arrays
 
+    def GetChunks(self):
+        """Returns the results without concatenating the arrays of the merged
+        AsNumpy actions. This avoids allocating the memory for the full arrays
+        when the result can be processed chunk by chunk.
+
+        Returns:
+            list: one dictionary per merged result, where the key is the column
+                name and the value is the NumPy array for that column.
+        """
+
+        if self._py_chunks is not None:
+            return list(self._py_chunks)
+        return [self.GetValue()]
+
+    def _concatenate_chunks(self):
+        """Concatenates the merged chunks, one column at a time. The chunks of
+        a column are released as soon as they are copied, so that the peak
+        memory usage is not twice the size of the full result, unless they
+        are still referenced elsewhere, e.g. from the result of GetChunks.
+        """
+
+        # Shallow copies, so that the dictionaries returned by GetChunks are
+        # not modified
+        chunks = [dict(chunk) for chunk in self._py_chunks]
+        self._py_chunks = None
+
+        if len(chunks) == 1:
+            return chunks[0]
+
+        from ROOT._pythonization._rdf_utils import concatenate
+
+        columns = list(chunks[0].keys())
+        py_arrays = {}
+        for column in columns:
+            py_arrays[column] = concatenate([chunk.pop(column) for chunk in chunks])
+
+        return py_arrays
+
     def Merge(self, other):
         """
         Merges the numpy arrays in the dictionary of this object with the numpy
         arrays in the dictionary of the other object, modifying the attribute of
-        this object inplace.
+        this object inplace. The arrays are not copied: they are stored as
+        separate chunks and concatenated only once, when the value of this
+        object is retrieved.
 
         Raises:
             - RuntimeError: if either of the method arguments doesn't already
                 have filled the internal dictionary of numpy arrays.
-            - ImportError: if the numpy module couldn't be imported.
             - ValueError: If the dictionaries of numpy arrays of the two
                 arguments don't have exactly the same keys.
         """
 
-        if self._py_arrays is None or other._py_arrays is None:
+        if ((self._py_arrays is None and self._py_chunks is None) or
+                (other._py_arrays is None and other._py_chunks is None)):
             raise RuntimeError("Merging instances of 'AsNumpyResult' failed because either of them didn't compute "
                                "their result yet. Make sure to call the 'GetValue' method on both objects before "
                                "trying to merge again.")
 
-        try:
-            import numpy
-        except ImportError:
-            raise ImportError("Failed to import numpy while merging two 'AsNumpyResult' instances.")
+        chunks_self = self._py_chunks if self._py_chunks is not None else [self._py_arrays]
+        chunks_other = other._py_chunks if other._py_chunks is not None else [other._py_arrays]
 
-        if not self._py_arrays.keys() == other._py_arrays.keys():
+        if not chunks_self[0].keys() == chunks_other[0].keys():
             raise ValueError("The two dictionary of numpy arrays have different keys.")
 
-        self._py_arrays = {
-            key: numpy.concatenate([self._py_arrays[key],
-                                    other._py_arrays[key]])
-            for key in self._py_arrays
-        }
+        # The dictionaries of the other result are not shared, since they are
+        # consumed when the chunks are concatenated. The chunks of this result
+        # are extended in place, so that a sequence of merges copies each
+        # chunk only once
+        if self._py_chunks is None:
+            self._py_chunks = chunks_self
+        self._py_chunks.extend(dict(chunk) for chunk in chunks_other)
+        self._py_arrays = None
 
     def __getstate__(self):
         """
         This function is called during the pickle serialization step. Return the
-        dictionary of numpy arrays (i.e. the actual result of this `AsNumpy`
+        list of chunks of numpy arrays (i.e. the actual result of this `AsNumpy`
         call). Other attributes are not needed and the RResultPtr objects are
         not serializable at all.
+
+        The arrays are returned as plain `numpy.ndarray` views, which support
+        out-of-band serialization of their memory with pickle protocol 5, e.g.
+        when sent over the network by Dask, instead of being copied into the
+        pickle stream. JaggedArray and awkward arrays pickle their own arrays
+        in the same way.
         """
-        return self.GetValue()
+        import numpy
+
+        if self._py_chunks is None:
+            self.GetValue()
+
+        return [{column: numpy.asarray(array) if isinstance(array, numpy.ndarray) else array
+                 for column, array in chunk.items()}
+                for chunk in self.GetChunks()]
 
     def __setstate__(self, state):
         """
-        This function is called during unserialization step. Sets the dictionary
-        of numpy array of the unserialized object.
+        This function is called during unserialization step. Sets the chunks of
+        numpy arrays of the unserialized object.
         """
-        self._py_arrays = state
+        self._py_arrays = None
+        self._py_chunks = state
+
+
+def RDataFrameAsNumpyBatches(df, columns=None, batch_size=100000, exclude=None, max_queued_batches=2):
+    """Read-out the RDataFrame as a stream of batches of numpy arrays.
+
+    The event loop is run in a background thread when the iteration starts.
+    The values of the columns are moved out of the Take actions every
+    `batch_size` entries processed by each thread, so that at most
+    `max_queued_batches` batches plus the ones being filled are kept in
+    memory, independently of the size of the dataset.
+
+    The columns are converted as in AsNumpy. If the implicit multi-threading
+    of ROOT is enabled, the entries of a batch can come from different threads
+    and the batches do not follow the order of the entries in the dataset.
+
+    Stopping the iteration before the end interrupts the event loop. The
+    other results booked in the same computation graph are then not valid.
+
+    Parameters:
+        columns: If None return all branches as columns, otherwise specify names in iterable.
+        batch_size: The number of entries in each batch. The last batch can
+            be smaller.
+        exclude: Exclude branches from selection.
+        max_queued_batches: The maximum number of batches waiting to be
+            consumed. The event loop is paused when this number is reached.
+
+    Returns:
+        generator: yields dictionaries with column names as keys and 1D numpy
+            arrays with `batch_size` entries as values.
+    """
+    if batch_size < 1:
+        raise ValueError("The batch_size argument must be a positive integer")
+    if max_queued_batches < 1:
+        raise ValueError("The max_queued_batches argument must be a positive integer")
+
+    columns = _select_columns(df, columns, exclude, "AsNumpyBatches")
+
+    # Register Take action for each column, the batches are extracted from
+    # their partial results
+    result_ptrs = {}
+    for column in columns:
+        column_type = df.GetColumnType(column)
+        result_ptrs[column] = df.Take[column_type](column)
+
+    # Just-in-time compile the computation graph in the current thread, so
+    # that the interpreter is not used from the background thread
+    from cppyy.gbl.ROOT import RDF, Internal
+    node = RDF.AsRNode(df)
+    Internal.RDF.TriggerJit(node)
+
+    producer = _BatchProducer(node, result_ptrs, columns, batch_size, max_queued_batches)
+
+    return _iterate_batches(producer)
+
+
+def _iterate_batches(producer):
+    """Runs the event loop of the producer in a background thread and yields
+    the batches as they are produced.
+    """
+    thread = threading.Thread(target=producer.run, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = producer.queue.get()
+            if item is _BatchProducer.END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        producer.close()
+        thread.join()
+
+
+class _BatchesClosed(Exception):
+    """Raised from the partial result callbacks to interrupt the event loop
+    when the batches are not consumed anymore.
+    """
+
+
+def _copy_to_numpy(collection):
+    """Copies the content of a C++ collection into a numpy array, so that the
+    collection can be cleared. Values that are not of a fundamental type are
+    copy-constructed into a numpy array of objects.
+    """
+    import numpy
+
+    if hasattr(collection, "__array_interface__"):
+        return numpy.array(collection)
+
+    array = numpy.empty(len(collection), dtype=object)
+    for i, x in enumerate(collection):
+        array[i] = type(x)(x)
+    return array
+
+
+class _BatchProducer(object):
+    """Builds batches of numpy arrays of fixed size from the partial results
+    of the Take actions of AsNumpyBatches, while the event loop runs.
+
+    Attributes:
+        queue (queue.Queue): the batches ready to be consumed, followed by
+            `END` or by the exception raised by the event loop.
+        _pending (dict): the arrays extracted for the current entry of each
+            processing slot, by column. The callbacks of the Take actions of a
+            slot are called one after the other, so the arrays of a slot are
+            complete once the callback of the last column was called.
+        _chunks (list): the complete dictionaries of arrays that are not part
+            of a batch yet.
+        _nbuffered (int): the number of entries in `_chunks`.
+    """
+
+    # Marks the end of the batches in the queue
+    END = object()
+
+    def __init__(self, node, result_ptrs, columns, batch_size, max_queued_batches):
+        self.queue = queue.Queue(max_queued_batches)
+        self._node = node
+        self._result_ptrs = result_ptrs
+        self._columns = columns
+        self._batch_size = batch_size
+        self._closed = threading.Event()
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._chunks = []
+        self._nbuffered = 0
+
+        for column, result_ptr in result_ptrs.items():
+            result_ptr.OnPartialResultSlot(batch_size, self._make_callback(column))
+
+    def _make_callback(self, column):
+        def callback(slot, collection):
+            self._on_partial_result(column, slot, collection)
+        return callback
+
+    def _on_partial_result(self, column, slot, collection):
+        """Moves the values taken so far by a processing slot out of the Take
+        action of the column.
+        """
+        if self._closed.is_set():
+            raise _BatchesClosed()
+
+        pending = self._pending.setdefault(slot, {})
+        pending[column] = _copy_to_numpy(collection)
+        collection.clear()
+        if len(pending) == len(self._columns):
+            del self._pending[slot]
+            self._add_chunk(pending)
+
+    def _add_chunk(self, chunk):
+        """Adds the arrays to the buffer and queues all the full batches."""
+        with self._lock:
+            self._chunks.append(chunk)
+            self._nbuffered += len(chunk[self._columns[0]]) if self._columns else 0
+            while self._nbuffered >= self._batch_size:
+                self._put(self._take_batch(self._batch_size))
+
+    def _take_batch(self, size):
+        """Removes the first `size` entries from the buffer and returns them
+        as a single dictionary of arrays.
+        """
+        import numpy
+
+        taken = []
+        ntaken = 0
+        while ntaken < size:
+            chunk = self._chunks.pop(0)
+            nchunk = len(chunk[self._columns[0]])
+            if ntaken + nchunk > size:
+                nchunk = size - ntaken
+                self._chunks.insert(0, {column: array[nchunk:] for column, array in chunk.items()})
+                chunk = {column: array[:nchunk] for column, array in chunk.items()}
+            taken.append(chunk)
+            ntaken += nchunk
+
+        self._nbuffered -= size
+        return {column: numpy.concatenate([chunk[column] for chunk in taken]) for column in self._columns}
+
+    def _put(self, item):
+        """Queues the item, waiting while the queue is full unless the
+        iteration was stopped.
+        """
+        while True:
+            if self._closed.is_set():
+                raise _BatchesClosed()
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def run(self):
+        """Runs the event loop and queues the batches."""
+        from cppyy.gbl.ROOT import Internal
+
+        try:
+            # The GIL is released while the event loop runs, since the
+            # callbacks need it and are called from the threads of the
+            # implicit multi-threading, if enabled
+            Internal.RDF.TriggerRun.__release_gil__ = True
+            Internal.RDF.TriggerRun(self._node)
+
+            # The values that were not moved out by the callbacks are the final
+            # results of the Take actions
+            self._add_chunk({column: _copy_to_numpy(result_ptr.GetValue())
+                             for column, result_ptr in self._result_ptrs.items()})
+            with self._lock:
+                if self._nbuffered > 0:
+                    self._put(self._take_batch(self._nbuffered))
+            self._put(self.END)
+        except Exception as e:
+            # The exception raised to interrupt the event loop may reach this
+            # point as a different exception if it was raised in another thread
+            if not self._closed.is_set():
+                try:
+                    self._put(e)
+                except _BatchesClosed:
+                    pass
+
+    def close(self):
+        """Stops the production of batches."""
+        self._closed.set()
+
+
+def RDataFrameAsArrow(df, columns=None, exclude=None, batch_size=None):
+    """Read-out the RDataFrame as an Arrow table.
+
+    The columns are read out with AsNumpy and wrapped in Arrow arrays. The
+    numeric columns and the flattened collections of fundamental types are
+    not copied, the Arrow arrays use the memory of the NumPy arrays. Columns
+    of strings and of other collections are converted element by element.
+
+    If `batch_size` is given, the columns are instead read out with
+    AsNumpyBatches and a stream of record batches is returned, see the
+    documentation of AsNumpyBatches for the order of the entries.
+
+    Parameters:
+        columns: If None return all branches as columns, otherwise specify names in iterable.
+        exclude: Exclude branches from selection.
+        batch_size: If None (default) return a single table, otherwise the
+            number of entries in each record batch.
+
+    Returns:
+        pyarrow.Table or generator: the table holding all the entries, or a
+            generator of pyarrow.RecordBatch objects with `batch_size` entries
+            each.
+    """
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Failed to import pyarrow during call of RDataFrame.AsArrow.")
+
+    if batch_size is None:
+        arrays = RDataFrameAsNumpy(df, columns, exclude, jagged="flat")
+        return pyarrow.table({column: _to_arrow_array(array) for column, array in arrays.items()})
+
+    batches = RDataFrameAsNumpyBatches(df, columns, batch_size, exclude)
+    return (pyarrow.RecordBatch.from_pydict({column: _to_arrow_array(array) for column, array in batch.items()})
+            for batch in batches)
+
+
+def _to_arrow_array(array):
+    """Wraps a column read out by AsNumpy in an Arrow array, without copying
+    the numeric values.
+    """
+    import numpy
+    import pyarrow
+    from ROOT._pythonization._rdf_utils import JaggedArray
+
+    if isinstance(array, JaggedArray):
+        # RArrowDS reads lists with 32 bit offsets, large lists are only used
+        # when the offsets do not fit
+        if array.offsets[-1] <= numpy.iinfo(numpy.int32).max:
+            return pyarrow.ListArray.from_arrays(numpy.asarray(array.offsets, dtype=numpy.int32),
+                                                 numpy.asarray(array.content))
+        return pyarrow.LargeListArray.from_arrays(numpy.asarray(array.offsets), numpy.asarray(array.content))
+
+    if array.dtype == object:
+        import cppyy
+        return pyarrow.array([str(x) if isinstance(x, cppyy.gbl.std.string) else numpy.asarray(x) for x in array])
+
+    return pyarrow.array(numpy.asarray(array))
+
+
+class _ArrowArrayStream(ctypes.Structure):
+    """The ArrowArrayStream structure of the Arrow C stream interface, see
+    https://arrow.apache.org/docs/format/CStreamInterface.html
+    """
+    _fields_ = [("get_schema", ctypes.c_void_p),
+                ("get_next", ctypes.c_void_p),
+                ("get_last_error", ctypes.c_void_p),
+                ("release", ctypes.c_void_p),
+                ("private_data", ctypes.c_void_p)]
+
+
+def _make_from_arrow(cpp_from_arrow):
+    """Creates the FromArrow function of the RDF namespace.
+
+    Parameters:
+        cpp_from_arrow: the C++ ROOT::RDF::FromArrow function, None if ROOT
+            was built without Arrow.
+    """
+    def FromArrow(table, columns=None):
+        """Creates an RDataFrame reading an Arrow table.
+
+        The record batches of the table are passed to the Arrow data source
+        through the Arrow C stream interface, so their buffers are not copied
+        and stay owned by pyarrow until the RDataFrame is destroyed.
+
+        Parameters:
+            table: a pyarrow.Table, pyarrow.RecordBatch or
+                pyarrow.RecordBatchReader. A reader is consumed by this call.
+                The C++ arrow::Table of the FromArrow function is accepted
+                too.
+            columns: If None use all the columns of the table, otherwise
+                specify names in iterable.
+
+        Returns:
+            RDataFrame: the dataframe reading the table.
+        """
+        columns = list(columns) if columns is not None else []
+
+        try:
+            import pyarrow
+        except ImportError:
+            pyarrow = None
+
+        if pyarrow is None or not isinstance(table, (pyarrow.Table, pyarrow.RecordBatch, pyarrow.RecordBatchReader)):
+            if cpp_from_arrow is None:
+                raise TypeError("ROOT.RDF.FromArrow requires a pyarrow.Table, pyarrow.RecordBatch or "
+                                "pyarrow.RecordBatchReader, got {}".format(type(table).__name__))
+            return cpp_from_arrow(table, columns)
+
+        from cppyy.gbl.ROOT import Internal
+        if cpp_from_arrow is None or not hasattr(Internal.RDF, "FromArrowCStream"):
+            raise RuntimeError("ROOT.RDF.FromArrow requires ROOT to be built with Arrow support.")
+
+        if isinstance(table, pyarrow.RecordBatch):
+            table = pyarrow.Table.from_batches([table])
+        if isinstance(table, pyarrow.Table):
+            table = pyarrow.RecordBatchReader.from_batches(table.schema, table.to_batches())
+
+        stream = _ArrowArrayStream()
+        table._export_to_c(ctypes.addressof(stream))
+        return Internal.RDF.FromArrowCStream(ctypes.addressof(stream), columns)
+
+    return FromArrow
+
+
+# The C++ types of the columns read from numpy arrays of the given data types
+_STREAM_COLUMN_TYPES = {
+    "bool": "bool",
+    "int16": "short", "uint16": "unsigned short",
+    "int32": "int", "uint32": "unsigned int",
+    "int64": "Long64_t", "uint64": "ULong64_t",
+    "float32": "float", "float64": "double",
+}
+
+# Whether the header of the data source reading streams of numpy arrays could
+# be declared, None if it was not tried yet
+_numpy_stream_declared = None
+
+
+def RDFFromNumpyStream(chunks, columns=None):
+    """Creates an RDataFrame reading the chunks of numpy arrays produced by a
+    Python iterable, e.g. a generator reading a HDF5 or Parquet file piece by
+    piece.
+
+    Each chunk is a dictionary where the keys are the column names and the
+    values are 1D numpy arrays of fundamental types with the same length. The
+    chunks are requested by the event loop as it needs more entries and only
+    the current chunk is kept in memory, so the dataset does not need to fit
+    in memory. The entries of each chunk are processed in parallel if the
+    implicit multi-threading of ROOT is enabled.
+
+    The columns and their types are determined by the first chunk, which is
+    read when the RDataFrame is created. The arrays of the following chunks
+    are converted to the same types if needed. Since the iterable is consumed,
+    the RDataFrame can run a single event loop.
+
+    Parameters:
+        chunks: iterable of dictionaries of numpy arrays.
+        columns: If None read all the columns of the first chunk, otherwise
+            specify names in iterable.
+
+    Returns:
+        RDataFrame: the dataframe reading the chunks.
+    """
+    global _numpy_stream_declared
+    import numpy
+
+    iterator = iter(chunks)
+    first_chunk = next(iterator, None)
+    if first_chunk is None:
+        raise ValueError("ROOT.RDF.FromNumpyStream requires at least one chunk to determine the columns")
+
+    columns = [str(column) for column in columns] if columns is not None else [str(c) for c in first_chunk.keys()]
+    if not columns:
+        raise ValueError("ROOT.RDF.FromNumpyStream requires at least one column")
+
+    dtypes = []
+    for column in columns:
+        if column not in first_chunk:
+            raise ValueError("Column '{}' is not in the first chunk".format(column))
+        dtype = numpy.asarray(first_chunk[column]).dtype
+        if dtype.name not in _STREAM_COLUMN_TYPES:
+            raise TypeError("Column '{}' has the unsupported data type {}".format(column, dtype))
+        # The name does not include the byte order, the chunks are converted to
+        # the native one read by C++
+        dtypes.append(numpy.dtype(dtype.name))
+
+    if _numpy_stream_declared is None:
+        _numpy_stream_declared = _declarecache.declare_uncached('#include "ROOT/RNumpyStreamDS.hxx"')
+    if not _numpy_stream_declared:
+        raise RuntimeError('Failed to find "ROOT/RNumpyStreamDS.hxx".')
+
+    from cppyy.gbl.ROOT import Internal
+
+    source = _NumpyChunkSource(iterator, first_chunk, columns, dtypes)
+    return Internal.RDF.MakeNumpyStreamDataFrame(source, columns,
+                                                 [_STREAM_COLUMN_TYPES[dtype.name] for dtype in dtypes],
+                                                 [dtype.itemsize for dtype in dtypes])
+
+
+class _NumpyChunkSource(object):
+    """Provides the chunks of numpy arrays of an iterator to the
+    RNumpyStreamDS data source, which calls its methods from the event loop.
+
+    Attributes:
+        _iterator: the iterator of the chunks, None once it is exhausted or
+            the event loop is over.
+        _first_chunk (dict): the chunk read to determine the columns, not
+            processed yet.
+        _current (list): the arrays of the chunk being processed, one per
+            column. They are kept alive until the next chunk is requested.
+    """
+
+    def __init__(self, iterator, first_chunk, columns, dtypes):
+        self._iterator = iterator
+        self._first_chunk = first_chunk
+        self._columns = columns
+        self._dtypes = dtypes
+        self._started = False
+        self._current = None
+
+    def start(self):
+        """Called at the beginning of the event loop."""
+        if self._started:
+            raise RuntimeError("The chunks of a dataframe created with ROOT.RDF.FromNumpyStream can only be read by "
+                               "one event loop.")
+        self._started = True
+
+    def _get_arrays(self, chunk):
+        """Returns the contiguous arrays of the columns of the chunk."""
+        import numpy
+
+        arrays = []
+        for column, dtype in zip(self._columns, self._dtypes):
+            if column not in chunk:
+                raise ValueError("Column '{}' is missing from a chunk".format(column))
+            array = numpy.ascontiguousarray(chunk[column], dtype=dtype)
+            if array.ndim != 1:
+                raise ValueError("Column '{}' of a chunk is not a 1D array".format(column))
+            if arrays and len(array) != len(arrays[0]):
+                raise ValueError("Column '{}' and column '{}' of a chunk have different lengths: {} and {}".format(
+                    column, self._columns[0], len(array), len(arrays[0])))
+            arrays.append(array)
+        return arrays
+
+    def next_chunk(self):
+        """Returns the number of entries and the addresses of the arrays of
+        the next chunk that is not empty, None at the end of the data.
+        """
+        # Release the previous chunk before reading the next one
+        self._current = None
+
+        while self._iterator is not None:
+            if self._first_chunk is not None:
+                chunk, self._first_chunk = self._first_chunk, None
+            else:
+                chunk = next(self._iterator, None)
+                if chunk is None:
+                    self._iterator = None
+                    break
+
+            arrays = self._get_arrays(chunk)
+            if len(arrays[0]) > 0:
+                self._current = arrays
+                return len(arrays[0]), [array.ctypes.data for array in arrays]
+
+        return None
+
+    def close(self):
+        """Called at the end of the event loop, releases the chunks."""
+        self._current = None
+        self._first_chunk = None
+        self._iterator = None
 
 
 class HistoProfileWrapper(MethodTemplateWrapper):
@@ -398,6 +1208,8 @@ def pythonize_rdataframe(klass):
 
     # Add asNumpy feature
     klass.AsNumpy = RDataFrameAsNumpy
+    klass.AsNumpyBatches = RDataFrameAsNumpyBatches
+    klass.AsArrow = RDataFrameAsArrow
 
     # Replace the implementation of the following RDF methods
     # to convert a tuple argument into a model object
@@ -9,6 +9,7 @@
 ################################################################################
 import re
 import typing
+from .. import _declarecache
 from .._numbadeclare import _NumbaDeclareDecorator
 
 import libcppyy
@@ -358,6 +359,77 @@ def _PyFilter(rdf, callable_or_str, *args, extra_args={}):
     func_call = jitter.jit_function(func, col_list, extra_args)
     return rdf._OriginalFilter("Numba::" + func_call, filter_name)
 
+# C++ functions that define a column with the output parameter overload of a jitted function, by
+# jitted function name, return type and types of its arguments. Declared once per signature.
+_output_buffers_definers = {}
+
+_OUTPUT_BUFFERS_DEFINER = """
+namespace Numba {{
+namespace Internal {{
+ROOT::RDF::RNode {NAME}(ROOT::RDF::RNode df, std::string_view col_name, const std::vector<std::string> &columns,
+                        unsigned int nslots{CONSTANT_PARAMS})
+{{
+   // One buffer per slot, owned by the Define through the lambda
+   auto buffers = std::make_shared<std::vector<{RVEC_TYPE}>>(nslots);
+   return df.DefineSlot(col_name, [buffers{CAPTURES}](unsigned int slot{COLUMN_PARAMS}) {{
+      auto &buffer = (*buffers)[slot];
+      Numba::{FUNC_NAME}({ARGS});
+      return {RVEC_TYPE}(buffer.data(), buffer.size());
+   }}, columns);
+}}
+}} // namespace Internal
+}} // namespace Numba
+"""
+
+def _define_with_output_buffers(rdf, col_name, jitter, rvec_type):
+    """
+    Defines the column with the overload of the jitted function that writes the returned RVec in an
+    output parameter. Each processing slot has its own buffer, reused for all the entries it processes,
+    and the values of the column are RVecs adopting the memory of the buffer of their slot. Thus, no
+    memory is allocated per entry once the buffers are large enough. A value is valid until the slot
+    processes the next entry, as the values of any other column. The buffers are owned by the Define
+    and released with the computation graph.
+    Arguments:
+        jitter: FunctionJitter that jitted the Python callable.
+        rvec_type: The type of the returned RVec.
+    Returns:
+        RDataFrame: rdf with new column defined
+    """
+    import ROOT
+
+    # The arguments of the jitted function are either columns or constants, in the order of its parameters
+    columns, column_types, constants, constant_types, args = [], [], [], [], []
+    for param, (arg_type, _) in jitter.args_info.items():
+        value = jitter.func_args.get(param, param)
+        if isinstance(value, str) and value in jitter.col_names:
+            args.append(f"c{len(columns)}")
+            columns.append(value)
+            column_types.append(rdf.GetColumnType(value))
+        else:
+            args.append(f"k{len(constants)}")
+            constants.append(value)
+            constant_types.append(str(arg_type))
+
+    key = (jitter.func.__name__, rvec_type, tuple(args), tuple(column_types), tuple(constant_types))
+    definer = _output_buffers_definers.get(key)
+    if definer is None:
+        definer = f"define_output_buffers_{len(_output_buffers_definers)}"
+        code = _OUTPUT_BUFFERS_DEFINER.format(
+            NAME=definer,
+            RVEC_TYPE=rvec_type,
+            FUNC_NAME=jitter.func.__name__,
+            CONSTANT_PARAMS="".join(f", {t} k{i}" for i, t in enumerate(constant_types)),
+            CAPTURES="".join(f", k{i}" for i in range(len(constants))),
+            COLUMN_PARAMS="".join(f", const {t} &c{i}" for i, t in enumerate(column_types)),
+            ARGS=", ".join(args + ["buffer"]))
+        # The jitted function embeds addresses of this process
+        if not _declarecache.declare_uncached(code):
+            raise Exception(f"Failed to declare the definition of the column {col_name}:\n{code}")
+        _output_buffers_definers[key] = definer
+
+    return getattr(ROOT.Numba.Internal, definer)(ROOT.RDF.AsRNode(rdf), col_name, columns, rdf.GetNSlots(),
+                                                  *constants)
+
 def _PyDefine(rdf, col_name, callable_or_str, cols = [] , extra_args = {} ):
     """
     Defines a new column in the RDataFrame.
@@ -406,4 +478,8 @@ def _PyDefine(rdf, col_name, callable_or_str, cols = [] , extra_args = {} ):
 
     jitter = FunctionJitter(rdf)    
     func_call = jitter.jit_function(func, cols, extra_args)
+    return_type = getattr(func, "__cpp_return_type__", "")
+    if "RVec" in return_type:
+        # Avoid allocating a new RVec for every entry
+        return _define_with_output_buffers(rdf, col_name, jitter, return_type)
     return rdf._OriginalDefine(col_name, "Numba::" + func_call)
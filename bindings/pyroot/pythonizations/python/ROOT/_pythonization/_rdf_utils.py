@@ -35,3 +35,92 @@ class ndarray(numpy.ndarray):
         """
         if obj is None: return
         self.result_ptr = getattr(obj, "result_ptr", None)
+
+
+class JaggedArray(object):
+    """
+    A column of variable-length collections, e.g. RVecs, stored as two flat
+    numpy arrays: `content` holds the elements of all the collections one
+    after the other and `offsets` holds the position in `content` of the first
+    element of each collection, followed by the total number of elements. The
+    collection of entry `i` is thus `content[offsets[i]:offsets[i + 1]]`.
+    This is the layout of the ListOffsetArray of awkward, see `to_awkward`.
+    """
+    def __init__(self, content, offsets):
+        self.content = content
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        """
+        Returns the collection of the entry as a view of `content`.
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("JaggedArray index out of range")
+        return self.content[self.offsets[index]:self.offsets[index + 1]]
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __repr__(self):
+        return "JaggedArray(content={}, offsets={})".format(self.content, self.offsets)
+
+    def __reduce__(self):
+        """
+        Pickles the plain numpy arrays, without the result pointer holding
+        their memory.
+        """
+        return (JaggedArray, (numpy.asarray(self.content), numpy.asarray(self.offsets)))
+
+    @property
+    def counts(self):
+        """
+        The number of elements of each collection.
+        """
+        return numpy.diff(self.offsets)
+
+    def to_awkward(self):
+        """
+        Returns an awkward array of variable-length lists viewing the memory
+        of this object, without copying it.
+        """
+        try:
+            import awkward
+        except ImportError:
+            raise ImportError("Failed to import awkward, which is needed to convert a JaggedArray to an awkward array.")
+
+        layout = awkward.contents.ListOffsetArray(
+            awkward.index.Index64(numpy.asarray(self.offsets, dtype=numpy.int64)),
+            awkward.contents.NumpyArray(self.content))
+        return awkward.Array(layout)
+
+    @classmethod
+    def concatenate(cls, arrays):
+        """
+        Concatenates the collections of the arrays in a new JaggedArray.
+        """
+        content = numpy.concatenate([array.content for array in arrays])
+        offsets = [numpy.zeros(1, dtype=numpy.int64)]
+        start = 0
+        for array in arrays:
+            offsets.append(numpy.asarray(array.offsets[1:], dtype=numpy.int64) - array.offsets[0] + start)
+            start += array.offsets[-1] - array.offsets[0]
+        return cls(content, numpy.concatenate(offsets))
+
+
+def concatenate(arrays):
+    """
+    Concatenates the arrays of a column read out by AsNumpy, which are numpy
+    arrays, JaggedArray objects or awkward arrays.
+    """
+    if isinstance(arrays[0], JaggedArray):
+        return JaggedArray.concatenate(arrays)
+    if not isinstance(arrays[0], numpy.ndarray) and type(arrays[0]).__module__.startswith("awkward"):
+        import awkward
+        return awkward.concatenate(arrays)
+    return numpy.concatenate(arrays)
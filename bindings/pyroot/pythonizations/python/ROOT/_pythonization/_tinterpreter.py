@@ -0,0 +1,21 @@
+################################################################################
+# Copyright (C) 1995-2026, Rene Brun and Fons Rademakers.                      #
+# All rights reserved.                                                         #
+#                                                                              #
+# For the licensing terms see $ROOTSYS/LICENSE.                                #
+# For the list of contributors see $ROOTSYS/README/CREDITS.                    #
+################################################################################
+
+import cppyy
+
+from .. import _declarecache
+
+
+def pythonize_tinterpreter():
+    # The interpreter is used by cppyy before the pythonizations are
+    # registered, so the class is pythonized directly. Declarations, also the
+    # ones of cppyy.cppdef, go through the persistent cache if it is enabled
+    if _declarecache.get_cache_dir() is not None:
+        _declarecache.enable(cppyy.gbl.TInterpreter)
+
+pythonize_tinterpreter()
@@ -130,7 +130,7 @@ ds.SetBranchAddress('structb', ms)
 */
 '''
 
-from libROOTPythonizations import AddBranchAttrSyntax, SetBranchAddressPyz, BranchPyz
+from libROOTPythonizations import AddBranchAttrSyntax, SetBranchAddressPyz, BranchPyz, ResetBranchAccessors
 from . import pythonization
 
 # TTree iterator
@@ -153,6 +153,17 @@ def _SetBranchAddress(self, *args):
         # Fall back to the original implementation for the rest of overloads
         res = self._OriginalSetBranchAddress(*args)
 
+    # The attributes of the tree are read from the new address
+    ResetBranchAccessors(self)
+
+    return res
+
+def _SetBranchStatus(self, *args):
+    res = self._OriginalSetBranchStatus(*args)
+
+    # The attributes of the tree are resolved again with the new status
+    ResetBranchAccessors(self)
+
     return res
 
 def _Branch(self, *args):
@@ -189,6 +200,10 @@ def pythonize_ttree(klass, name):
     klass._OriginalSetBranchAddress = klass.SetBranchAddress
     klass.SetBranchAddress = _SetBranchAddress
 
+    # SetBranchStatus
+    klass._OriginalSetBranchStatus = klass.SetBranchStatus
+    klass.SetBranchStatus = _SetBranchStatus
+
     # Branch
     klass._OriginalBranch = klass.Branch
     klass.Branch = _Branch
@@ -199,8 +214,8 @@ def pythonize_tchain(klass):
     # klass: class to be pythonized
 
     # TChain needs to be explicitly pythonized because it redefines
-    # SetBranchAddress in C++. As a consequence, TChain does not
-    # inherit TTree's pythonization for SetBranchAddress, which
+    # SetBranchAddress and SetBranchStatus in C++. As a consequence,
+    # TChain does not inherit TTree's pythonization for them, which
     # needs to be injected to TChain too. This is not the case for
     # other classes like TNtuple, which will inherit all the
     # pythonizations added here for TTree.
@@ -208,3 +223,7 @@ def pythonize_tchain(klass):
     # SetBranchAddress
     klass._OriginalSetBranchAddress = klass.SetBranchAddress
     klass.SetBranchAddress = _SetBranchAddress
+
+    # SetBranchStatus
+    klass._OriginalSetBranchStatus = klass.SetBranchStatus
+    klass.SetBranchStatus = _SetBranchStatus
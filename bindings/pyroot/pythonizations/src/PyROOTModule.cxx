@@ -63,6 +63,8 @@ static PyMethodDef gPyROOTMethods[] = {
     (char *)"Fully enable the use of TTree::SetBranchAddress from Python"},
    {(char *)"BranchPyz", (PyCFunction)PyROOT::BranchPyz, METH_VARARGS,
     (char *)"Fully enable the use of TTree::Branch from Python"},
+   {(char *)"ResetBranchAccessors", (PyCFunction)PyROOT::ResetBranchAccessors, METH_VARARGS,
+    (char *)"Drop the cached accessors of the attributes of a tree"},
    {(char *)"AddSetItemTCAPyz", (PyCFunction)PyROOT::AddSetItemTCAPyz, METH_VARARGS,
     (char *)"Customize the setting of an item of a TClonesArray"},
    {(char *)"AddPrettyPrintingPyz", (PyCFunction)PyROOT::AddPrettyPrintingPyz, METH_VARARGS,
@@ -28,6 +28,7 @@ PyObject *AddFileOpenPyz(PyObject *self, PyObject *args);
 PyObject *AddBranchAttrSyntax(PyObject *self, PyObject *args);
 PyObject *BranchPyz(PyObject *self, PyObject *args);
 PyObject *SetBranchAddressPyz(PyObject *self, PyObject *args);
+PyObject *ResetBranchAccessors(PyObject *self, PyObject *args);
 
 PyObject *AddTClassDynamicCastPyz(PyObject *self, PyObject *args);
 
@@ -20,6 +20,7 @@
 
 // ROOT
 #include "TClass.h"
+#include "TROOT.h"
 #include "TTree.h"
 #include "TBranch.h"
 #include "TBranchElement.h"
@@ -30,6 +31,11 @@
 #include "TStreamerElement.h"
 #include "TStreamerInfo.h"
 
+#include <memory>
+#include <mutex>
+#include <string>
+#include <unordered_map>
+
 using namespace CPyCppyy;
 
 static TBranch *SearchForBranch(TTree *tree, const char *name)
@@ -58,14 +64,232 @@ static TLeaf *SearchForLeaf(TTree *tree, const char *name, TBranch *branch)
    return leaf;
 }
 
-static PyObject *BindBranchToProxy(TTree *tree, const char *name, TBranch *branch)
+namespace {
+
+struct ConverterDeleter {
+   void operator()(Converter *cnv) const { CPyCppyy::DestroyConverter(cnv); }
+};
+
+using ConverterPtr_t = std::unique_ptr<Converter, ConverterDeleter>;
+
+////////////////////////////////////////////////////////////////////////////
+/// \brief How an attribute of a tree is read, resolved at its first access
+///
+/// An accessor keeps the branch or leaf found for the name of the attribute,
+/// the kind of Python object its value is returned as and, when possible, the
+/// converter of the value, so that the following accesses only read the
+/// current value. The accessor records the address and the status of its
+/// branch: it is stale if they changed, e.g. with SetBranchAddress or
+/// SetBranchStatus called from C++.
+class BranchAccessor {
+public:
+   enum class EKind {
+      kSplitObject, ///< A data member of a split object
+      kObject,      ///< A full object
+      kNullObject,  ///< A typed null object, for an object without address
+      kLeafArray,   ///< The values of a leaf with more than one element
+      kLeafValue,   ///< The value of a leaf
+      kLeafObject   ///< The value of a leaf holding the address of an object
+   };
+
+private:
+   EKind fKind;
+   TBranch *fBranch;          ///< The branch whose address and status are checked, null for leaves without branch
+   TLeaf *fLeaf;              ///< The leaf, for the kinds of leaves
+   Cppyy::TCppType_t fScope;  ///< The class of the object, for the kinds of objects
+   Long_t fOffset;            ///< The offset of the data member in its object, for split objects
+   ConverterPtr_t fConverter; ///< Null for arrays of variable size, whose converter depends on the entry
+   char *fAddress;
+   bool fDoNotProcess;
+
+public:
+   BranchAccessor(EKind kind, TBranch *branch, TLeaf *leaf, Cppyy::TCppType_t scope, Long_t offset,
+                  Converter *converter)
+      : fKind(kind), fBranch(branch), fLeaf(leaf), fScope(scope), fOffset(offset), fConverter(converter),
+        fAddress(branch ? branch->GetAddress() : nullptr),
+        fDoNotProcess(branch ? branch->TestBit(TBranch::kDoNotProcess) : false)
+   {
+   }
+
+   bool IsValid() const
+   {
+      return !fBranch ||
+             (fBranch->GetAddress() == fAddress && fBranch->TestBit(TBranch::kDoNotProcess) == fDoNotProcess);
+   }
+
+   /// Returns the current value, or null without setting a Python error if
+   /// the value cannot be read with this accessor anymore
+   PyObject *Read() const
+   {
+      switch (fKind) {
+      case EKind::kSplitObject:
+         return BindCppObjectNoCast(((TBranchElement *)fBranch)->GetObject() + fOffset, fScope);
+      case EKind::kObject: return BindCppObjectNoCast(*(void **)fAddress, fScope);
+      case EKind::kNullObject: return BindCppObjectNoCast(nullptr, fScope);
+      case EKind::kLeafArray: {
+         void *address = 0;
+         if (fLeaf->GetBranch())
+            address = (void *)fLeaf->GetBranch()->GetAddress();
+         if (!address)
+            address = (void *)fLeaf->GetValuePointer();
+
+         if (fConverter)
+            return fConverter->FromMemory(&address);
+         dim_t dims[] = {1, fLeaf->GetNdata()}; // first entry is the number of dims
+         ConverterPtr_t converter(CreateConverter(std::string(fLeaf->GetTypeName()) + '*', dims));
+         return converter->FromMemory(&address);
+      }
+      case EKind::kLeafValue:
+         if (!fLeaf->GetValuePointer())
+            return nullptr;
+         return fConverter->FromMemory((void *)fLeaf->GetValuePointer());
+      case EKind::kLeafObject:
+         if (!fLeaf->GetValuePointer())
+            return nullptr;
+         return fConverter->FromMemory((void *)*(void **)fLeaf->GetValuePointer());
+      }
+      return nullptr;
+   }
+};
+
+////////////////////////////////////////////////////////////////////////////
+/// \brief The accessors of the attributes of a tree, by attribute name
+///
+/// The names are the ones after the resolution of the aliases. The accessors
+/// of a TChain refer to the branches of its current tree, they are dropped
+/// when the chain moves to another tree.
+class TreeAccessors {
+   TTree *fCurrentTree = nullptr;
+   Int_t fTreeNumber = -1;
+   std::unordered_map<std::string, std::shared_ptr<BranchAccessor>> fAccessors;
+
+public:
+   /// Drops the accessors if the tree changed since they were resolved
+   void Update(TTree *tree)
+   {
+      if (tree->GetTree() != fCurrentTree || tree->GetTreeNumber() != fTreeNumber) {
+         fAccessors.clear();
+         fCurrentTree = tree->GetTree();
+         fTreeNumber = tree->GetTreeNumber();
+         // The current tree of a chain is deleted when the chain moves to the
+         // next file, possibly before the chain is used from Python again
+         if (fCurrentTree)
+            fCurrentTree->SetBit(TObject::kMustCleanup);
+      }
+   }
+
+   void Clear()
+   {
+      fAccessors.clear();
+      fCurrentTree = nullptr;
+      fTreeNumber = -1;
+   }
+
+   bool IsCurrentTree(TObject *obj) const { return obj == fCurrentTree; }
+
+   std::shared_ptr<BranchAccessor> Find(const std::string &name) const
+   {
+      auto accessor = fAccessors.find(name);
+      return accessor != fAccessors.end() ? accessor->second : nullptr;
+   }
+
+   void Insert(const std::string &name, std::shared_ptr<BranchAccessor> accessor)
+   {
+      fAccessors[name] = std::move(accessor);
+   }
+
+   void Erase(const std::string &name) { fAccessors.erase(name); }
+};
+
+////////////////////////////////////////////////////////////////////////////
+/// \brief The accessors of the trees whose attributes were accessed from Python
+///
+/// The registry is in the list of cleanups of ROOT, so that the accessors of
+/// a tree are removed when the tree is deleted, and the ones of a chain are
+/// dropped when its current tree is deleted. The accessors are shared with
+/// the callers, so that an accessor being read stays alive if another thread
+/// drops it meanwhile.
+class TreeAccessorRegistry : public TObject {
+   // RecursiveRemove is called from the thread that deletes an object, which
+   // does not necessarily hold the GIL
+   std::mutex fMutex;
+   std::unordered_map<TObject *, TreeAccessors> fTrees;
+
+   TreeAccessors &GetLocked(TTree *tree)
+   {
+      auto entry = fTrees.find(tree);
+      if (entry == fTrees.end()) {
+         tree->SetBit(TObject::kMustCleanup);
+         entry = fTrees.emplace(tree, TreeAccessors()).first;
+      }
+      entry->second.Update(tree);
+      return entry->second;
+   }
+
+public:
+   TreeAccessorRegistry() { gROOT->GetListOfCleanups()->Add(this); }
+
+   std::shared_ptr<BranchAccessor> Find(TTree *tree, const std::string &name)
+   {
+      std::lock_guard<std::mutex> lock(fMutex);
+      return GetLocked(tree).Find(name);
+   }
+
+   void Insert(TTree *tree, const std::string &name, std::shared_ptr<BranchAccessor> accessor)
+   {
+      std::lock_guard<std::mutex> lock(fMutex);
+      GetLocked(tree).Insert(name, std::move(accessor));
+   }
+
+   void Erase(TTree *tree, const std::string &name)
+   {
+      std::lock_guard<std::mutex> lock(fMutex);
+      auto entry = fTrees.find(tree);
+      if (entry != fTrees.end())
+         entry->second.Erase(name);
+   }
+
+   void Clear(TTree *tree)
+   {
+      std::lock_guard<std::mutex> lock(fMutex);
+      auto entry = fTrees.find(tree);
+      if (entry != fTrees.end())
+         entry->second.Clear();
+   }
+
+   void RecursiveRemove(TObject *obj) final
+   {
+      std::lock_guard<std::mutex> lock(fMutex);
+      if (fTrees.erase(obj))
+         return;
+      for (auto &tree : fTrees) {
+         if (tree.second.IsCurrentTree(obj))
+            tree.second.Clear();
+      }
+   }
+};
+
+TreeAccessorRegistry &GetTreeAccessorRegistry()
+{
+   // Never deleted, since trees can be deleted by ROOT after the destruction
+   // of the static objects
+   static auto registry = new TreeAccessorRegistry();
+   return *registry;
+}
+
+} // unnamed namespace
+
+static std::unique_ptr<BranchAccessor> MakeBranchAccessor(TTree *tree, const char *name, TBranch *branch)
 {
+   using EKind = BranchAccessor::EKind;
+
    // for partial return of a split object
    if (branch->InheritsFrom(TBranchElement::Class())) {
       TBranchElement *be = (TBranchElement *)branch;
       if (be->GetCurrentClass() && (be->GetCurrentClass() != be->GetTargetClass()) && (0 <= be->GetID())) {
          Long_t offset = ((TStreamerElement *)be->GetInfo()->GetElements()->At(be->GetID()))->GetOffset();
-         return BindCppObjectNoCast(be->GetObject() + offset, Cppyy::GetScope(be->GetCurrentClass()->GetName()));
+         return std::make_unique<BranchAccessor>(EKind::kSplitObject, branch, nullptr,
+                                                 Cppyy::GetScope(be->GetCurrentClass()->GetName()), offset, nullptr);
       }
    }
 
@@ -73,52 +297,45 @@ static PyObject *BindBranchToProxy(TTree *tree, const char *name, TBranch *branc
    if (branch->IsA() == TBranchElement::Class() || branch->IsA() == TBranchObject::Class()) {
       TClass *klass = TClass::GetClass(branch->GetClassName());
       if (klass && branch->GetAddress())
-         return BindCppObjectNoCast(*(void **)branch->GetAddress(), Cppyy::GetScope(branch->GetClassName()));
+         return std::make_unique<BranchAccessor>(EKind::kObject, branch, nullptr,
+                                                 Cppyy::GetScope(branch->GetClassName()), 0, nullptr);
 
       // try leaf, otherwise indicate failure by returning a typed null-object
       TObjArray *leaves = branch->GetListOfLeaves();
       if (klass && !tree->GetLeaf(name) && !(leaves->GetSize() && (leaves->First() == leaves->Last())))
-         return BindCppObjectNoCast(nullptr, Cppyy::GetScope(branch->GetClassName()));
+         return std::make_unique<BranchAccessor>(EKind::kNullObject, branch, nullptr,
+                                                 Cppyy::GetScope(branch->GetClassName()), 0, nullptr);
    }
 
    return nullptr;
 }
 
-static PyObject *WrapLeaf(TLeaf *leaf)
+static std::unique_ptr<BranchAccessor> MakeLeafAccessor(TLeaf *leaf)
 {
-   if (1 < leaf->GetLenStatic() || leaf->GetLeafCount()) {
-      // array types
-      dim_t dims[] = { 1, leaf->GetNdata() }; // first entry is the number of dims
-      std::string typeName = leaf->GetTypeName();
-      Converter *pcnv = CreateConverter(typeName + '*', dims);
-
-      void *address = 0;
-      if (leaf->GetBranch())
-         address = (void *)leaf->GetBranch()->GetAddress();
-      if (!address)
-         address = (void *)leaf->GetValuePointer();
-
-      PyObject *value = pcnv->FromMemory(&address);
-      CPyCppyy::DestroyConverter(pcnv);
+   using EKind = BranchAccessor::EKind;
 
-      return value;
+   if (1 < leaf->GetLenStatic() || leaf->GetLeafCount()) {
+      // array types, the converter of arrays of variable size is created at every access
+      Converter *converter = nullptr;
+      if (!leaf->GetLeafCount()) {
+         dim_t dims[] = {1, leaf->GetNdata()}; // first entry is the number of dims
+         converter = CreateConverter(std::string(leaf->GetTypeName()) + '*', dims);
+      }
+      return std::make_unique<BranchAccessor>(EKind::kLeafArray, leaf->GetBranch(), leaf, 0, 0, converter);
    } else if (leaf->GetValuePointer()) {
       // value types
-      Converter *pcnv = CreateConverter(leaf->GetTypeName());
-      PyObject *value = 0;
-      if (leaf->IsA() == TLeafElement::Class() || leaf->IsA() == TLeafObject::Class())
-         value = pcnv->FromMemory((void *)*(void **)leaf->GetValuePointer());
-      else
-         value = pcnv->FromMemory((void *)leaf->GetValuePointer());
-      CPyCppyy::DestroyConverter(pcnv);
-
-      return value;
+      auto kind = (leaf->IsA() == TLeafElement::Class() || leaf->IsA() == TLeafObject::Class()) ? EKind::kLeafObject
+                                                                                                 : EKind::kLeafValue;
+      return std::make_unique<BranchAccessor>(kind, leaf->GetBranch(), leaf, 0, 0,
+                                              CreateConverter(leaf->GetTypeName()));
    }
 
    return nullptr;
 }
 
-// Allow access to branches/leaves as if they were data members
+// Allow access to branches/leaves as if they were data members.
+// The accessor resolved at the first access of an attribute is cached, the
+// following accesses just read the value with it.
 PyObject *GetAttr(CPPInstance *self, PyObject *pyname)
 {
    const char *name_possibly_alias = CPyCppyy_PyText_AsString(pyname);
@@ -138,24 +355,47 @@ PyObject *GetAttr(CPPInstance *self, PyObject *pyname)
    if (!name)
       name = name_possibly_alias;
 
+   const std::string attrName(name);
+   auto &registry = GetTreeAccessorRegistry();
+   if (auto accessor = registry.Find(tree, attrName)) {
+      if (accessor->IsValid()) {
+         if (auto value = accessor->Read())
+            return value;
+         if (PyErr_Occurred())
+            return 0;
+      }
+      registry.Erase(tree, attrName);
+   }
+
+   std::unique_ptr<BranchAccessor> accessor;
+
    // search for branch first (typical for objects)
    TBranch *branch = SearchForBranch(tree, name);
 
    if (branch) {
       // found a branched object, wrap its address for the object it represents
-      auto proxy = BindBranchToProxy(tree, name, branch);
-      if (proxy != nullptr)
-         return proxy;
+      accessor = MakeBranchAccessor(tree, name, branch);
    }
 
-   // if not, try leaf
-   TLeaf *leaf = SearchForLeaf(tree, name, branch);
+   if (!accessor) {
+      // if not, try leaf
+      TLeaf *leaf = SearchForLeaf(tree, name, branch);
 
-   if (leaf) {
-      // found a leaf, extract value and wrap with a Python object according to its type
-      auto wrapper = WrapLeaf(leaf);
-      if (wrapper != nullptr)
-         return wrapper;
+      if (leaf) {
+         // found a leaf, extract value and wrap with a Python object according to its type
+         accessor = MakeLeafAccessor(leaf);
+      }
+   }
+
+   if (accessor) {
+      if (auto value = accessor->Read()) {
+         // the accessors are updated again, since the search in a TChain
+         // can load its first tree
+         registry.Insert(tree, attrName, std::move(accessor));
+         return value;
+      }
+      if (PyErr_Occurred())
+         return 0;
    }
 
    // confused
@@ -178,6 +418,31 @@ PyObject *PyROOT::AddBranchAttrSyntax(PyObject * /* self */, PyObject *args)
    Py_RETURN_NONE;
 }
 
+////////////////////////////////////////////////////////////////////////////
+/// \brief Drop the cached accessors of the attributes of a tree.
+/// \param[in] self Always null, since this is a module function.
+/// \param[in] args Pointer to a Python tuple object containing the arguments
+/// received from Python.
+///
+/// The accessors are resolved again at the next access of the attributes of
+/// the tree. This is called by the pythonizations of the methods that change
+/// how the branches are read, such as SetBranchAddress and SetBranchStatus.
+PyObject *PyROOT::ResetBranchAccessors(PyObject * /* self */, PyObject *args)
+{
+   PyObject *treeObj = PyTuple_GetItem(args, 0);
+   if (!treeObj)
+      return nullptr;
+
+   if (CPPInstance_Check(treeObj)) {
+      auto treeProxy = (CPPInstance *)treeObj;
+      auto tree = (TTree *)GetTClass(treeProxy)->DynamicCast(TTree::Class(), treeProxy->GetObject());
+      if (tree)
+         GetTreeAccessorRegistry().Clear(tree);
+   }
+
+   Py_RETURN_NONE;
+}
+
 ////////////////////////////////////////////////////////////////////////////
 /// \brief Add pythonization for TTree::SetBranchAddress.
 /// \param[in] self Always null, since this is a module function.
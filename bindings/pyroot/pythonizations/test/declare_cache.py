@@ -0,0 +1,125 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+
+class DeclareCache(unittest.TestCase):
+    """
+    Test the persistent cache of the code declared to the interpreter, enabled
+    with ROOT_DECLARE_CACHE_DIR
+    """
+
+    code = 'int declare_cache_answer() { return 42; }'
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def run_python(self, code, cache_dir=None):
+        # Run in a new interpreter, since the cache is enabled when importing
+        # ROOT and its entries are loaded once per process
+        env = dict(os.environ)
+        env['ROOT_DECLARE_CACHE_DIR'] = self.cache_dir if cache_dir is None else cache_dir
+        output = subprocess.check_output([sys.executable, '-c', code], env=env)
+        return output.decode().split()
+
+    def get_libraries(self):
+        return sorted(name for name in os.listdir(self.cache_dir) if name.endswith('_cxx.so') or name.endswith('_h.so'))
+
+    def test_declare_and_load(self):
+        """
+        Test that the declared code is compiled once and loaded by the
+        following processes, through both gInterpreter.Declare and cppyy.cppdef
+        """
+        code = ('import ROOT, cppyy\n'
+                'print(ROOT.gInterpreter.Declare({0!r}))\n'
+                'print(ROOT.declare_cache_answer())\n'
+                # Declaring the same code again is not an error
+                'print(cppyy.cppdef({0!r}))'.format(self.code))
+
+        self.assertEqual(self.run_python(code), ['True', '42', 'True'])
+        libraries = self.get_libraries()
+        self.assertEqual(len(libraries), 1)
+        mtime = os.path.getmtime(os.path.join(self.cache_dir, libraries[0]))
+
+        self.assertEqual(self.run_python(code), ['True', '42', 'True'])
+        self.assertEqual(self.get_libraries(), libraries)
+        self.assertEqual(os.path.getmtime(os.path.join(self.cache_dir, libraries[0])), mtime)
+
+    def test_header(self):
+        """
+        Test that copies of the same header in different directories share
+        the entry of the cache
+        """
+        headers = []
+        for i in range(2):
+            directory = os.path.join(self.cache_dir, 'headers{}'.format(i))
+            os.mkdir(directory)
+            headers.append(os.path.join(directory, 'declare_cache_header.h'))
+            with open(headers[-1], 'w') as f:
+                f.write('inline int declare_cache_header() { return 7; }\n')
+
+        code = ('import ROOT\n'
+                'from ROOT._declarecache import declare_header\n'
+                'print(declare_header({!r}))\n'
+                'print(ROOT.declare_cache_header())')
+        for header in headers:
+            self.assertEqual(self.run_python(code.format(header)), ['True', '7'])
+            self.assertEqual(len(self.get_libraries()), 1)
+
+    def test_not_compilable(self):
+        """
+        Test that code using declarations that exist only in the interpreter
+        is declared as usual, also when the compilation failed in another
+        process
+        """
+        code = ('import ROOT\n'
+                'ROOT.gInterpreter.ProcessLine("int declare_cache_value = 3;")\n'
+                'print(ROOT.gInterpreter.Declare("int declare_cache_twice() { return 2 * declare_cache_value; }"))\n'
+                'print(ROOT.declare_cache_twice())')
+
+        for _ in range(2):
+            self.assertEqual(self.run_python(code), ['True', '6'])
+            self.assertEqual(self.get_libraries(), [])
+            self.assertTrue(any(name.endswith('.failed') for name in os.listdir(self.cache_dir)))
+
+    def test_evict(self):
+        """
+        Test that the eviction keeps the lock files and the entries whose lock
+        is held by another process
+        """
+        import fcntl
+        from ROOT import _declarecache
+
+        keys = ['a' * 64, 'b' * 64]
+        for key in keys:
+            for suffix in ('.cxx', '.lock'):
+                with open(os.path.join(self.cache_dir, key + suffix), 'w') as f:
+                    f.write('// declare_cache')
+
+        with open(os.path.join(self.cache_dir, keys[1] + '.lock'), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            _declarecache._evict(self.cache_dir, 0)
+
+        self.assertEqual(sorted(os.listdir(self.cache_dir)),
+                         [keys[0] + '.lock', keys[1] + '.cxx', keys[1] + '.lock'])
+
+    def test_disabled(self):
+        """
+        Test that nothing is written without ROOT_DECLARE_CACHE_DIR
+        """
+        code = ('import ROOT\n'
+                'print(ROOT.gInterpreter.Declare({!r}))\n'
+                'print(ROOT.declare_cache_answer())'.format(self.code))
+
+        self.assertEqual(self.run_python(code, cache_dir=''), ['True', '42'])
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,8 @@ import unittest
 import ROOT
 import sys
 import os
+import shutil
+import tempfile
 import numpy as np
 import gc
 
@@ -21,6 +23,7 @@ elif sys.version_info[0] == 3 and "ROOTTEST_IGNORE_NUMBA_PY3" in os.environ:
 
 if not skip:
     import numba as nb
+    from numba.core.ccallback import CFunc
 
 
 # long does not exist anymore on Python 3, map it to int
@@ -573,6 +576,35 @@ class NumbaDeclareArray(unittest.TestCase):
             self.assertEqual(x1[0], bool(x2[0]))
             self.assertEqual(x1[1], bool(x2[1]))
 
+    @unittest.skipIf(skip, skip_reason)
+    def test_wrapper_out_parameter(self):
+        """
+        Test the overload writing the returned RVec in an output parameter
+        """
+        @ROOT.Numba.Declare(["RVec<float>"], "RVec<float>")
+        def g3f(x):
+            return x * 2
+
+        ROOT.gInterpreter.Declare("""
+        std::uintptr_t numbadeclare_rvec_data(const ROOT::RVecF &v) { return reinterpret_cast<std::uintptr_t>(v.data()); }
+        """)
+
+        out = ROOT.RVecF()
+        data = None
+        for n in [100, 3, 100, 50]:
+            v = np.arange(n, dtype=np.float32)
+            ROOT.Numba.g3f(ROOT.VecOps.RVec('float')(v), out)
+            self.assertEqual(out.size(), n)
+            self.assertTrue(np.array_equal(np.array(out), v * 2))
+            # The memory of the output parameter is reused once it is large enough
+            if data is not None:
+                self.assertEqual(ROOT.numbadeclare_rvec_data(out), data)
+            data = ROOT.numbadeclare_rvec_data(out)
+
+        # The overload returning by value gives the same result
+        v = np.arange(200, dtype=np.float32)
+        self.assertTrue(np.array_equal(np.array(ROOT.Numba.g3f(ROOT.VecOps.RVec('float')(v))), v * 2))
+
     @unittest.skipIf(skip, skip_reason)
     def test_const_modifier(self):
         """
@@ -600,5 +632,92 @@ class NumbaDeclareArray(unittest.TestCase):
         self.assertTrue(np.array_equal(rvecf, np.array([1.,4.])))
 
 
+class NumbaDeclareCache(unittest.TestCase):
+    """
+    Test the persistent cache of the wrappers compiled with numba
+    """
+
+    def setUp(self):
+        self.old_cache_dir = os.environ.get("ROOT_NUMBA_CACHE_DIR")
+        self.cache_dir = tempfile.mkdtemp()
+        os.environ["ROOT_NUMBA_CACHE_DIR"] = self.cache_dir
+
+    def tearDown(self):
+        if self.old_cache_dir is None:
+            del os.environ["ROOT_NUMBA_CACHE_DIR"]
+        else:
+            os.environ["ROOT_NUMBA_CACHE_DIR"] = self.old_cache_dir
+        os.environ.pop("ROOT_NUMBA_CACHE_SIZE", None)
+        shutil.rmtree(self.cache_dir)
+
+    def get_entries(self):
+        return [f for f in os.listdir(self.cache_dir) if f.endswith(".nbc")]
+
+    @unittest.skipIf(skip, skip_reason)
+    def test_cache_hit(self):
+        """
+        Test that a callable declared a second time is loaded from the cache
+        """
+        offset = 2.0
+        def f(x):
+            return x * x + offset
+
+        ROOT.Numba.Declare(["float"], "float", name="cached_fn1")(f)
+        self.assertEqual(len(self.get_entries()), 1)
+        self.assertIsInstance(f.__numba_cfunc__, CFunc)
+
+        ROOT.Numba.Declare(["float"], "float", name="cached_fn2")(f)
+        self.assertEqual(len(self.get_entries()), 1)
+        self.assertNotIsInstance(f.__numba_cfunc__, CFunc)
+
+        for x in default_test_inputs:
+            self.assertEqual(ROOT.Numba.cached_fn2(x), x * x + offset)
+            self.assertEqual(f.__numba_cfunc__(x), x * x + offset)
+
+    @unittest.skipIf(skip, skip_reason)
+    def test_cache_captured_values(self):
+        """
+        Test that callables with different captured values get different entries
+        """
+        def make(offset):
+            def f(x):
+                return x + offset
+            return f
+
+        ROOT.Numba.Declare(["int"], "int", name="cached_fn3")(make(1))
+        ROOT.Numba.Declare(["int"], "int", name="cached_fn4")(make(2))
+        self.assertEqual(len(self.get_entries()), 2)
+        self.assertEqual(ROOT.Numba.cached_fn3(1), 2)
+        self.assertEqual(ROOT.Numba.cached_fn4(1), 3)
+
+    @unittest.skipIf(skip, skip_reason)
+    def test_cache_disabled(self):
+        """
+        Test that an empty cache directory disables the cache
+        """
+        os.environ["ROOT_NUMBA_CACHE_DIR"] = ""
+
+        @ROOT.Numba.Declare(["double"], "double", name="cached_fn5")
+        def f(x):
+            return 2 * x
+
+        self.assertEqual(len(self.get_entries()), 0)
+        self.assertEqual(ROOT.Numba.cached_fn5(1.5), 3.0)
+
+    @unittest.skipIf(skip, skip_reason)
+    def test_cache_eviction(self):
+        """
+        Test that the entries are removed when the cache exceeds its size
+        """
+        os.environ["ROOT_NUMBA_CACHE_SIZE"] = "0"
+
+        @ROOT.Numba.Declare(["double"], "double", name="cached_fn6")
+        def f(x):
+            return 3 * x
+
+        self.assertEqual(len(self.get_entries()), 0)
+        self.assertEqual(ROOT.Numba.cached_fn6(1.0), 3.0)
+
+
 if __name__ == '__main__':
     unittest.main()
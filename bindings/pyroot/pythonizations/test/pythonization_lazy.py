@@ -0,0 +1,65 @@
+import importlib
+import os
+import pkgutil
+import subprocess
+import sys
+import unittest
+
+
+class LazyPythonizations(unittest.TestCase):
+    """
+    Test that the modules with the ROOT pythonizations are imported only when
+    a class that they pythonize is used.
+    """
+
+    # Modules of the ROOT._pythonization package that do not pythonize classes
+    helper_modules = [ '_generic', '_pyz_utils', '_rdf_conversion_maps', '_rdf_pyz', '_rdf_utils' ]
+
+    def run_python(self, code):
+        # Run in a new interpreter, so that the pythonizations used by other
+        # tests are not imported yet
+        output = subprocess.check_output([sys.executable, '-c', code], env=os.environ)
+        return output.decode().split()
+
+    def test_not_imported(self):
+        """
+        Test that importing ROOT does not import the lazy pythonizations
+        """
+        imported = self.run_python(
+            'import sys, ROOT\n'
+            'print(" ".join(m for m in sys.modules if m.startswith("ROOT._pythonization.")))')
+        for module in [ '_rdataframe', '_roofit', '_tmva', '_th1', '_ttree' ]:
+            self.assertNotIn('ROOT._pythonization.' + module, imported)
+
+    def test_imported_on_use(self):
+        """
+        Test that using a class imports its pythonizations and applies them,
+        also when the class is used through a derived class
+        """
+        output = self.run_python(
+            'import sys, ROOT\n'
+            'h = ROOT.TH1D("h", "h", 10, 0, 1)\n'
+            'h.Fill(0.5)\n'
+            'h *= 2\n'
+            'print("ROOT._pythonization._th1" in sys.modules, "ROOT._pythonization._ttree" in sys.modules)\n'
+            'print(h.GetBinContent(6))')
+        self.assertEqual(output, [ 'True', 'False', '2.0' ])
+
+    def test_all_modules_registered(self):
+        """
+        Test that every module with pythonizations is imported either lazily
+        or together with ROOT
+        """
+        import ROOT
+        _pythonization = importlib.import_module('ROOT._pythonization')
+
+        lazy_modules = set(module for prefixes in _pythonization._LAZY_PYTHONIZATIONS.values()
+                           for _, module in prefixes)
+        for _, module, _ in pkgutil.iter_modules(_pythonization.__path__):
+            if module not in self.helper_modules:
+                self.assertTrue(module in lazy_modules or module in _pythonization._EAGER_PYTHONIZATIONS,
+                                'Module {} is not registered'.format(module))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+import ROOT
+import numpy as np
+import pyarrow as pa
+
+
+has_arrow = "arrow" in ROOT.gROOT.GetConfigFeatures().split()
+
+
+class RDataFrameAsArrow(unittest.TestCase):
+    """
+    Testing of RDataFrame.AsArrow pythonization
+    """
+
+    def test_numeric_columns(self):
+        """
+        Testing reading numeric columns in an Arrow table
+        """
+        df = ROOT.RDataFrame(5).Define("x", "(int)rdfentry_").Define("y", "2.f * rdfentry_")
+        table = df.AsArrow(["x", "y"])
+        self.assertIsInstance(table, pa.Table)
+        self.assertEqual(table.num_rows, 5)
+        self.assertEqual(table.schema.field("x").type, pa.int32())
+        self.assertEqual(table.schema.field("y").type, pa.float32())
+        self.assertEqual(table.column("x").to_pylist(), [0, 1, 2, 3, 4])
+        self.assertEqual(table.column("y").to_pylist(), [0., 2., 4., 6., 8.])
+
+    def test_rvec_columns(self):
+        """
+        Testing reading RVec columns as Arrow lists
+        """
+        df = ROOT.RDataFrame(4).Define("x", "ROOT::RVecD(rdfentry_, 1.)")
+        table = df.AsArrow(["x"])
+        self.assertEqual(table.schema.field("x").type, pa.list_(pa.float64()))
+        self.assertEqual(table.column("x").to_pylist(), [[], [1.], [1., 1.], [1., 1., 1.]])
+
+    def test_string_columns(self):
+        """
+        Testing reading string columns
+        """
+        df = ROOT.RDataFrame(3).Define("s", "std::to_string(rdfentry_)")
+        table = df.AsArrow(["s"])
+        self.assertEqual(table.column("s").to_pylist(), ["0", "1", "2"])
+
+    def test_batches(self):
+        """
+        Testing reading the columns as a stream of record batches
+        """
+        df = ROOT.RDataFrame(10).Define("x", "(int)rdfentry_")
+        batches = list(df.AsArrow(["x"], batch_size=4))
+        self.assertEqual([batch.num_rows for batch in batches], [4, 4, 2])
+        self.assertTrue(all(isinstance(batch, pa.RecordBatch) for batch in batches))
+        self.assertEqual(sorted(sum((batch.column(0).to_pylist() for batch in batches), [])), list(range(10)))
+
+
+@unittest.skipIf(not has_arrow, "ROOT was built without Arrow support")
+class RDFFromArrow(unittest.TestCase):
+    """
+    Testing of ROOT.RDF.FromArrow with pyarrow objects
+    """
+
+    def test_table(self):
+        """
+        Testing reading a pyarrow table
+        """
+        table = pa.table({"x": np.arange(5, dtype=np.int64), "y": np.arange(5, dtype=np.float64)})
+        df = ROOT.RDF.FromArrow(table)
+        self.assertEqual(df.Count().GetValue(), 5)
+        self.assertEqual(df.Sum("x").GetValue(), 10)
+        self.assertEqual(df.Sum("y").GetValue(), 10.)
+
+    def test_record_batch_and_columns(self):
+        """
+        Testing reading a subset of the columns of a record batch
+        """
+        batch = pa.RecordBatch.from_pydict({"x": pa.array([1., 2.]), "y": pa.array([3, 4], type=pa.int32())})
+        df = ROOT.RDF.FromArrow(batch, ["y"])
+        self.assertEqual(list(df.GetColumnNames()), ["y"])
+        self.assertEqual(list(df.AsNumpy()["y"]), [3, 4])
+
+    def test_chunked_table(self):
+        """
+        Testing reading a table made of several record batches
+        """
+        batches = [pa.RecordBatch.from_pydict({"x": pa.array(np.arange(i, i + 3, dtype=np.float32))})
+                   for i in (0, 3, 6)]
+        df = ROOT.RDF.FromArrow(pa.Table.from_batches(batches))
+        self.assertEqual(list(df.AsNumpy()["x"]), list(range(9)))
+
+    def test_roundtrip(self):
+        """
+        Testing that a table read out with AsArrow can be read back
+        """
+        table = ROOT.RDataFrame(4).Define("x", "(int)rdfentry_").Define("v", "ROOT::RVecF(rdfentry_, 2.f)") \
+                                  .AsArrow(["x", "v"])
+        df = ROOT.RDF.FromArrow(table)
+        self.assertEqual(df.Sum("x").GetValue(), 6)
+        self.assertEqual(df.Define("n", "v.size()").Sum("n").GetValue(), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -291,12 +291,64 @@ class RDataFrameAsNumpy(unittest.TestCase):
         Testing the adoption of the memory from the C++ side for fundamental types
         """
         df = ROOT.ROOT.RDataFrame(1).Define("x", "1.0")
-        npy = df.AsNumpy(["x"])
+        # Instant AsNumpy writes directly in preallocated arrays, the memory is
+        # adopted from the Take actions of lazy AsNumpy
+        npy = df.AsNumpy(["x"], lazy=True).GetValue()
         pyarr = npy["x"]
         cpparr = pyarr.result_ptr.GetValue()
         pyarr[0] = 42
         self.assertTrue(cpparr[0] == pyarr[0])
 
+    def test_preallocated_arrays(self):
+        """
+        Testing that the columns of fundamental types are written in
+        preallocated arrays when no filter is applied
+        """
+        df = ROOT.ROOT.RDataFrame(100).Define("x", "(double)rdfentry_").Define("b", "rdfentry_ % 2 == 0") \
+                                      .Define("v", "ROOT::RVecF{1.f}")
+        result = df.AsNumpy(["x", "b", "v"], lazy=True)
+        self.assertFalse(result._buffers)
+
+        npy = df.AsNumpy(["x", "b", "v"])
+        np.testing.assert_array_equal(npy["x"], np.arange(100, dtype=np.float64))
+        np.testing.assert_array_equal(npy["b"], np.arange(100) % 2 == 0)
+        self.assertEqual(len(npy["v"]), 100)
+
+    def test_preallocated_arrays_dtypes(self):
+        """
+        Testing that the arrays have the same data types whether they are
+        preallocated or not
+        """
+        df = ROOT.ROOT.RDataFrame(10).Define("b", "rdfentry_ % 2 == 0").Define("s", "(short)rdfentry_") \
+                                     .Define("us", "(unsigned short)rdfentry_").Define("i", "(int)rdfentry_") \
+                                     .Define("f", "(float)rdfentry_").Define("d", "(double)rdfentry_")
+        columns = ["b", "s", "us", "i", "f", "d"]
+        npy = df.AsNumpy(columns)
+        lazy = df.AsNumpy(columns, lazy=True).GetValue()
+        filtered = df.Filter("true").AsNumpy(columns)
+
+        for column in columns:
+            np.testing.assert_array_equal(npy[column], lazy[column])
+            self.assertEqual(npy[column].dtype, lazy[column].dtype)
+            self.assertEqual(npy[column].dtype, filtered[column].dtype)
+        self.assertEqual(npy["i"].dtype, np.int32)
+        self.assertEqual(npy["d"].dtype, np.float64)
+
+    def test_preallocated_arrays_tree(self):
+        """
+        Testing that the columns of a TTree are written in preallocated arrays
+        """
+        tree, ref, _, col_names, _ = make_tree("S", "s", "F", "I")
+        df = ROOT.ROOT.RDataFrame(tree)
+        self.assertEqual(ROOT.Internal.RDF.GetKnownEntryRange(ROOT.RDF.AsRNode(df)).second, tree.GetEntries())
+        self.assertEqual(ROOT.Internal.RDF.GetKnownEntryRange(ROOT.RDF.AsRNode(df.Filter("true"))).first, -1)
+
+        npy = df.AsNumpy()
+        lazy = df.AsNumpy(lazy=True).GetValue()
+        for column in col_names:
+            np.testing.assert_array_equal(npy[column], ref[column])
+            self.assertEqual(npy[column].dtype, lazy[column].dtype)
+
     def test_memory_adoption_complex_types(self):
         """
         Testing the adoption of the memory from the C++ side for complex types
@@ -308,6 +360,208 @@ class RDataFrameAsNumpy(unittest.TestCase):
         pyarr[0][0] = 42
         self.assertTrue(cpparr[0][0] == pyarr[0][0])
 
+    def test_merge_chunks(self):
+        """
+        Testing that merged results are kept as chunks and concatenated once
+        """
+        results = [ROOT.RDataFrame(n).Define("x", "(int)rdfentry_").AsNumpy(["x"], lazy=True) for n in (2, 3, 4)]
+        for res in results:
+            res.GetValue()
+
+        merged = results[0]
+        merged.Merge(results[1])
+        merged.Merge(results[2])
+
+        chunks = merged.GetChunks()
+        self.assertEqual([len(chunk["x"]) for chunk in chunks], [2, 3, 4])
+        self.assertEqual(list(merged.GetValue()["x"]), [0, 1, 0, 1, 2, 0, 1, 2, 3])
+
+        # The concatenation does not modify the chunks nor the merged results
+        self.assertEqual([len(chunk["x"]) for chunk in chunks], [2, 3, 4])
+        self.assertEqual(list(results[1].GetValue()["x"]), [0, 1, 2])
+        self.assertEqual(list(results[2].GetValue()["x"]), [0, 1, 2, 3])
+
+    def test_pickle_protocol5_out_of_band(self):
+        """
+        Testing that the arrays of a pickled result are sent as out-of-band
+        buffers with pickle protocol 5
+        """
+        first = ROOT.RDataFrame(5).Define("x", "(double)rdfentry_").AsNumpy(["x"], lazy=True)
+        second = ROOT.RDataFrame(5).Define("x", "(double)rdfentry_").AsNumpy(["x"], lazy=True)
+        first.GetValue()
+        second.GetValue()
+        first.Merge(second)
+
+        buffers = []
+        data = pickle.dumps(first, protocol=5, buffer_callback=buffers.append)
+        self.assertEqual(len(buffers), 2)
+
+        unpickled = pickle.loads(data, buffers=buffers)
+        self.assertEqual(list(unpickled.GetValue()["x"]), [0., 1., 2., 3., 4.] * 2)
+
+    def test_jagged_flat(self):
+        """
+        Testing reading RVec columns as flat content and offsets
+        """
+        df = ROOT.RDataFrame(5).Define("x", "ROOT::RVecF(rdfentry_, rdfentry_)")
+        npy = df.AsNumpy(["x"], jagged="flat")
+        x = npy["x"]
+        self.assertEqual(len(x), 5)
+        self.assertEqual(x.content.dtype, np.float32)
+        self.assertEqual(list(x.offsets), [0, 0, 1, 3, 6, 10])
+        self.assertEqual(list(x.counts), [0, 1, 2, 3, 4])
+        self.assertEqual(list(x[3]), [3, 3, 3])
+        self.assertEqual([len(entry) for entry in x], [0, 1, 2, 3, 4])
+
+    def test_jagged_std_vector(self):
+        """
+        Testing reading std::vector columns as flat content and offsets
+        """
+        ROOT.gInterpreter.Declare("""
+        std::vector<int> create_vector_jagged(unsigned int n) {
+            return std::vector<int>(n, n);
+        }
+        """)
+        df = ROOT.RDataFrame(4).Define("x", "create_vector_jagged(rdfentry_)")
+        x = df.AsNumpy(["x"], jagged="flat")["x"]
+        self.assertEqual(x.content.dtype, np.int32)
+        self.assertEqual(list(x.content), [1, 2, 2, 3, 3, 3])
+        self.assertEqual(list(x.offsets), [0, 0, 1, 3, 6])
+
+    def test_jagged_other_columns(self):
+        """
+        Testing that the columns that can not be flattened are read as usual
+        """
+        df = ROOT.RDataFrame(3).Define("x", "(int)rdfentry_").Define("y", "ROOT::RVec<bool>(rdfentry_, true)")
+        npy = df.AsNumpy(["x", "y"], jagged="flat")
+        self.assertEqual(list(npy["x"]), [0, 1, 2])
+        self.assertEqual(npy["y"].dtype, object)
+
+    def test_jagged_short(self):
+        """
+        Testing that collections of short integers, which have no array
+        interface, are read as arrays of objects
+        """
+        df = ROOT.RDataFrame(3).Define("s", "ROOT::RVec<short>(rdfentry_, -1)") \
+                               .Define("us", "ROOT::RVec<unsigned short>(rdfentry_, 1)")
+        npy = df.AsNumpy(["s", "us"], jagged="flat")
+        self.assertEqual(npy["s"].dtype, object)
+        self.assertEqual(npy["us"].dtype, object)
+        self.assertEqual([list(entry) for entry in npy["s"]], [[], [-1], [-1, -1]])
+        self.assertEqual([list(entry) for entry in npy["us"]], [[], [1], [1, 1]])
+
+    def test_jagged_merge_pickle(self):
+        """
+        Testing merging and pickling results with flattened columns
+        """
+        results = [ROOT.RDataFrame(n).Define("x", "ROOT::RVecD(rdfentry_, 1.)").AsNumpy(["x"], lazy=True, jagged="flat")
+                   for n in (2, 3)]
+        for res in results:
+            res.GetValue()
+        results[0].Merge(results[1])
+
+        unpickled = pickle.loads(pickle.dumps(results[0]))
+        x = unpickled.GetValue()["x"]
+        self.assertEqual(list(x.offsets), [0, 0, 1, 1, 2, 4])
+        self.assertEqual(list(x.counts), [0, 1, 0, 1, 2])
+
+    def test_jagged_awkward(self):
+        """
+        Testing reading RVec columns as awkward arrays
+        """
+        try:
+            import awkward
+        except ImportError:
+            self.skipTest("awkward is not installed")
+        df = ROOT.RDataFrame(4).Define("x", "ROOT::RVecI(rdfentry_, rdfentry_)")
+        x = df.AsNumpy(["x"], jagged="awkward")["x"]
+        self.assertEqual(awkward.to_list(x), [[], [1], [2, 2], [3, 3, 3]])
+
+    def test_jagged_invalid(self):
+        """
+        Testing that an invalid jagged format is rejected
+        """
+        with self.assertRaises(ValueError):
+            ROOT.RDataFrame(1).AsNumpy(jagged="objects")
+
+
+class RDataFrameAsNumpyBatches(unittest.TestCase):
+    """
+    Testing of RDataFrame.AsNumpyBatches pythonization
+    """
+    def test_fixed_size_batches(self):
+        """
+        Testing that all the entries are returned in batches of the requested
+        size, in order, with a smaller last batch
+        """
+        df = ROOT.RDataFrame(1050).Define("x", "(double)rdfentry_").Define("y", "(int)rdfentry_ * 2")
+        batches = list(df.AsNumpyBatches(["x", "y"], batch_size=100))
+
+        self.assertEqual([len(batch["x"]) for batch in batches], [100] * 10 + [50])
+        self.assertTrue(all(batch["x"].dtype == np.float64 and batch["y"].dtype == np.int32 for batch in batches))
+        x = np.concatenate([batch["x"] for batch in batches])
+        y = np.concatenate([batch["y"] for batch in batches])
+        np.testing.assert_array_equal(x, np.arange(1050, dtype=np.float64))
+        np.testing.assert_array_equal(y, 2 * np.arange(1050, dtype=np.int32))
+
+    def test_filtered_batches(self):
+        """
+        Testing that the batches have the requested size also when only part
+        of the entries pass the filters
+        """
+        df = ROOT.RDataFrame(1000).Define("x", "(int)rdfentry_").Filter("x % 3 == 0")
+        batches = list(df.AsNumpyBatches(["x"], batch_size=64))
+
+        self.assertEqual([len(batch["x"]) for batch in batches], [64] * 5 + [14])
+        np.testing.assert_array_equal(np.concatenate([batch["x"] for batch in batches]), np.arange(0, 1000, 3))
+
+    def test_complex_types(self):
+        """
+        Testing that values that are not of fundamental types are copied out
+        of the Take action
+        """
+        df = ROOT.RDataFrame(10).Define("v", "ROOT::RVecI{(int)rdfentry_, 1}")
+        batches = list(df.AsNumpyBatches(["v"], batch_size=4))
+
+        values = [list(v) for batch in batches for v in batch["v"]]
+        self.assertEqual(values, [[i, 1] for i in range(10)])
+
+    def test_early_stop(self):
+        """
+        Testing that the event loop is interrupted when the iteration stops
+        before the end
+        """
+        df = ROOT.RDataFrame(100000).Define("x", "(double)rdfentry_")
+        batches = df.AsNumpyBatches(["x"], batch_size=10, max_queued_batches=1)
+        first = next(batches)
+        batches.close()
+
+        np.testing.assert_array_equal(first["x"], np.arange(10, dtype=np.float64))
+
+    def test_implicit_mt(self):
+        """
+        Testing that the batches are produced when the callbacks are called
+        from the threads of the implicit multi-threading
+        """
+        ROOT.EnableImplicitMT(4)
+        try:
+            df = ROOT.RDataFrame(100000).Define("x", "(double)rdfentry_")
+            batches = list(df.AsNumpyBatches(["x"], batch_size=1000))
+        finally:
+            ROOT.DisableImplicitMT()
+
+        self.assertTrue(all(len(batch["x"]) == 1000 for batch in batches))
+        np.testing.assert_array_equal(np.sort(np.concatenate([batch["x"] for batch in batches])),
+                                      np.arange(100000, dtype=np.float64))
+
+    def test_invalid_batch_size(self):
+        """
+        Testing that the batch size must be positive
+        """
+        df = ROOT.RDataFrame(10).Define("x", "(double)rdfentry_")
+        with self.assertRaises(ValueError):
+            df.AsNumpyBatches(["x"], batch_size=0)
+
 
 if __name__ == '__main__':
     unittest.main()
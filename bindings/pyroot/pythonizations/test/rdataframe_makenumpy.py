@@ -144,5 +144,86 @@ class DataFrameFromNumpy(unittest.TestCase):
         self.assertEqual(ref1, ref4)
 
 
+class DataFrameFromNumpyStream(unittest.TestCase):
+    """
+    Tests for the FromNumpyStream feature enabling to read chunks of numpy
+    arrays from a Python iterable with RDataFrame.
+    """
+
+    @staticmethod
+    def make_chunks(sizes, dtype="float64"):
+        start = 0
+        for size in sizes:
+            yield {"x": np.arange(start, start + size, dtype=dtype), "y": np.ones(size, dtype="int32")}
+            start += size
+
+    def test_chunks(self):
+        """
+        Test reading all the entries of the chunks
+        """
+        df = ROOT.RDF.FromNumpyStream(self.make_chunks([3, 0, 4, 2]))
+        self.assertEqual(sorted(df.GetColumnNames()), ["x", "y"])
+        self.assertEqual(df.GetColumnType("x"), "double")
+        self.assertEqual(df.GetColumnType("y"), "int")
+        count = df.Count()
+        sum_x = df.Sum("x")
+        sum_y = df.Sum("y")
+        self.assertEqual(count.GetValue(), 9)
+        self.assertEqual(sum_x.GetValue(), 36)
+        self.assertEqual(sum_y.GetValue(), 9)
+
+    def test_entry_order(self):
+        """
+        Test that the entries keep the order of the chunks
+        """
+        df = ROOT.RDF.FromNumpyStream(self.make_chunks([2, 3]), columns=["x"])
+        self.assertEqual(list(df.GetColumnNames()), ["x"])
+        npy = df.Define("entry", "rdfentry_").AsNumpy(["x", "entry"])
+        self.assertEqual(list(npy["x"]), [0, 1, 2, 3, 4])
+        self.assertEqual(list(npy["entry"]), [0, 1, 2, 3, 4])
+
+    def test_dtype_conversion(self):
+        """
+        Test that the chunks are converted to the types of the first chunk
+        """
+        chunks = [{"x": np.array([1, 2], dtype="float32")}, {"x": np.array([3, 4], dtype="float64")}]
+        df = ROOT.RDF.FromNumpyStream(chunks)
+        self.assertEqual(df.GetColumnType("x"), "float")
+        self.assertEqual(df.Sum("x").GetValue(), 10)
+
+    def test_byte_order(self):
+        """
+        Test that the chunks in non-native byte order are converted
+        """
+        swapped = ">f8" if sys.byteorder == "little" else "<f8"
+        chunks = [{"x": np.arange(3, dtype=swapped)}, {"x": np.arange(3, 5, dtype=swapped)}]
+        df = ROOT.RDF.FromNumpyStream(chunks)
+        self.assertEqual(df.GetColumnType("x"), "double")
+        self.assertEqual(list(df.AsNumpy(["x"])["x"]), [0, 1, 2, 3, 4])
+
+    def test_single_event_loop(self):
+        """
+        Test that the chunks can be read by a single event loop
+        """
+        df = ROOT.RDF.FromNumpyStream(self.make_chunks([2]))
+        self.assertEqual(df.Count().GetValue(), 2)
+        with self.assertRaises(Exception):
+            df.Count().GetValue()
+
+    def test_invalid_chunks(self):
+        """
+        Test the errors raised for invalid chunks
+        """
+        with self.assertRaises(ValueError):
+            ROOT.RDF.FromNumpyStream([])
+        with self.assertRaises(TypeError):
+            ROOT.RDF.FromNumpyStream([{"x": np.array(["a"])}])
+
+        chunks = [{"x": np.zeros(2), "y": np.zeros(2)}, {"x": np.zeros(2), "y": np.zeros(3)}]
+        df = ROOT.RDF.FromNumpyStream(chunks)
+        with self.assertRaises(Exception):
+            df.Count().GetValue()
+
+
 if __name__ == '__main__':
     unittest.main()
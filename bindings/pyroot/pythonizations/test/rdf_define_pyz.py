@@ -71,6 +71,36 @@ class PyDefine(unittest.TestCase):
         flag = np.array_equal(rdf.AsNumpy()["mag"], arr)
         self.assertTrue(flag)
 
+    def test_arrays_output_buffers(self):
+        """
+        Tests that the arrays returned by the callable, written in a buffer per
+        processing slot, are correct when their size changes and when the same
+        callable defines several columns
+        """
+        rdf = ROOT.RDataFrame(20).Define("n", "(int)(rdfentry_ * 7 % 20)").Define("m", "(int)rdfentry_")
+        def ramp(n):
+            return np.arange(n) * 2
+        rdf = rdf.Define("a", ramp, ["n"]).Define("b", ramp, ["m"])
+        npy = rdf.AsNumpy(["n", "m", "a", "b"])
+        for n, m, a, b in zip(npy["n"], npy["m"], npy["a"], npy["b"]):
+            self.assertEqual(list(a), list(np.arange(n) * 2))
+            self.assertEqual(list(b), list(np.arange(m) * 2))
+
+    def test_arrays_output_buffers_extra_args(self):
+        """
+        Tests that the constant arguments of a callable returning an array are
+        passed together with the columns, in the order of its parameters
+        """
+        rdf = ROOT.RDataFrame(5).Define("n", "(int)rdfentry_")
+        def scaled_ramp(scale, n):
+            return np.arange(n) * scale
+        rdf = rdf.Define("a", scaled_ramp, ["n"], extra_args={"scale": 3}) \
+                 .Define("b", scaled_ramp, ["n"], extra_args={"scale": 5})
+        npy = rdf.AsNumpy(["n", "a", "b"])
+        for n, a, b in zip(npy["n"], npy["a"], npy["b"]):
+            self.assertEqual(list(a), list(np.arange(n) * 3))
+            self.assertEqual(list(b), list(np.arange(n) * 5))
+
     def test_cpp_functor(self):
         """
         Test that a C++ functor can be passed as a callable argument of a
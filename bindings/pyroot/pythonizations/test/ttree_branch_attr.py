@@ -127,6 +127,39 @@ class TTreeBranchAttr(unittest.TestCase):
 
             self.assertEqual(ds.myalias, ds.floatb)
 
+    def test_cached_access_in_loop(self):
+        f,t,c = self.get_tree_and_chain()
+
+        # The chain moves to the second file in the loop
+        self.assertEqual([ ds.floatb for ds in c ], [ self.more + i for i in range(self.nentries) ] * 2)
+        self.assertEqual([ ds.vectorb[0] for ds in c ], list(range(self.nentries)) * 2)
+
+    def test_cached_access_set_branch_address(self):
+        import array
+
+        f,t,c = self.get_tree_and_chain()
+
+        for ds in t,c:
+            self.assertEqual(ds.floatb, self.more)
+
+            n = array.array('f', [ 0. ])
+            ds.SetBranchAddress('floatb', n)
+            ds.GetEntry(1)
+
+            self.assertEqual(n[0], self.more + 1)
+            self.assertEqual(ds.floatb, self.more + 1)
+
+    def test_cached_access_alias_redefined(self):
+        f,t,c = self.get_tree_and_chain()
+
+        for ds in t,c:
+            ds.GetEntry(1)
+            ds.SetAlias('myalias', 'floatb')
+            self.assertEqual(ds.myalias, self.more + 1)
+
+            ds.SetAlias('myalias', 'myintll2')
+            self.assertEqual(ds.myalias, self.more)
+
     def test_ntuples(self):
         f,nt,ntd = self.get_ntuples()
 
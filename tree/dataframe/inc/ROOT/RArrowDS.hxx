@@ -12,6 +12,7 @@
 #include "ROOT/RDataFrame.hxx"
 #include "ROOT/RDataSource.hxx"
 
+#include <cstdint>
 #include <memory>
 
 namespace arrow {
@@ -22,6 +23,8 @@ namespace ROOT {
 namespace Internal {
 namespace RDF {
 class TValueGetter;
+
+ROOT::RDataFrame FromArrowCStream(std::uintptr_t stream, std::vector<std::string> const &columnNames);
 } // namespace RDF
 } // namespace Internal
 
@@ -904,6 +904,8 @@ public:
       }
    }
 
+   COLL &PartialUpdate(unsigned int slot) { return *fColls[slot].get(); }
+
    std::string GetActionName() { return "Take"; }
 
    TakeHelper MakeNew(void *newResult)
@@ -764,6 +764,10 @@ void CheckForDuplicateSnapshotColumns(const ColumnNames_t &cols);
 
 void TriggerRun(ROOT::RDF::RNode &node);
 
+void TriggerJit(ROOT::RDF::RNode &node);
+
+std::pair<Long64_t, Long64_t> GetKnownEntryRange(ROOT::RDF::RNode &node);
+
 template <typename T>
 struct InnerValueType {
    using type = T; // fallback for when T is not a nested RVec
@@ -118,6 +118,8 @@ class RInterface : public RInterfaceBase {
    friend class RInterface;
 
    friend void RDFInternal::TriggerRun(RNode &node);
+   friend void RDFInternal::TriggerJit(RNode &node);
+   friend std::pair<Long64_t, Long64_t> RDFInternal::GetKnownEntryRange(RNode &node);
    friend void RDFInternal::ChangeEmptyEntryRange(const RNode &node, std::pair<ULong64_t, ULong64_t> &&newRange);
    friend void RDFInternal::ChangeSpec(const RNode &node, ROOT::RDF::Experimental::RDatasetSpec &&spec);
 
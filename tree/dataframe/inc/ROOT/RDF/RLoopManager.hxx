@@ -189,6 +189,7 @@ public:
    TTree *GetTree() const;
    ::TDirectory *GetDirectory() const;
    ULong64_t GetNEmptyEntries() const { return fEmptyEntryRange.second - fEmptyEntryRange.first; }
+   std::pair<Long64_t, Long64_t> GetEntryRange() const;
    RDataSource *GetDataSource() const { return fDataSource.get(); }
    void Register(RDFInternal::RActionBase *actionPtr);
    void Deregister(RDFInternal::RActionBase *actionPtr);
@@ -41,6 +41,8 @@ arrow::Schema.
 #pragma GCC diagnostic ignored "-Wshadow"
 #pragma GCC diagnostic ignored "-Wunused-parameter"
 #endif
+#include <arrow/c/bridge.h>
+#include <arrow/record_batch.h>
 #include <arrow/table.h>
 #include <arrow/stl.h>
 #if defined(__GNUC__)
@@ -611,4 +613,29 @@ RDataFrame FromArrow(std::shared_ptr<arrow::Table> table, std::vector<std::strin
 
 } // namespace RDF
 
+namespace Internal {
+namespace RDF {
+
+/// \brief Create a RDataFrame reading the record batches of an Arrow C stream.
+///
+/// The record batches exported by another library through the Arrow C stream interface, e.g. by pyarrow, are
+/// imported in a table without copying their buffers. The buffers are released by the exporting library when the
+/// data source is destroyed.
+/// \param[in] stream the address of an ArrowArrayStream structure, which is moved by this function.
+/// \param[in] columnNames the name of the columns to use
+/// In case columnNames is empty, we use all the columns found in the stream
+ROOT::RDataFrame FromArrowCStream(std::uintptr_t stream, std::vector<std::string> const &columnNames)
+{
+   auto reader = arrow::ImportRecordBatchReader(reinterpret_cast<struct ArrowArrayStream *>(stream));
+   if (!reader.ok())
+      throw std::runtime_error("Could not import the Arrow stream: " + reader.status().ToString());
+   auto table = arrow::Table::FromRecordBatchReader(reader.ValueOrDie().get());
+   if (!table.ok())
+      throw std::runtime_error("Could not read the Arrow stream: " + table.status().ToString());
+   return ROOT::RDF::FromArrow(table.ValueOrDie(), columnNames);
+}
+
+} // namespace RDF
+} // namespace Internal
+
 } // namespace ROOT
@@ -976,6 +976,33 @@ void TriggerRun(ROOT::RDF::RNode &node){
    node.fLoopManager->Run();
 }
 
+////////////////////////////////////////////////////////////////////////////////
+/// \brief Just-in-time compile the code of an RDataFrame computation graph.
+/// \param[in] node A node of the computation graph (not a result).
+///
+/// This function calls the RLoopManager::Jit method on the \p fLoopManager data
+/// member of the input argument, so that the time spent compiling the graph can
+/// be measured separately from the event loop triggered by TriggerRun. It is
+/// intended for internal use only.
+void TriggerJit(ROOT::RDF::RNode &node){
+   node.fLoopManager->Jit();
+}
+
+////////////////////////////////////////////////////////////////////////////////
+/// \brief Return the range of the values of rdfentry_ for the entries that reach a node.
+/// \param[in] node A node of the computation graph (not a result).
+///
+/// The range is known before running the event loop only if no Filter or Range
+/// is applied between the head node and the input node, and if the head node
+/// knows the entries it will process, see RLoopManager::GetEntryRange.
+/// Otherwise {-1, -1} is returned. It is intended for internal use only.
+std::pair<Long64_t, Long64_t> GetKnownEntryRange(ROOT::RDF::RNode &node)
+{
+   if (node.fProxiedPtr.get() != static_cast<ROOT::Detail::RDF::RNodeBase *>(node.fLoopManager))
+      return {-1, -1};
+   return node.fLoopManager->GetEntryRange();
+}
+
 /// Return copies of colsWithoutAliases and colsWithAliases with size branches for variable-sized array branches added
 /// in the right positions (i.e. before the array branches that need them).
 std::pair<std::vector<std::string>, std::vector<std::string>>
@@ -619,8 +619,8 @@ for el in df.Take[int]("x"):
 RDataFrame applications can be executed in parallel through distributed computing frameworks on a set of remote machines
 thanks to the Python package `ROOT.RDF.Experimental.Distributed`. This experimental, **Python-only** package allows to scale the
 optimized performance RDataFrame can achieve on a single machine to multiple nodes at the same time. It is designed so
-that different backends can be easily plugged in, currently supporting [Apache Spark](http://spark.apache.org/) and
-[Dask](https://dask.org/). To make use of distributed RDataFrame, you only need to switch `ROOT.RDataFrame` with
+that different backends can be easily plugged in, currently supporting [Apache Spark](http://spark.apache.org/),
+[Dask](https://dask.org/) and a pool of processes on the local machine. To make use of distributed RDataFrame, you only need to switch `ROOT.RDataFrame` with
 the backend-specific `RDataFrame` of your choice, for example:
 
 ~~~{.py}
@@ -725,6 +725,27 @@ If an instance of [distributed.Client](http://distributed.dask.org/en/stable/api
 provided to the RDataFrame object, it will be created for you and it will run the computations in the local machine
 using all cores available.
 
+### Running on a pool of local processes
+
+On a single machine with many cores, the `Local` backend runs the tasks on a pool of processes forked from the current
+Python session, without the need to start any external service. Since the processes are forked, they inherit all the
+code that was declared to the ROOT interpreter before triggering the computations, e.g. with
+`ROOT.gInterpreter.Declare`, as well as the headers and shared libraries included with the `distribute_headers` and
+`distribute_shared_libraries` methods of the backend. By default, there is one worker process per core of the machine:
+
+~~~{.py}
+import ROOT
+
+RDataFrame = ROOT.RDF.Experimental.Distributed.Local.RDataFrame
+
+# The nworkers argument is optional
+df = RDataFrame("mytree","myfile.root", nworkers=64)
+~~~
+
+Implicit multi-threading should not be enabled in the same session before the computations are triggered, since
+forking a process with running threads is unsafe. The tutorial distrdf003_local_backend.py compares the two approaches
+on the same machine.
+
 ### Choosing the number of distributed tasks
 
 A distributed RDataFrame has internal logic to define in how many chunks the input dataset will be split before sending
@@ -757,6 +778,90 @@ if __name__ == "__main__":
 Note that when processing a TTree or TChain dataset, the `npartitions` value should not exceed the number of clusters in
 the dataset. The number of clusters in a TTree can be retrieved by typing `rootls -lt myfile.root` at a command line.
 
+By default, the dataset is split in exactly `npartitions` tasks, so a single slow task (e.g. reading a file from a slow
+storage element) delays the whole execution. Passing `scheduling="dynamic"` to the RDataFrame constructor instead splits
+the dataset in many smaller tasks, which are handed out to the workers as soon as they become free. With the Dask
+backend, results are merged on the client as tasks finish and the last running tasks are also executed a second time on
+other workers, keeping the result of whichever copy finishes first. This re-execution is disabled if the computation
+graph contains a Snapshot:
+
+~~~{.py}
+df = RDataFrame("mytree","myfile.root", scheduling="dynamic")
+~~~
+
+Each task needs the number of entries and the cluster boundaries of its trees, and by default it opens the files to
+retrieve them. With friend trees, every task opens every file of the dataset. Passing `metadata_cache=True` retrieves
+this information once on the client, reading the files concurrently, and sends it to the tasks together with their
+ranges. The information is stored in an index on local disk, so following executions on the same files do not need to
+open them again. The index is located in `~/.cache/root/distrdf/metadata`, or in the directory specified by the
+`DISTRDF_METADATA_CACHE_DIR` environment variable. Local files are identified by their path, size and modification
+time, while remote files are identified only by their URL and are assumed not to change.
+
+When processing a TTree or TChain dataset, each file is considered by default to hold the same amount of work. For
+datasets made of files of very different sizes, the `partitioning` option balances the tasks by the number of entries
+(`partitioning="entries"`) or by the compressed size of the trees (`partitioning="bytes"`). The `locality` option
+prevents tasks from reading files stored in different places: it accepts either a dictionary mapping each file name to
+a label (e.g. its storage element), or the string `"url"` to use the host in the URL of each file. The chosen plan is
+logged at INFO level, and the boundaries of each task at DEBUG level:
+
+~~~{.py}
+df = RDataFrame("mytree", files, partitioning="bytes", locality="url")
+~~~
+
+The number of tasks can also be derived from the dataset itself. With the `target_task_bytes` option, the number of
+tasks is chosen so that each task reads about that amount of compressed bytes, according to the metadata of the trees.
+With `target_task_duration`, the amount of bytes is instead estimated from the throughput measured in the previous
+execution of the same dataframe. In both cases, every core of the cluster gets a few tasks so that the cores that
+finish early can take over the work of the slowest tasks, and each task is made of whole clusters, so that no task is
+empty. These options have no effect if `npartitions` is passed explicitly:
+
+~~~{.py}
+# Tasks of about 500 MB
+df = RDataFrame("mytree", files, target_task_bytes=500 * 1024**2)
+~~~
+
+Passing `reduction="streaming"` to the RDataFrame constructor merges the result of each task on the client as soon as
+the task finishes. The partial results can then be inspected while the computation is running, either by calling
+`GetPartialValue()` on a result from another thread or by registering a callback with `OnPartialResult`, the
+distributed counterpart of RResultPtr::OnPartialResult. The callback is called on the client with the value computed on
+the part of the dataset processed so far. If it returns `True`, the remaining tasks are cancelled and the results only
+include the tasks that already finished, e.g. to stop a fit as soon as enough statistics was collected. Without
+`reduction="streaming"` the callbacks are called once, with the final value:
+
+~~~{.py}
+df = RDataFrame("mytree", files, reduction="streaming")
+h = df.Histo1D(("h", "h", 100, 0, 10), "x")
+h.OnPartialResult(lambda partial_h: partial_h.GetEntries() > 1e6)
+h.Draw()
+~~~
+
+To find out where the time of a distributed execution goes, pass `profiling=True` to the RDataFrame constructor. Each
+task then records the time spent declaring headers and libraries, setting up, building the RDataFrame of its range,
+creating the computation graph, just-in-time compiling it, running the event loop and serializing its results, as well
+as the size of the latter. The timings of the last execution are retrieved with
+`ROOT.RDF.Experimental.Distributed.GetProfile`, which returns an object with a textual `report()` of the phases and of
+the slowest tasks, a `stragglers(factor)` method listing the tasks slower than `factor` times the median and a
+`to_chrome_trace(path)` method to inspect the timeline of the execution in chrome://tracing or https://ui.perfetto.dev:
+
+~~~{.py}
+df = RDataFrame("mytree", files, profiling=True)
+h = df.Histo1D(("h", "h", 100, 0, 10), "x")
+h.GetValue()
+profile = ROOT.RDF.Experimental.Distributed.GetProfile(h)
+print(profile.report())
+profile.to_chrome_trace("trace.json")
+~~~
+
+Long executions can be made resumable by passing a `checkpoint_dir` to the RDataFrame constructor. The result of every
+completed task is then stored in that directory, which must be reachable from the workers (e.g. a shared filesystem,
+or any local directory with the local backend). If the execution fails, e.g. because a worker died, triggering the same
+computation graph again on the same dataset, even from a new Python session, only runs the tasks that did not complete
+and merges their results with the stored ones. The stored results of a graph are removed once its execution completes:
+
+~~~{.py}
+df = RDataFrame("mytree", files, checkpoint_dir="/shared/checkpoints")
+~~~
+
 ### Distributed Snapshot
 
 The Snapshot operation behaves slightly differently when executed distributedly. First off, it requires the path
@@ -766,6 +871,19 @@ where `n` is the number of dataset partitions. As with local RDataFrame, the res
 RDataFrame is another distributed RDataFrame on which we can define a new computation graph and run more distributed
 computations.
 
+Reading back hundreds of small files can be slow, so the partial output files can be merged in bigger files right after
+the Snapshot by passing the `snapshot_merge_size` option to the RDataFrame constructor, i.e. the maximum size in bytes
+of the merged files. Consecutive partial files are merged in parallel by distributed tasks, copying the compressed
+data without decompressing it. If everything fits in a single file, the output has exactly the name passed to the
+Snapshot call, otherwise the merged files are named after it with `_merged_<n>` appended. A JSON manifest with the same
+name as the output file lists the final files and the bytes written by each task:
+
+~~~{.py}
+# Merge the output in files of at most 2 GB
+df = RDataFrame("mytree", files, snapshot_merge_size=2 * 1024**3)
+snapdf = df.Snapshot("outtree", "/eos/path/to/output.root")
+~~~
+
 ### Distributed RunGraphs
 
 Submitting multiple distributed RDataFrame executions is supported through the RunGraphs function. Similarly to its
@@ -794,6 +912,21 @@ histos = [histoproxy.GetValue() for histoproxy in histoproxies]
 Every distributed backend supports this feature and graphs belonging to different backends can be still triggered with
 a single call to RunGraphs (e.g. it is possible to send a Spark job and a Dask job at the same time).
 
+When many graphs process the same dataset, e.g. several systematic selections of the same skim, passing `fuse=True` to
+RunGraphs executes all the graphs over the same files on the same backend in a single distributed job. Each task then
+books every graph on its range and runs them with a single event loop, so the dataset is read once instead of once per
+graph, while each graph keeps its own results. The options of the fused job, such as the number of partitions, are the
+ones of the first dataframe of the group. Fusion is not available in optimized mode:
+
+~~~{.py}
+df_nominal = RDataFrame("Events", files)
+df_up = RDataFrame("Events", files)
+h_nominal = df_nominal.Filter("pt > 25").Histo1D(("h", "h", 100, 0, 200), "pt")
+h_up = df_up.Filter("pt * 1.02 > 25").Histo1D(("h", "h", 100, 0, 200), "pt")
+# A single job reads the files once for both histograms
+RunGraphs([h_nominal, h_up], fuse=True)
+~~~
+
 ### Histogram models in distributed mode
 
 When calling a Histo*D operation in distributed mode, remember to pass to the function the model of the histogram to be
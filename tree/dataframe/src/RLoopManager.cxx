@@ -973,6 +973,30 @@ std::vector<std::string> RLoopManager::GetFiltersNames()
    return filters;
 }
 
+////////////////////////////////////////////////////////////////////////////
+/// Return the range of the values that rdfentry_ takes in the next event loop, or {-1, -1} if it is not known before
+/// running the event loop, e.g. for data sources or for trees with an entry list. The trees are not read, but a TChain
+/// opens all its files to retrieve the total number of entries.
+/// In multi-thread runs on trees, the entries are numbered from zero in the order they are processed.
+std::pair<Long64_t, Long64_t> RLoopManager::GetEntryRange() const
+{
+   switch (fLoopType) {
+   case ELoopType::kNoFiles:
+   case ELoopType::kNoFilesMT: return {fEmptyEntryRange.first, fEmptyEntryRange.second};
+   case ELoopType::kROOTFiles:
+   case ELoopType::kROOTFilesMT: {
+      if (fTree->GetEntryList())
+         return {-1, -1};
+      const auto end = std::min(fEndEntry, fTree->GetEntries());
+      const auto begin = std::min(fBeginEntry, end);
+      if (fLoopType == ELoopType::kROOTFilesMT)
+         return {0, end - begin};
+      return {begin, end};
+   }
+   default: return {-1, -1};
+   }
+}
+
 std::vector<RNodeBase *> RLoopManager::GetGraphEdges() const
 {
    std::vector<RNodeBase *> nodes(fBookedFilters.size() + fBookedRanges.size());